@@ -1,4 +1,5 @@
 from contextlib import asynccontextmanager
+from typing import Awaitable, Callable
 from fastapi import FastAPI
 from common.config.index import conf
 from common.config.db import db_manager
@@ -6,6 +7,10 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# 各模块注册的启动/关闭回调(后台任务、长连接等) 数据库初始化之后执行
+startup_hooks: list[Callable[[], Awaitable[None]]] = []
+shutdown_hooks: list[Callable[[], Awaitable[None]]] = []
+
 
 async def server_start():
     logger.info("server_start...")
@@ -15,10 +20,20 @@ async def server_start():
         logger.info("Database tables init successfully.")
     except Exception as e:
         logger.error(f"server_start error: {e}")
+    for hook in startup_hooks:
+        try:
+            await hook()
+        except Exception as e:
+            logger.error(f"startup hook {hook.__qualname__} error: {e}")
 
 
 async def server_end():
     logger.info("server_end...")
+    for hook in reversed(shutdown_hooks):
+        try:
+            await hook()
+        except Exception as e:
+            logger.error(f"shutdown hook {hook.__qualname__} error: {e}")
     # redis持久化 英文
     await db_manager.shutdown()
 
@@ -0,0 +1,218 @@
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Any, Awaitable, Callable, Pattern
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route, compile_path
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RouteLevel(StrEnum):
+    """路由访问级别"""
+
+    public = "public"  # 免登录
+    login = "login"  # 仅需登录
+    permission = "permission"  # 需登录且 casbin 鉴权通过
+
+
+@dataclass(frozen=True, slots=True)
+class RouteRule:
+    """路由表条目(启动时预计算)"""
+
+    path: str  # 完整路径模板 如 /authorization/users/{user_id}
+    code: str  # 权限代码(casbin obj)
+    level: RouteLevel
+
+
+class RouteTable:
+    """
+    路由表: 路径模板 + 请求方法 -> 权限代码
+    无路径参数的路由走 dict 直接命中, 带参数的路由按方法分组后顺序正则匹配
+    """
+
+    def __init__(self):
+        self._static: dict[tuple[str, str], RouteRule] = {}
+        self._dynamic: dict[str, list[tuple[Pattern, RouteRule]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._static) + sum(len(v) for v in self._dynamic.values())
+
+    def add(self, path: str, methods: set[str], rule: RouteRule):
+        path_regex, _, param_convertors = compile_path(path)
+        for method in methods:
+            if param_convertors:
+                self._dynamic.setdefault(method, []).append((path_regex, rule))
+            else:
+                self._static.setdefault((method, path), rule)
+
+    def match(self, method: str, path: str) -> RouteRule | None:
+        # HEAD 与 GET 共用规则
+        if method == "HEAD":
+            method = "GET"
+        rule = self._static.get((method, path))
+        if rule is not None:
+            return rule
+        for path_regex, rule in self._dynamic.get(method, ()):
+            if path_regex.match(path):
+                return rule
+        return None
+
+
+def build_route_table(
+    routes: list,
+    public_paths: list[str],
+    login_paths: list[str],
+    prefix: str = "",
+    table: RouteTable | None = None,
+) -> RouteTable:
+    """
+    递归遍历路由(含 mount 的子应用)生成路由表
+    :param routes: 应用路由列表
+    :param public_paths: 免登录路径前缀
+    :param login_paths: 仅需登录的完整路径模板
+    :param prefix: 当前挂载前缀
+    :param table: 已有路由表(递归使用)
+    :return: 路由表
+    """
+    table = table if table is not None else RouteTable()
+    for route in routes:
+        if isinstance(route, Mount):
+            sub_routes = getattr(route.app, "routes", None)
+            if sub_routes is not None:
+                build_route_table(
+                    sub_routes, public_paths, login_paths, prefix + route.path, table
+                )
+            continue
+        if not isinstance(route, Route) or not route.methods:
+            continue
+        path = prefix + route.path
+        # 路由可通过 openapi_extra={"x-permission": "xxx"} 自定义权限代码
+        openapi_extra = getattr(route, "openapi_extra", None) or {}
+        code = openapi_extra.get("x-permission", path)
+        if any(path.startswith(p) for p in public_paths):
+            level = RouteLevel.public
+        elif path in login_paths:
+            level = RouteLevel.login
+        else:
+            level = RouteLevel.permission
+        table.add(path, route.methods, RouteRule(path=path, code=code, level=level))
+    return table
+
+
+class PermissionMiddleware:
+    """
+    路由级鉴权 ASGI 中间件
+    每个请求只解析一次 token/用户/casbin 决策, 结果存入 request.state.user,
+    免登录路由直接放行, 不再依赖每个接口的 Depends 依赖图
+    """
+
+    def __init__(
+        self,
+        app,
+        resolve_principal: Callable[[str], Awaitable[Any]],
+        check_permission: Callable[[Any, str, str], Awaitable[bool]],
+        public_paths: list[str] | None = None,
+        login_paths: list[str] | None = None,
+        on_startup: Callable[[], Awaitable[None]] | None = None,
+    ):
+        """
+        :param app: 下游 ASGI 应用
+        :param resolve_principal: token -> 用户, 无效时抛异常
+        :param check_permission: (用户, 权限代码, 请求方法) -> 是否允许
+        :param public_paths: 免登录路径前缀
+        :param login_paths: 仅需登录的完整路径模板
+        :param on_startup: 应用启动完成后的回调(如加载 casbin 策略)
+        """
+        self.app = app
+        self.resolve_principal = resolve_principal
+        self.check_permission = check_permission
+        self.public_paths = public_paths or []
+        self.login_paths = login_paths or []
+        self.on_startup = on_startup
+        self.table: RouteTable | None = None
+
+    def build(self, root_app):
+        """根据根应用路由预计算路由表"""
+        self.table = build_route_table(
+            root_app.routes, self.public_paths, self.login_paths
+        )
+        logger.info(f"权限路由表构建完成: {len(self.table)} 条")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.app(scope, receive, self._lifespan_send(scope, send))
+            return
+        # 非http请求与跨域预检请求直接放行
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        if self.table is None:
+            self.build(scope["app"])
+
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path) :]
+        rule = self.table.match(scope["method"], path)
+        # 未注册路由交由应用返回404
+        if rule is None or rule.level == RouteLevel.public:
+            await self.app(scope, receive, send)
+            return
+
+        token = self._get_bearer_token(scope)
+        if not token:
+            await self._deny(scope, receive, send, 401, "Not authenticated")
+            return
+        try:
+            principal = await self.resolve_principal(token)
+        except Exception as e:
+            await self._deny(scope, receive, send, 401, str(e))
+            return
+        if rule.level == RouteLevel.permission:
+            try:
+                allowed = await self.check_permission(
+                    principal, rule.code, scope["method"]
+                )
+            except Exception as e:
+                logger.error(f"权限检查失败: {e}")
+                allowed = False
+            if not allowed:
+                await self._deny(scope, receive, send, 403, "Permission denied")
+                return
+
+        scope.setdefault("state", {})["user"] = principal
+        await self.app(scope, receive, send)
+
+    def _lifespan_send(self, scope, send):
+        """应用启动完成后构建路由表并执行启动回调"""
+
+        async def wrapper(message):
+            if message["type"] == "lifespan.startup.complete":
+                self.build(scope["app"])
+                if self.on_startup:
+                    try:
+                        await self.on_startup()
+                    except Exception as e:
+                        logger.error(f"权限中间件启动回调失败: {e}")
+            await send(message)
+
+        return wrapper
+
+    @staticmethod
+    def _get_bearer_token(scope) -> str | None:
+        for key, value in scope["headers"]:
+            if key == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    return token
+                return None
+        return None
+
+    @staticmethod
+    async def _deny(scope, receive, send, status_code: int, detail: str):
+        headers = {"WWW-Authenticate": "Bearer"} if status_code == 401 else None
+        response = JSONResponse(
+            {"detail": detail}, status_code=status_code, headers=headers
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,34 @@
+from typing import Iterator, TypeVar
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+# IN 子句单批参数数量(兼容 sqlite 变量个数限制)
+IN_BATCH = 500
+
+
+def batched(items: list[T], size: int = IN_BATCH) -> Iterator[list[T]]:
+    """
+    按批切分列表(用于 IN 子句/批量插入)
+    :param items: 列表
+    :param size: 每批数量
+    """
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def insert_ignore(session: AsyncSession, model):
+    """
+    按方言生成主键冲突忽略的 insert 语句(并发插入相同主键)
+    :param session: 数据库会话
+    :param model: 表模型
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return insert(model).prefix_with("IGNORE")
+    return dialect_insert(model).on_conflict_do_nothing()
@@ -0,0 +1,54 @@
+class RangeNotSatisfiable(ValueError):
+    """请求范围无法满足(416)"""
+
+
+def parse_range(range_header: str | None, size: int) -> tuple[int, int] | None:
+    """
+    解析单个 HTTP Range 请求头
+    :param range_header: Range 请求头 如 bytes=0-1023 / bytes=1024- / bytes=-500
+    :param size: 资源总大小
+    :return: (start, end) 闭区间 无 Range、格式不支持或多段范围时返回 None(按整体返回)
+    :raises RangeNotSatisfiable: 范围超出资源大小
+    """
+    if not range_header:
+        return None
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        elif last:
+            # 后缀范围 取最后 N 个字节
+            start = max(size - int(last), 0)
+            end = size - 1
+        else:
+            return None
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(f"bytes */{size}")
+    if start < 0 or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    判断 If-None-Match 是否命中(弱比较)
+    :param if_none_match: If-None-Match 请求头
+    :param etag: 当前资源 ETag(带引号)
+    :return: 是否命中
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == target for tag in if_none_match.split(",")
+    )
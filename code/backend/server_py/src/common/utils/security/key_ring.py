@@ -0,0 +1,218 @@
+from pathlib import Path
+from uuid import uuid4
+import os
+import time
+import threading
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 支持的非对称算法
+ASYMMETRIC_ALGORITHMS = ("ES256", "EdDSA")
+# 轮换锁文件超过该时间(秒)视为残留(持有进程异常退出)
+ROTATE_LOCK_STALE = 30
+
+
+class KeyRing:
+    """
+    JWT 非对称签名密钥环
+    - 私钥以 {kid}.pem 存放在目录中, 多进程/多实例共享同一目录
+    - 最新密钥用于签名, 超过轮换周期自动生成新密钥, 保留最近若干把公钥用于验签
+    - 轮换通过目录中的锁文件(O_EXCL)在进程间串行 加锁后重新加载目录再判断是否仍需轮换
+    - 清理旧密钥时 创建不足 轮换周期 + 令牌有效期 的密钥不删除(其他进程可能仍在用它签名)
+    - 密钥对象启动时解析一次常驻内存, 签名/验签不再重复解析 PEM
+    - JWKS 缓存到下一次轮换前, 供边缘服务本地验签
+    """
+
+    def __init__(
+        self,
+        key_dir: str | Path,
+        algorithm: str = "ES256",
+        rotate_days: int = 30,
+        retain: int = 3,
+        token_ttl_seconds: int = 0,
+    ):
+        """
+        :param key_dir: 密钥目录
+        :param algorithm: ES256 或 EdDSA
+        :param rotate_days: 轮换周期(天)
+        :param retain: 保留的密钥数量(含当前签名密钥) 需覆盖刷新令牌有效期
+        :param token_ttl_seconds: 令牌最长有效期(秒) 密钥创建后至少保留 轮换周期 + 该时长
+        """
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise ValueError(f"不支持的非对称算法: {algorithm}")
+        self.key_dir = Path(key_dir)
+        self.key_dir.mkdir(parents=True, exist_ok=True)
+        self.algorithm = algorithm
+        self.rotate_seconds = rotate_days * 24 * 60 * 60
+        self.retain = max(retain, 1)
+        self.min_key_age = self.rotate_seconds + token_ttl_seconds
+        self._lock_path = self.key_dir / ".rotate.lock"
+        self._lock = threading.Lock()
+        # 进程内轮换互斥(进程间由锁文件串行)
+        self._rotate_mutex = threading.Lock()
+        # kid -> (创建时间, 私钥对象, 公钥对象)
+        self._keys: dict[str, tuple[float, object, object]] = {}
+        self._active_kid: str | None = None
+        self._jwks: dict | None = None
+        # 未知 kid 触发重新加载的最小间隔(秒) 防止伪造 kid 刷盘
+        self._reload_interval = 5
+        self._reload_at = 0.0
+        self.load()
+        if self._active_kid is None:
+            self._rotate_if_due(wait=True)
+
+    def _generate_private_key(self):
+        if self.algorithm == "ES256":
+            return ec.generate_private_key(ec.SECP256R1())
+        return ed25519.Ed25519PrivateKey.generate()
+
+    def load(self):
+        """从目录加载全部密钥"""
+        keys = {}
+        for pem_path in self.key_dir.glob("*.pem"):
+            try:
+                private_key = serialization.load_pem_private_key(
+                    pem_path.read_bytes(), password=None
+                )
+            except Exception as e:
+                logger.error(f"加载签名密钥失败 {pem_path}: {e}")
+                continue
+            keys[pem_path.stem] = (
+                pem_path.stat().st_mtime,
+                private_key,
+                private_key.public_key(),
+            )
+        with self._lock:
+            # 密钥未变化时保留 JWKS 缓存(jwks 定期重新加载)
+            if {k: v[0] for k, v in keys.items()} != {k: v[0] for k, v in self._keys.items()}:
+                self._jwks = None
+            self._keys = keys
+            self._active_kid = max(keys, key=lambda k: keys[k][0]) if keys else None
+            self._reload_at = time.time()
+
+    def _due(self) -> bool:
+        active = self._keys.get(self._active_kid)
+        return active is None or time.time() - active[0] >= self.rotate_seconds
+
+    def _acquire_rotate_lock(self) -> bool:
+        # O_EXCL 创建锁文件 超过 ROTATE_LOCK_STALE 秒的锁视为持有进程已退出
+        for _ in range(2):
+            try:
+                os.close(os.open(self._lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+                return True
+            except FileExistsError:
+                try:
+                    if time.time() - self._lock_path.stat().st_mtime < ROTATE_LOCK_STALE:
+                        return False
+                    self._lock_path.unlink()
+                except FileNotFoundError:
+                    pass
+        return False
+
+    def _rotate_if_due(self, wait: bool = False):
+        """
+        需要时轮换(多进程只有一个进程生成新密钥)
+        :param wait: 锁被占用时等待其他进程生成完成(启动时目录为空必须拿到密钥)
+        """
+        deadline = time.time() + ROTATE_LOCK_STALE
+        while not self._acquire_rotate_lock():
+            # 其他进程正在轮换 使用其结果
+            self.load()
+            if not wait or not self._due() or time.time() > deadline:
+                return
+            time.sleep(0.1)
+        try:
+            self.load()
+            if self._due():
+                self.rotate()
+        finally:
+            self._lock_path.unlink(missing_ok=True)
+
+    def rotate(self) -> str:
+        """生成新的签名密钥 并清理超出保留数量且足够旧的密钥(调用方负责进程间串行)"""
+        private_key = self._generate_private_key()
+        kid = f"{int(time.time())}-{uuid4().hex[:8]}"
+        pem = private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+        # 先写临时文件再原子替换 避免其他进程读到半个文件
+        tmp_path = self.key_dir / f"{kid}.tmp"
+        tmp_path.write_bytes(pem)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, self.key_dir / f"{kid}.pem")
+        logger.info(f"JWT签名密钥已轮换: {kid}")
+        self.load()
+        self._prune()
+        return kid
+
+    def _prune(self):
+        now = time.time()
+        with self._lock:
+            kids = sorted(self._keys, key=lambda k: self._keys[k][0], reverse=True)
+            # 超出保留数量 且创建已超过 轮换周期 + 令牌有效期(不会再有进程用它签名 签出的令牌也已过期)
+            expired = [
+                kid
+                for kid in kids[self.retain :]
+                if now - self._keys[kid][0] >= self.min_key_age
+            ]
+            for kid in expired:
+                self._keys.pop(kid, None)
+            self._jwks = None
+        for kid in expired:
+            try:
+                (self.key_dir / f"{kid}.pem").unlink()
+            except FileNotFoundError:
+                pass
+
+    def signing_key(self) -> tuple[str, object]:
+        """
+        获取当前签名密钥 超过轮换周期自动轮换
+        多进程同时到期时只有拿到锁文件的进程生成新密钥 其他进程重新加载后使用新密钥
+        :return: (kid, 私钥对象)
+        """
+        if self._due():
+            with self._rotate_mutex:
+                if self._due():
+                    self._rotate_if_due()
+        with self._lock:
+            kid = self._active_kid
+            return kid, self._keys[kid][1]
+
+    def verifying_key(self, kid: str | None) -> object | None:
+        """
+        根据 kid 获取验签公钥 未知 kid 时(其他进程已轮换)限频重新加载目录
+        :param kid: 令牌头中的 kid
+        :return: 公钥对象 不存在返回 None
+        """
+        if not kid:
+            return None
+        key = self._keys.get(kid)
+        if key is None and time.time() - self._reload_at >= self._reload_interval:
+            self.load()
+            key = self._keys.get(kid)
+        return key[2] if key else None
+
+    def jwks(self) -> dict:
+        """
+        JWKS 公钥集合 结果缓存到下一次密钥变更
+        与 verifying_key 相同限频重新加载目录 其他进程轮换的新 kid 及时对外发布
+        """
+        if time.time() - self._reload_at >= self._reload_interval:
+            self.load()
+        jwks = self._jwks
+        if jwks is None:
+            algorithm_cls = ECAlgorithm if self.algorithm == "ES256" else OKPAlgorithm
+            keys = []
+            for kid, (_, _, public_key) in self._keys.items():
+                jwk = algorithm_cls.to_jwk(public_key, as_dict=True)
+                jwk.update({"kid": kid, "alg": self.algorithm, "use": "sig"})
+                keys.append(jwk)
+            jwks = {"keys": keys}
+            self._jwks = jwks
+        return jwks
@@ -3,6 +3,7 @@ from fastapi import HTTPException, Request
 import jwt
 from pydantic import BaseModel
 from enum import StrEnum
+from common.utils.security.key_ring import KeyRing
 
 
 class TokenType(StrEnum):
@@ -16,9 +17,16 @@ class TokenConfig(BaseModel):
     """
 
     secret: str
+    # HS256 对称签名; ES256/EdDSA 非对称签名(密钥环轮换)
     algorithm: str = "HS256"
     expire_minutes: int = 30
     refresh_expire_days: int = 7
+    # 非对称签名密钥目录
+    key_dir: str | None = None
+    # 非对称密钥轮换周期(天)
+    key_rotate_days: int = 30
+    # 非对称密钥保留数量(含当前签名密钥)
+    key_retain: int = 3
 
 
 class TokenUtil:
@@ -28,18 +36,48 @@ class TokenUtil:
     前后端传输不考虑加密，https更好，数据库可以考虑。
     """
 
-    def __init__(self, config: TokenConfig):
+    def __init__(self, config: TokenConfig, key_ring: KeyRing | None = None):
         """
         初始化 TokenUtil 实例。
         :param config: Token配置对象
+        :param key_ring: 非对称签名密钥环(ES256/EdDSA), 为空时使用 secret 对称签名
         """
         self.SECRET_KEY = config.secret
         self.ALGORITHM = config.algorithm
         self.ACCESS_TOKEN_EXPIRE_MINUTES = config.expire_minutes
         self.REFRESH_TOKEN_EXPIRE_DAYS = config.refresh_expire_days
+        self.key_ring = key_ring
         # 加密 密码加密 Header和Payload部分分别进行Base64Url编码成消息字符串。
         # 使用指定的算法(例如HMAC SHA256)和密钥对消息字符串进行签名
 
+    def encode(self, data: dict) -> str:
+        """
+        签名 非对称签名时在头部写入 kid
+        :param data: 载荷
+        :return: JWT 字符串
+        """
+        if self.key_ring is None:
+            return jwt.encode(data, self.SECRET_KEY, algorithm=self.ALGORITHM)
+        kid, private_key = self.key_ring.signing_key()
+        return jwt.encode(
+            data, private_key, algorithm=self.ALGORITHM, headers={"kid": kid}
+        )
+
+    def decode(self, token: str) -> dict:
+        """
+        验签并解码 非对称签名时按 kid 取已解析的公钥对象
+        :param token: JWT 字符串
+        :return: 载荷
+        :raises: jwt.InvalidTokenError 令牌无效或过期
+        """
+        if self.key_ring is None:
+            return jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
+        kid = jwt.get_unverified_header(token).get("kid")
+        public_key = self.key_ring.verifying_key(kid)
+        if public_key is None:
+            raise jwt.InvalidTokenError(f"Unknown kid: {kid}")
+        return jwt.decode(token, public_key, algorithms=[self.ALGORITHM])
+
     def data2token(self, data: dict) -> str:
         """
         创建一个带有过期时间的 JWT。
@@ -51,7 +89,7 @@ class TokenUtil:
         )
         data.update({"exp": expire})
         # 加密
-        encoded_jwt = jwt.encode(data, self.SECRET_KEY, algorithm=self.ALGORITHM)
+        encoded_jwt = self.encode(data)
         return encoded_jwt
 
     def token_request2data(self, request: Request):
@@ -75,9 +113,7 @@ class TokenUtil:
             raise HTTPException(status_code=401, detail="无效的Token")
         try:
             # 解码 JWT  保证不被篡改
-            data_decoded = jwt.decode(
-                token, self.SECRET_KEY, algorithms=[self.ALGORITHM]
-            )
+            data_decoded = self.decode(token)
             return data_decoded
         except jwt.exceptions.InvalidTokenError:
             raise HTTPException(
@@ -138,22 +174,22 @@ class TokenUtil:
         if additional_data:
             to_encode.update(additional_data)
 
-        return jwt.encode(to_encode, self.SECRET_KEY, algorithm=self.ALGORITHM)
+        return self.encode(to_encode)
 
     def verify_token(self, token: str):
         """
         验证令牌
         :param token: 要验证的令牌
         :return: 令牌中的载荷数据
-        :raises: jwt.JWTError 如果令牌无效或过期
+        :raises: jwt.InvalidTokenError 如果令牌无效或过期
         """
         try:
-            payload = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
+            payload = self.decode(token)
             return payload
         except jwt.ExpiredSignatureError:
-            raise jwt.JWTError("Token has expired")
+            raise jwt.ExpiredSignatureError("Token has expired")
         except jwt.InvalidTokenError:
-            raise jwt.JWTError("Invalid token")
+            raise jwt.InvalidTokenError("Invalid token")
 
     def get_token_expiry(self, token_type=TokenType.access):
         """
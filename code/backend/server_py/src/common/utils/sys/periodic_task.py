@@ -0,0 +1,53 @@
+import asyncio
+from typing import Awaitable, Callable
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    后台定时任务 通过 lifespan 的 startup_hooks/shutdown_hooks 注册 start/stop
+    单轮执行异常只记录日志 不中断后续轮次
+    """
+
+    def __init__(
+        self,
+        func: Callable[[], Awaitable[object]],
+        interval_seconds: float,
+        name: str | None = None,
+    ):
+        """
+        :param func: 每轮执行的异步函数
+        :param interval_seconds: 执行周期(秒)
+        :param name: 任务名称(日志用)
+        """
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.name = name or getattr(func, "__qualname__", "periodic_task")
+        self._task: asyncio.Task | None = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.func()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"后台任务 {self.name} 执行失败: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def start(self):
+        """启动后台任务"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self):
+        """停止后台任务"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
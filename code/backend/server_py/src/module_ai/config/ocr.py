@@ -1,5 +1,8 @@
 from common.config.index import conf
-from common.config.path import DIR_MODEL
+from common.config.path import DIR_MODEL, DIR_TEMP
+from module_ai.do.ocr import InpaintMode
+import hashlib
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,3 +22,42 @@ conf_ocr_models = conf_ocr.models
 # layout 模型
 conf_ocr_models_layout = conf_ocr_models.layout
 path_lout_model = DIR_OCR_MODEL / conf_ocr_models_layout
+
+# 推理线程池 执行中(workers) + 排队(max_queue) 超出时返回 429
+conf_ocr_pool = conf_ocr.get("pool") or {}
+OCR_POOL_WORKERS: int = conf_ocr_pool.get("workers", 2)
+OCR_POOL_MAX_QUEUE: int = conf_ocr_pool.get("max_queue", 8)
+
+# 低置信度重试策略 按接口配置(default/ocr/tupu/all) 未配置的接口使用 default
+conf_ocr_retry = conf_ocr.get("retry") or {}
+
+# 去除文字生成背景的默认方式 ns/telea/fill (请求可单独指定)
+OCR_INPAINT_MODE = InpaintMode(conf_ocr.get("inpaint_mode", InpaintMode.NS.value))
+
+# /ocr/all 结果缓存(按解码后像素 + 参数寻址) 本地磁盘 JSON/PNG
+# max_mb 为整个缓存目录的上限(多个 worker 共享目录 写入时扫描目录淘汰)
+conf_ocr_cache = conf_ocr.get("cache") or {}
+OCR_CACHE_ENABLED: bool = conf_ocr_cache.get("enabled", True)
+DIR_OCR_CACHE = DIR_TEMP / conf_ocr_cache.get("dir", "ocr_cache")
+OCR_CACHE_MAX_BYTES: int = int(conf_ocr_cache.get("max_mb", 512)) * 1024 * 1024
+OCR_CACHE_MEMORY_ITEMS: int = conf_ocr_cache.get("memory_items", 64)
+
+
+def _model_fingerprint() -> str:
+    """
+    ocr 配置(模型/语言/推理参数 不含线程池与缓存) + 模型文件(路径、大小、修改时间)的指纹
+    写入缓存键 替换模型或修改配置后旧缓存不再命中
+    """
+    hasher = hashlib.sha256()
+    settings = {key: val for key, val in conf_ocr.items() if key.lower() not in ("pool", "cache")}
+    hasher.update(json.dumps(settings, sort_keys=True, default=str).encode())
+    if DIR_OCR_MODEL.exists():
+        for path in sorted(DIR_OCR_MODEL.rglob("*")):
+            if path.is_file():
+                stat = path.stat()
+                hasher.update(f"{path.relative_to(DIR_OCR_MODEL)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return hasher.hexdigest()
+
+
+# 模型加载于启动时 指纹同样只在启动时计算
+OCR_MODEL_FINGERPRINT = _model_fingerprint()
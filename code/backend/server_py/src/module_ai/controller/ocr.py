@@ -33,8 +33,10 @@ async def ocr(
     try:
         image_bytes = await image.read()
         image_cv = bytes_to_cv2(image_bytes)
-        result = ocr_service.ocr(image_cv, True, True, lang)
+        result = await ocr_service.ocr(image_cv, True, True, lang)
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
@@ -50,8 +52,10 @@ async def tupu(
     try:
         image_bytes = await image.read()
         image_cv: Mat = bytes_to_cv2(image_bytes)
-        result = ocr_service.ocr_tupu(image_cv, True, True, lang)
+        result = await ocr_service.ocr_tupu(image_cv, True, True, lang)
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
@@ -65,7 +69,7 @@ async def layout(
     try:
         image_bytes = await image.read()
         image_cv: Mat = bytes_to_cv2(image_bytes)
-        boxes, scores, class_names, elapse = ocr_service.layout(image_cv)
+        boxes, scores, class_names, elapse = await ocr_service.layout(image_cv)
         result = {
             "boxes": boxes.tolist(),
             "scores": scores.tolist(),
@@ -73,6 +77,8 @@ async def layout(
             "elapse": elapse,
         }
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
@@ -92,6 +98,8 @@ async def ocr_all(
         image_cv: Mat = bytes_to_cv2(image_bytes)
         result = await ocr_service.ocr_all(image_cv, True, True, lang, False)
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
@@ -108,6 +116,13 @@ def get_languages():
     except Exception as e:
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
+
+@router.get("/stats", summary="推理队列、重试与缓存统计")
+def get_stats(ocr_service: OcrService = Depends(get_ocr_service)):
+    """返回推理线程池排队/拒绝/耗时统计 低置信度重试命中率 与结果缓存命中率"""
+    return ocr_service.stats()
+
+
 @router.post(
     "/all_base64",
     status_code=status.HTTP_201_CREATED,
@@ -120,10 +135,14 @@ async def ocr_base64(
     try:
         image_bytes = base64.b64decode(base64_file.image_base64)
         image_cv: Mat = bytes_to_cv2(image_bytes)
+        # inpaint_mode 为空时使用配置的默认方式
+        inpaint = (base64_file.inpaint_mode or True) if base64_file.inpaint else False
         result = await ocr_service.ocr_all(
-            image_cv, True, True, base64_file.lang, base64_file.inpaint
+            image_cv, True, True, base64_file.lang, inpaint
         )
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(500, str(e))
 
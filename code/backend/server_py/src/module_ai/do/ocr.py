@@ -1,6 +1,31 @@
 
-from pydantic import BaseModel
+from enum import Enum
+from pydantic import BaseModel, Field
+
+
+class InpaintMode(str, Enum):
+    """去除文字生成背景的方式"""
+
+    NS = "ns"  # Navier-Stokes 效果最好 最慢
+    TELEA = "telea"  # Telea 大字缩小后修复 较快
+    FILL = "fill"  # 文字框周围平均色填充 最快
+
+
 class Base64File(BaseModel):
     image_base64: str
     lang: str
-    inpaint:bool = False
\ No newline at end of file
+    inpaint:bool = False
+    inpaint_mode: InpaintMode | None = None
+
+
+class RetryPolicy(BaseModel):
+    """
+    低置信度文本行重试策略(换多组截取参数重新识别) 用精度换吞吐
+    """
+
+    threshold: float = Field(default=0.97, description="置信度不高于该值的文本行重试")
+    target: float = Field(default=0.99, description="达到该置信度后不再尝试其余参数")
+    max_lines: int | None = Field(
+        default=64, ge=0, description="单次请求最多重试的行数(置信度最低优先) 0为不重试 None不限"
+    )
+    variants: int = Field(default=3, ge=0, le=3, description="最多尝试的截取参数组数")
@@ -1,15 +1,126 @@
+from fastapi import HTTPException
+import asyncio
+from common.config.lifespan import shutdown_hooks
+from module_ai.do.ocr import RetryPolicy
 from module_ai.utils.onnx.ocr_rapid.rapidocr.main import detect_recognize
+from module_ai.utils.onnx.ocr_rapid.rapidocr.rapid_ocr_api import retry_stats
 
 from module_ai.utils.onnx.ocr_rapid.rapid_layout import RapidLayout
 from module_ai.utils.onnx.ocr_rapid.tbpu.parser_multi_para import MultiPara
+from module_ai.utils.onnx.inference_pool import InferencePool, InferencePoolBusy
+from module_ai.utils.result_cache import ResultCache
 
-from module_ai.config.ocr import path_lout_model
+from module_ai.config.ocr import (
+    path_lout_model,
+    OCR_POOL_WORKERS,
+    OCR_POOL_MAX_QUEUE,
+    conf_ocr_retry,
+    OCR_INPAINT_MODE,
+    OCR_MODEL_FINGERPRINT,
+    OCR_CACHE_ENABLED,
+    DIR_OCR_CACHE,
+    OCR_CACHE_MAX_BYTES,
+    OCR_CACHE_MEMORY_ITEMS,
+)
 
 tupu_use = MultiPara()
 layout_engine = RapidLayout(model_path=path_lout_model)
+# 推理线程池(每个worker一个) 模型在线程间共享 推理不阻塞事件循环
+ocr_pool = InferencePool(OCR_POOL_WORKERS, OCR_POOL_MAX_QUEUE, name="ocr")
+shutdown_hooks.append(ocr_pool.shutdown)
+# /ocr/all 结果缓存 重复提交的同一图片直接返回
+ocr_cache = (
+    ResultCache(DIR_OCR_CACHE, OCR_CACHE_MAX_BYTES, OCR_CACHE_MEMORY_ITEMS)
+    if OCR_CACHE_ENABLED
+    else None
+)
+# 识别中的请求(同一图片并发请求只识别一次)
+_inflight: dict[str, asyncio.Future] = {}
+
+
+def _retry_policy(endpoint: str) -> RetryPolicy | None:
+    # 接口配置覆盖 default 都未配置时使用模型的默认策略
+    default = conf_ocr_retry.get("default")
+    override = conf_ocr_retry.get(endpoint)
+    if default is None and override is None:
+        return None
+    return RetryPolicy(**{**dict(default or {}), **dict(override or {})})
+
+
+# 各接口的重试策略 按精度/吞吐需求分别配置
+retry_policies = {
+    endpoint: _retry_policy(endpoint) for endpoint in ("ocr", "tupu", "all")
+}
+
+
+def _ocr(image_cv: any, detect: bool, classify: bool, lang: str, inpaint=False, retry=None):
+    # 开始识别 ocr ja true true
+    result = detect_recognize(
+        image_cv, lang=lang, detect=detect, classify=classify, inpaint=inpaint, retry=retry
+    )
+    results = result["results"]
+    # 循环修改results中的每个元素
+    for i in range(len(results)):
+        resultOne = results[i]
+        resultOne["box"] = resultOne["box"].tolist()
+        # numpy.float32转float
+        resultOne["score"] = float(resultOne["score"])
+    return result
+
+
+def _ocr_tupu(image_cv: any, detect: bool, classify: bool, lang: str, inpaint=False, retry=None):
+    result = _ocr(image_cv, detect, classify, lang, inpaint=inpaint, retry=retry)
+    results = result["results"]
+    if len(results) > 0:
+        result["results"] = tupu_use.run(results)
+    return result
+
+
+def _ocr_all(image_cv: any, detect: bool, classify: bool, lang: str, inpaint=False, retry=None):
+    # 1 ocr_tupu
+    result = _ocr_tupu(image_cv, detect, classify, lang, inpaint=inpaint, retry=retry)
+    boxes, scores, class_names, elapse = layout_engine.check(image_cv)
+    layout = []
+    i = 0
+    for class_name in class_names:
+        # 如果是图片、表格或目录，则将bbox添加到结果中
+        if (
+            class_name == "Title"
+            or class_name == "Figure"
+            or class_name == "Table"
+            or class_name == "Toc"
+        ):
+            layout.append(boxes[i].tolist())
+        i = i + 1
+    result["layout"] = layout
+    return result
+
 
 class OcrService:
-    def ocr(self,image_cv: any, detect: bool, classify: bool, lang: str, inpaint=False):
+    async def _run(self, func, *args, **kwargs):
+        """在推理线程池中执行 队列已满时返回 429"""
+        try:
+            return await ocr_pool.run(func, *args, **kwargs)
+        except InferencePoolBusy as e:
+            raise HTTPException(
+                status_code=429, detail=str(e), headers={"Retry-After": "1"}
+            )
+
+    async def _run_ocr(self, func, *args, **kwargs):
+        result, queue_wait = await self._run(func, *args, **kwargs)
+        # 排队耗时单独记录 不计入 total(推理耗时)
+        result["ts"]["queue"] = queue_wait
+        return result
+
+    async def ocr(
+        self,
+        image_cv: any,
+        detect: bool,
+        classify: bool,
+        lang: str,
+        inpaint=False,
+        retry: RetryPolicy | None = None,
+    ):
         """执行文字识别(OCR)处理，支持多语言识别、文本检测和分类
 
         Args:
@@ -17,50 +128,81 @@ class OcrService:
             detect (bool): 是否启用文本检测(定位文字区域)
             classify (bool): 是否启用文本分类(识别文本类型如标题/正文)
             lang (str): 目标语言代码(如'en'/'zh')，支持多语言混合识别
-            inpaint (bool, optional): 是否启用图像去除检测位置，默认False
+            inpaint (bool | InpaintMode, optional): 是否启用图像去除检测位置，默认False 可指定去除方式
+            retry (RetryPolicy, optional): 低置信度重试策略，默认使用接口配置
         """
-        # 开始识别 ocr ja true true
-        result = detect_recognize(
-            image_cv, lang=lang, detect=detect, classify=classify, inpaint=inpaint
+        return await self._run_ocr(
+            _ocr, image_cv, detect, classify, lang, inpaint, retry or retry_policies["ocr"]
         )
-        results = result["results"]
-        # 循环修改results中的每个元素
-        for i in range(len(results)):
-            resultOne = results[i]
-            resultOne["box"] = resultOne["box"].tolist()
-            # numpy.float32转float
-            resultOne["score"] = float(resultOne["score"])
-        return result
-    def ocr_tupu(self,image_cv: any, detect: bool, classify: bool, lang: str, inpaint=False):
+
+    async def ocr_tupu(
+        self,
+        image_cv: any,
+        detect: bool,
+        classify: bool,
+        lang: str,
+        inpaint=False,
+        retry: RetryPolicy | None = None,
+    ):
         """执行文字识别/分栏分段"""
-        result = self.ocr(image_cv, detect, classify, lang, inpaint=inpaint)
-        results = result["results"]
-        if len(results) > 0:
-            result["results"] = tupu_use.run(results)
-        return result
+        return await self._run_ocr(
+            _ocr_tupu, image_cv, detect, classify, lang, inpaint, retry or retry_policies["tupu"]
+        )
 
-    def layout(self,image_cv: any):
+    async def layout(self, image_cv: any):
         """版面分析"""
-        boxes, scores, class_names, elapse = layout_engine.check(image_cv)
+        (boxes, scores, class_names, elapse), _ = await self._run(
+            layout_engine.check, image_cv
+        )
         return boxes, scores, class_names, elapse
 
+    async def ocr_all(
+        self,
+        image_cv: any,
+        detect: bool,
+        classify: bool,
+        lang: str,
+        inpaint=False,
+        retry: RetryPolicy | None = None,
+    ):
+        """执行文字识别/分栏分段/版面分析 相同图片与参数的结果走缓存"""
+        retry = retry or retry_policies["all"]
+        if ocr_cache is None:
+            return await self._run_ocr(_ocr_all, image_cv, detect, classify, lang, inpaint, retry)
+        # 像素哈希与读盘不阻塞事件循环
+        key = await asyncio.to_thread(
+            ocr_cache.make_key,
+            image_cv,
+            detect=detect,
+            classify=classify,
+            lang=lang,
+            inpaint=OCR_INPAINT_MODE if inpaint is True else inpaint,
+            retry=retry.model_dump() if retry else None,
+            models=OCR_MODEL_FINGERPRINT,
+        )
+        result = await asyncio.to_thread(ocr_cache.get, key)
+        if result is not None:
+            result["ts"]["queue"] = 0.0
+            return result
+        future = _inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(
+                self._ocr_all_cached(key, image_cv, detect, classify, lang, inpaint, retry)
+            )
+            _inflight[key] = future
+            future.add_done_callback(lambda _: _inflight.pop(key, None))
+        # shield: 单个请求断开不取消其他请求共享的识别任务
+        return await asyncio.shield(future)
 
-    async def ocr_all(self,image_cv: any, detect: bool, classify: bool, lang: str, inpaint=False):
-        """执行文字识别/分栏分段/版面分析"""
-        # 1 ocr_tupu
-        result = self.ocr_tupu(image_cv, detect, classify, lang, inpaint=inpaint)
-        boxes, scores, class_names, elapse = layout_engine.check(image_cv)
-        layout = []
-        i = 0
-        for class_name in class_names:
-            # 如果是图片、表格或目录，则将bbox添加到结果中
-            if (
-                class_name == "Title"
-                or class_name == "Figure"
-                or class_name == "Table"
-                or class_name == "Toc"
-            ):
-                layout.append(boxes[i].tolist())
-            i = i + 1
-        result["layout"] = layout
+    async def _ocr_all_cached(self, key: str, *args):
+        result = await self._run_ocr(_ocr_all, *args)
+        await asyncio.to_thread(ocr_cache.put, key, result)
         return result
+
+    def stats(self) -> dict:
+        """推理线程池统计(排队/拒绝/耗时) 低置信度重试统计(命中率) 与结果缓存统计"""
+        return {
+            "pool": ocr_pool.stats(),
+            "retry": retry_stats.snapshot(),
+            "cache": ocr_cache.stats() if ocr_cache else None,
+        }
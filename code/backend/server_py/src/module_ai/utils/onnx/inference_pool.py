@@ -0,0 +1,108 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class InferencePoolBusy(Exception):
+    """推理池已饱和(执行中 + 排队 达到上限)"""
+
+
+class InferencePool:
+    """
+    ONNX 推理线程池
+    onnxruntime 推理、cv2 图像处理时释放 GIL 线程池即可并行 模型在进程内共享只加载一次
+    有界队列: 执行中 + 排队 超过上限时立即拒绝(由调用方返回 429) 不无限堆积请求
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, name: str = "inference"):
+        """
+        :param max_workers: 并行推理线程数
+        :param max_queue: 最大排队数(不含执行中)
+        :param name: 线程名前缀(日志用)
+        """
+        self.max_workers = max(max_workers, 1)
+        self.max_queue = max(max_queue, 0)
+        self.name = name
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending = 0
+        # 统计
+        self._submitted = 0
+        self._rejected = 0
+        self._failed = 0
+        self._completed = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+        self._exec_total = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix=self.name
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> tuple[Any, float]:
+        """
+        在推理线程中执行
+        :param func: 同步推理函数
+        :return: (函数返回值, 排队等待秒数)
+        """
+        if self._pending >= self.max_workers + self.max_queue:
+            self._rejected += 1
+            raise InferencePoolBusy(f"{self.name} 推理队列已满({self._pending})")
+        self._pending += 1
+        self._submitted += 1
+        loop = asyncio.get_running_loop()
+        timing = {"submitted": time.perf_counter()}
+
+        def job():
+            timing["started"] = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timing["finished"] = time.perf_counter()
+
+        def release(future: Future):
+            # 在事件循环线程中统计 请求取消时线程中已开始的任务仍会执行完 完成后才释放名额
+            self._pending -= 1
+            if "started" not in timing:
+                return
+            queue_wait = timing["started"] - timing["submitted"]
+            self._queue_wait_total += queue_wait
+            self._queue_wait_max = max(self._queue_wait_max, queue_wait)
+            self._exec_total += timing["finished"] - timing["started"]
+            if future.exception() is None:
+                self._completed += 1
+            else:
+                self._failed += 1
+
+        future = self._get_executor().submit(job)
+        future.add_done_callback(lambda f: loop.call_soon_threadsafe(release, f))
+        result = await asyncio.wrap_future(future)
+        return result, timing["started"] - timing["submitted"]
+
+    def stats(self) -> dict:
+        """运行统计"""
+        finished = self._completed + self._failed
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "submitted": self._submitted,
+            "rejected": self._rejected,
+            "completed": self._completed,
+            "failed": self._failed,
+            "queue_wait_avg": self._queue_wait_total / finished if finished else 0.0,
+            "queue_wait_max": self._queue_wait_max,
+            "exec_avg": self._exec_total / finished if finished else 0.0,
+        }
+
+    async def shutdown(self):
+        """关闭线程池(lifespan shutdown_hooks)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
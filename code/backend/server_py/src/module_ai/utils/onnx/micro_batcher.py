@@ -0,0 +1,104 @@
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    跨请求微批处理
+    多个推理线程提交的样本按分组键(如宽度桶)汇总 凑满 max_batch 或最早样本等待超过 max_wait_ms 时
+    由调度线程合并为一次推理 结果按样本分发回各提交线程
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[Hashable, list[Any]], list[Any]],
+        max_batch: int = 32,
+        max_wait_ms: float = 5,
+        name: str = "micro_batcher",
+    ):
+        """
+        :param run_batch: 批推理函数 (分组键, 样本列表) -> 结果列表(与样本一一对应)
+        :param max_batch: 单批最大样本数 可为 callable(分组键) -> 该组最大样本数
+        :param max_wait_ms: 样本最长等待凑批时间(毫秒)
+        :param name: 调度线程名
+        """
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self._groups: dict[Hashable, deque[tuple[float, Any, Future]]] = {}
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def _batch_limit(self, key: Hashable) -> int:
+        limit = self.max_batch(key) if callable(self.max_batch) else self.max_batch
+        return max(int(limit), 1)
+
+    def submit(self, items: list[tuple[Hashable, Any]]) -> list[Any]:
+        """
+        提交样本并阻塞等待结果(在推理线程中调用)
+        :param items: [(分组键, 样本)]
+        :return: 与 items 一一对应的结果
+        """
+        now = time.perf_counter()
+        futures = []
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._thread.start()
+            for key, sample in items:
+                future = Future()
+                self._groups.setdefault(key, deque()).append((now, sample, future))
+                futures.append(future)
+            self._cond.notify()
+        return [future.result() for future in futures]
+
+    def _take_ready(self) -> tuple[Hashable, list] | None:
+        # 优先取已凑满的组 其次取最早样本已超时的组
+        now = time.perf_counter()
+        expired_key, expired_at = None, None
+        for key, queue in self._groups.items():
+            if len(queue) >= self._batch_limit(key):
+                expired_key = key
+                break
+            if queue[0][0] + self.max_wait <= now and (
+                expired_at is None or queue[0][0] < expired_at
+            ):
+                expired_key, expired_at = key, queue[0][0]
+        if expired_key is None:
+            return None
+        queue = self._groups[expired_key]
+        batch = [queue.popleft() for _ in range(min(len(queue), self._batch_limit(expired_key)))]
+        if not queue:
+            del self._groups[expired_key]
+        return expired_key, batch
+
+    def _next_timeout(self) -> float | None:
+        if not self._groups:
+            return None
+        oldest = min(queue[0][0] for queue in self._groups.values())
+        return max(oldest + self.max_wait - time.perf_counter(), 0)
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                ready = self._take_ready()
+                while ready is None:
+                    self._cond.wait(self._next_timeout())
+                    ready = self._take_ready()
+            key, batch = ready
+            try:
+                results = self.run_batch(key, [sample for _, sample, _ in batch])
+            except Exception as e:
+                logger.error(f"{self.name} 批推理失败({len(batch)}): {e}")
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, _, future), result in zip(batch, results):
+                future.set_result(result)
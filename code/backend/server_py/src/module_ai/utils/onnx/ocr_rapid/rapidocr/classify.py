@@ -1,4 +1,3 @@
-import copy
 import json
 import cv2
 import numpy as np
@@ -96,8 +95,8 @@ class TextClassifier:
         if isinstance(img_list, np.ndarray):
             img_list = [img_list]
 
-        # 深拷贝图像列表，避免修改原图
-        img_list = copy.deepcopy(img_list)
+        # 浅拷贝图像列表 旋转时替换元素(cv2.rotate 返回新图) 不修改原图
+        img_list = list(img_list)
 
         # 计算所有文本区域的宽高比
         width_list = [img.shape[1] / float(img.shape[0]) for img in img_list]
@@ -0,0 +1,154 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import cv2
+import numpy as np
+
+# 轴对齐判定容差(像素) 四边与坐标轴偏差不超过该值时直接切片
+AXIS_ALIGNED_TOLERANCE = 1.0
+# 低于该高度的文本行用 INTER_CUBIC(小字后续放大较多 保留细节) 其余 INTER_LINEAR
+CUBIC_MAX_HEIGHT = 16
+# 文本框数量达到该值时多线程截取(cv2 处理时释放 GIL)
+PARALLEL_MIN_BOXES = 64
+
+_crop_executor: ThreadPoolExecutor | None = None
+
+
+def _get_crop_executor() -> ThreadPoolExecutor:
+    global _crop_executor
+    if _crop_executor is None:
+        _crop_executor = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 1, thread_name_prefix="ocr_crop"
+        )
+    return _crop_executor
+
+
+def expand_box(points: np.ndarray, params_retry) -> tuple[np.ndarray, int, int]:
+    """
+    按重试参数扩展文本框(不修改原框)
+    :param points: 文本框四点 [4, 2]
+    :param params_retry: [x方向倍数, y方向倍数, x方向留白倍数, y方向留白倍数]
+    :return: (扩展后的四点, x方向留白, y方向留白)
+    """
+    img_crop_height = int(
+        max(
+            np.linalg.norm(points[0] - points[3]),
+            np.linalg.norm(points[1] - points[2]),
+        )
+    )
+    # x方向倍数
+    tempAddX = img_crop_height * params_retry[0]
+    tempAddY = img_crop_height * params_retry[1]
+    paddingX = int(img_crop_height * params_retry[2])
+    paddingY = int(img_crop_height * params_retry[3])
+    offsets = np.array(
+        [
+            [-tempAddX + img_crop_height * 0.02, -tempAddY],
+            [tempAddX + img_crop_height * 0.04, -tempAddY],
+            [tempAddX + img_crop_height * 0.04, tempAddY],
+            [-tempAddX + img_crop_height * 0.02, tempAddY],
+        ]
+    )
+    return np.float32(points + offsets), paddingX, paddingY
+
+
+def _axis_aligned_rect(points: np.ndarray, img_shape) -> tuple[int, int, int, int] | None:
+    # 上下边水平、左右边竖直 且在图像内 返回 (x0, y0, x1, y1)
+    tol = AXIS_ALIGNED_TOLERANCE
+    if (
+        abs(points[0][1] - points[1][1]) > tol
+        or abs(points[3][1] - points[2][1]) > tol
+        or abs(points[0][0] - points[3][0]) > tol
+        or abs(points[1][0] - points[2][0]) > tol
+    ):
+        return None
+    x0 = int(round((points[0][0] + points[3][0]) / 2))
+    x1 = int(round((points[1][0] + points[2][0]) / 2))
+    y0 = int(round((points[0][1] + points[1][1]) / 2))
+    y1 = int(round((points[3][1] + points[2][1]) / 2))
+    h, w = img_shape[:2]
+    if x0 < 0 or y0 < 0 or x1 > w or y1 > h or x1 <= x0 or y1 <= y0:
+        return None
+    return x0, y0, x1, y1
+
+
+def get_rotate_crop_image(img, points, params_retry=None):
+    """根据box定义, 从图像中截取相应的部分, 通过透视变换转换为标准长方形图像"""
+    paddingX = paddingY = 0
+    # 新参数检测
+    if params_retry:
+        points, paddingX, paddingY = expand_box(points, params_retry)
+    else:
+        points = np.float32(points)
+
+    rect = _axis_aligned_rect(points, img.shape)
+    if rect is not None:
+        # 近水平文本框直接切片(整数坐标时与透视变换结果一致)
+        x0, y0, x1, y1 = rect
+        dst_img = img[y0:y1, x0:x1]
+    else:
+        img_crop_width = int(
+            max(
+                np.linalg.norm(points[0] - points[1]),
+                np.linalg.norm(points[2] - points[3]),
+            )
+        )
+        img_crop_height = int(
+            max(
+                np.linalg.norm(points[0] - points[3]),
+                np.linalg.norm(points[1] - points[2]),
+            )
+        )
+        pts_std = np.float32(
+            [
+                [0, 0],
+                [img_crop_width, 0],
+                [img_crop_width, img_crop_height],
+                [0, img_crop_height],
+            ]
+        )
+        # 最终检测单句 截取尺寸与框边长一致 基本不放大 线性插值即可
+        transform = cv2.getPerspectiveTransform(points, pts_std)
+        dst_img = cv2.warpPerspective(
+            img,
+            transform,
+            (img_crop_width, img_crop_height),
+            borderMode=cv2.BORDER_REPLICATE,
+            flags=cv2.INTER_CUBIC
+            if img_crop_height < CUBIC_MAX_HEIGHT
+            else cv2.INTER_LINEAR,
+        )
+
+    if params_retry:
+        dst_img = cv2.copyMakeBorder(
+            dst_img,
+            paddingY,
+            paddingY,
+            paddingX,
+            paddingX,
+            cv2.BORDER_CONSTANT,
+            value=(255, 255, 255),
+        )
+
+    dst_img_height, dst_img_width = dst_img.shape[:2]
+    # 将竖向的文字方向转为横向, 仅当 高>1.5*宽 时进行转换
+    if dst_img_height * 1.0 / dst_img_width >= 1.5:
+        dst_img = np.rot90(dst_img)
+    return dst_img
+
+
+def get_crop_img_list(img, dt_boxes, params_retry=None) -> list[np.ndarray]:
+    """
+    截取所有文本框 框较多时多线程截取
+    :param img: 原图
+    :param dt_boxes: 文本框列表
+    :param params_retry: 重试扩展参数(可选)
+    :return: 文本行图像列表(与文本框一一对应 切片结果为原图视图 不可原地修改)
+    """
+    if len(dt_boxes) < PARALLEL_MIN_BOXES or (os.cpu_count() or 1) < 2:
+        return [get_rotate_crop_image(img, box, params_retry) for box in dt_boxes]
+    return list(
+        _get_crop_executor().map(
+            lambda box: get_rotate_crop_image(img, box, params_retry), dt_boxes
+        )
+    )
@@ -1,7 +1,25 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+
 import numpy as np
 
 from module_ai.utils.onnx.ocr_rapid.utils import OrtInferSession
-from .detect_process import DBPostProcess, create_operators, transform
+from .detect_process import (
+    DBPostProcess,
+    create_operators,
+    merge_tile_boxes,
+    tile_grid,
+    transform,
+)
+
+_tile_executor: ThreadPoolExecutor | None = None
+
+
+def _get_tile_executor(workers: int) -> ThreadPoolExecutor:
+    global _tile_executor
+    if _tile_executor is None:
+        _tile_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr_tile")
+    return _tile_executor
 
 
 class TextDetector:
@@ -13,17 +31,36 @@ class TextDetector:
         self.session = session_instance.session
         self.input_name = session_instance.get_input_name()
 
+        # 大图分块检测: 长边超过 min_side 时按有重叠的分块检测 内存与分块大小相关 分块并行推理
+        tiling = config.get("tiling") or {}
+        self.tiling = bool(tiling.get("enabled"))
+        self.tile_min_side = tiling.get("min_side", 4000)
+        self.tile_size = tiling.get("tile_size", 2048)
+        self.tile_overlap = tiling.get("overlap", 256)
+        self.tile_workers = tiling.get("workers") or os.cpu_count() or 1
+
     def __call__(self, img):
         if img is None:
             raise ValueError("img is None")
 
         ori_im_shape = img.shape[:2]
+        if self.tiling and max(ori_im_shape) > self.tile_min_side:
+            dt_boxes = self.detect_tiled(img)
+        else:
+            dt_boxes = self.detect_boxes(img)
+            if dt_boxes is None:
+                return None, 0
 
+        dt_boxes = self.filter_tag_det_res(dt_boxes, ori_im_shape)
+        return dt_boxes
+
+    def detect_boxes(self, img):
+        """整图检测 返回原图坐标的文字框"""
         data = {"image": img}
         data = transform(data, self.preprocess_op)
         img, shape_list = data
         if img is None:
-            return None, 0
+            return None
 
         img = np.expand_dims(img, axis=0).astype(np.float32)
         shape_list = np.expand_dims(shape_list, axis=0)
@@ -32,9 +69,32 @@ class TextDetector:
 
         post_result = self.postprocess_op(preds[0], shape_list)
 
-        dt_boxes = post_result[0]["points"]
-        dt_boxes = self.filter_tag_det_res(dt_boxes, ori_im_shape)
-        return dt_boxes
+        return post_result[0]["points"]
+
+    def detect_tiled(self, img):
+        """分块检测 合并重叠区重复框与接缝处截断的文本行"""
+        h, w = img.shape[:2]
+        tiles = tile_grid(h, w, self.tile_size, self.tile_overlap)
+        tile_boxes = _get_tile_executor(self.tile_workers).map(
+            lambda tile: self.detect_boxes(img[tile[1] : tile[3], tile[0] : tile[2]]),
+            tiles,
+        )
+        # 接触分块内侧边缘(非原图边缘)的框可能被截断
+        margin = 2
+        boxes, cut_flags = [], []
+        for (x0, y0, x1, y1), tile_result in zip(tiles, tile_boxes):
+            if tile_result is None:
+                continue
+            for box in tile_result:
+                box = box.astype(np.float32) + (x0, y0)
+                cut_flags.append(
+                    (x0 > 0 and box[:, 0].min() <= x0 + margin)
+                    or (y0 > 0 and box[:, 1].min() <= y0 + margin)
+                    or (x1 < w and box[:, 0].max() >= x1 - margin)
+                    or (y1 < h and box[:, 1].max() >= y1 - margin)
+                )
+                boxes.append(box)
+        return merge_tile_boxes(boxes, cut_flags)
 
     def order_points_clockwise(self, pts):
         """
@@ -228,12 +228,15 @@ class DBPostProcess:
         max_candidates=9999,
         unclip_ratio=2.0,
         use_dilation=False,
+        fast_unclip=True,
     ):
         self.thresh = thresh
         self.box_thresh = box_thresh
         self.max_candidates = max_candidates
         self.unclip_ratio = unclip_ratio
         self.min_size = 3
+        # 最小外接矩形按闭式解外扩 False 时使用 shapely + pyclipper 多边形外扩
+        self.fast_unclip = fast_unclip
 
         if use_dilation:
             self.dilation_kernel = np.array([[1, 1], [1, 1]])
@@ -249,8 +252,9 @@ class DBPostProcess:
         bitmap = _bitmap
         height, width = bitmap.shape
 
+        # findContours 将非零像素视为前景 无需放大到 255
         outs = cv2.findContours(
-            (bitmap * 255).astype(np.uint8), cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE
+            bitmap.astype(np.uint8), cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE
         )
         if len(outs) == 3:
             img, contours, _ = outs[0], outs[1], outs[2]
@@ -258,32 +262,39 @@ class DBPostProcess:
             contours, _ = outs[0], outs[1]
 
         num_contours = min(len(contours), self.max_candidates)
+        rects = [cv2.minAreaRect(contours[index]) for index in range(num_contours)]
+        rects = [rect for rect in rects if min(rect[1]) >= self.min_size]
+        if not rects:
+            return np.zeros((0, 4, 2), dtype=np.int16), []
 
-        boxes = []
-        scores = []
-        for index in range(num_contours):
-            contour = contours[index]
-            points, sside = self.get_mini_boxes(contour)
-            if sside < self.min_size:
-                continue
-            points = np.array(points)
-            score = self.box_score_fast(pred, points.reshape(-1, 2))
-            if self.box_thresh > score:
-                continue
+        # 候选框整批打分
+        points = self.order_box_points(np.array([cv2.boxPoints(rect) for rect in rects]))
+        scores = self.box_scores(pred, points)
+        keep = np.flatnonzero(scores >= self.box_thresh)
 
-            box = self.unclip(points).reshape(-1, 1, 2)
-            box, sside = self.get_mini_boxes(box)
+        boxes = []
+        kept_scores = []
+        for index in keep:
+            if self.fast_unclip:
+                box, sside = self.unclip_rect(rects[index])
+            else:
+                box, sside = self.get_mini_boxes(
+                    self.unclip(points[index]).reshape(-1, 1, 2)
+                )
             if sside < self.min_size + 2:
                 continue
-            box = np.array(box)
-
-            box[:, 0] = np.clip(np.round(box[:, 0] / width * dest_width), 0, dest_width)
-            box[:, 1] = np.clip(
-                np.round(box[:, 1] / height * dest_height), 0, dest_height
-            )
-            boxes.append(box.astype(np.int16))
-            scores.append(score)
-        return np.array(boxes, dtype=np.int16), scores
+            boxes.append(box)
+            kept_scores.append(scores[index])
+
+        if not boxes:
+            return np.zeros((0, 4, 2), dtype=np.int16), kept_scores
+        # 缩放回原图坐标(整批)
+        boxes = np.array(boxes, dtype=np.float64)
+        boxes[:, :, 0] = np.clip(np.round(boxes[:, :, 0] / width * dest_width), 0, dest_width)
+        boxes[:, :, 1] = np.clip(
+            np.round(boxes[:, :, 1] / height * dest_height), 0, dest_height
+        )
+        return boxes.astype(np.int16), kept_scores
 
     def unclip(self, box):
         unclip_ratio = self.unclip_ratio
@@ -294,6 +305,39 @@ class DBPostProcess:
         expanded = np.array(offset.Execute(distance))
         return expanded
 
+    def unclip_rect(self, bounding_box):
+        """
+        矩形外扩闭式解: 外扩距离 = 面积 * unclip_ratio / 周长
+        圆角外扩后的最小外接矩形 = 同中心、同角度 边长各加 2 * 距离
+        :param bounding_box: cv2.minAreaRect 结果
+        :return: (外扩后的四点, 短边)
+        """
+        center, (w, h), angle = bounding_box
+        distance = w * h * self.unclip_ratio / (2 * (w + h))
+        expanded = (center, (w + 2 * distance, h + 2 * distance), angle)
+        return self.order_box_points(cv2.boxPoints(expanded)[np.newaxis])[0], min(expanded[1])
+
+    @staticmethod
+    def order_box_points(points):
+        """
+        四点排序为 左上 右上 右下 左下(与 get_mini_boxes 一致)
+        :param points: [N, 4, 2]
+        """
+        rows = np.arange(len(points))[:, np.newaxis]
+        points = points[rows, np.argsort(points[:, :, 0], axis=1, kind="stable")]
+        left = points[:, 1, 1] > points[:, 0, 1]
+        right = points[:, 3, 1] > points[:, 2, 1]
+        order = np.stack(
+            [
+                np.where(left, 0, 1),
+                np.where(right, 2, 3),
+                np.where(right, 3, 2),
+                np.where(left, 1, 0),
+            ],
+            axis=1,
+        )
+        return points[rows, order]
+
     def get_mini_boxes(self, contour):
         bounding_box = cv2.minAreaRect(contour)
         points = sorted(list(cv2.boxPoints(bounding_box)), key=lambda x: x[0])
@@ -315,6 +359,50 @@ class DBPostProcess:
         box = [points[index_1], points[index_2], points[index_3], points[index_4]]
         return box, min(bounding_box[1])
 
+    def box_scores(self, bitmap, boxes):
+        """
+        整批计算框内平均分 结果与逐框 box_score_fast 一致
+        整数化后为轴对齐矩形的框(水平文本的大多数)用积分图查表 其余逐框画掩码
+        :param bitmap: 概率图 [H, W]
+        :param boxes: [N, 4, 2]
+        :return: [N]
+        """
+        h, w = bitmap.shape[:2]
+        xmin = np.clip(np.floor(boxes[:, :, 0].min(axis=1)).astype(int), 0, w - 1)
+        xmax = np.clip(np.ceil(boxes[:, :, 0].max(axis=1)).astype(int), 0, w - 1)
+        ymin = np.clip(np.floor(boxes[:, :, 1].min(axis=1)).astype(int), 0, h - 1)
+        ymax = np.clip(np.ceil(boxes[:, :, 1].max(axis=1)).astype(int), 0, h - 1)
+        origin = np.stack([xmin, ymin], axis=1)[:, np.newaxis].astype(boxes.dtype)
+        poly = (boxes - origin).astype(np.int32)
+        xs, ys = poly[:, :, 0], poly[:, :, 1]
+        x_lo, x_hi = xs.min(axis=1), xs.max(axis=1)
+        y_lo, y_hi = ys.min(axis=1), ys.max(axis=1)
+        aligned = (
+            ((xs == x_lo[:, np.newaxis]) | (xs == x_hi[:, np.newaxis])).all(axis=1)
+            & ((ys == y_lo[:, np.newaxis]) | (ys == y_hi[:, np.newaxis])).all(axis=1)
+        )
+        # fillPoly 填充含边界 且裁剪到掩码(外接矩形)内
+        x0 = xmin + np.maximum(x_lo, 0)
+        x1 = xmin + np.minimum(x_hi, xmax - xmin)
+        y0 = ymin + np.maximum(y_lo, 0)
+        y1 = ymin + np.minimum(y_hi, ymax - ymin)
+        aligned &= (x1 >= x0) & (y1 >= y0)
+
+        scores = np.empty(len(boxes), dtype=np.float64)
+        if aligned.any():
+            integral = cv2.integral(bitmap, sdepth=cv2.CV_64F)
+            x0, x1, y0, y1 = x0[aligned], x1[aligned], y0[aligned], y1[aligned]
+            total = (
+                integral[y1 + 1, x1 + 1]
+                - integral[y0, x1 + 1]
+                - integral[y1 + 1, x0]
+                + integral[y0, x0]
+            )
+            scores[aligned] = total / ((x1 - x0 + 1) * (y1 - y0 + 1))
+        for index in np.flatnonzero(~aligned):
+            scores[index] = self.box_score_fast(bitmap, boxes[index])
+        return scores
+
     def box_score_fast(self, bitmap, _box):
         h, w = bitmap.shape[:2]
         box = _box.copy()
@@ -349,3 +437,95 @@ class DBPostProcess:
 
             boxes_batch.append({"points": boxes})
         return boxes_batch
+
+
+def tile_grid(height, width, tile_size, overlap):
+    """
+    将图像划分为有重叠的分块
+    :param height: 图像高
+    :param width: 图像宽
+    :param tile_size: 分块边长
+    :param overlap: 相邻分块重叠宽度
+    :return: [(x0, y0, x1, y1)]
+    """
+    stride = max(tile_size - overlap, 1)
+
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        positions = list(range(0, length - tile_size + 1, stride))
+        if positions[-1] + tile_size < length:
+            positions.append(length - tile_size)
+        return positions
+
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in starts(height)
+        for x in starts(width)
+    ]
+
+
+def _aabb(points):
+    return np.array([points[:, 0].min(), points[:, 1].min(), points[:, 0].max(), points[:, 1].max()])
+
+
+def _same_line(a, b, line_overlap):
+    # 两框均为横排(或均为竖排) 短边方向重叠足够 长边方向相交或相接
+    a_w, a_h = a[2] - a[0], a[3] - a[1]
+    b_w, b_h = b[2] - b[0], b[3] - b[1]
+    x_overlap = min(a[2], b[2]) - max(a[0], b[0])
+    y_overlap = min(a[3], b[3]) - max(a[1], b[1])
+    if a_w >= a_h and b_w >= b_h:
+        return y_overlap >= line_overlap * min(a_h, b_h) and x_overlap >= 0
+    if a_w < a_h and b_w < b_h:
+        return x_overlap >= line_overlap * min(a_w, b_w) and y_overlap >= 0
+    return False
+
+
+def merge_tile_boxes(boxes, cut_flags, contain_thresh=0.7, line_overlap=0.6):
+    """
+    合并分块检测结果
+    1. 重叠区重复检测: 大部分面积被更大的框覆盖的框去除
+    2. 接缝处被截断的文本行: 与同一行相交的框合并为最小外接矩形
+    :param boxes: 文字框列表(原图坐标) [4, 2]
+    :param cut_flags: 文字框是否接触分块内侧边缘(可能被截断)
+    :param contain_thresh: 被覆盖面积比例超过该值视为重复
+    :param line_overlap: 短边方向重叠比例超过该值视为同一行
+    :return: 合并后的文字框列表
+    """
+    if not boxes:
+        return []
+    points = [np.asarray(box, dtype=np.float32).reshape(-1, 2) for box in boxes]
+    rects = np.array([_aabb(p) for p in points])
+    areas = (rects[:, 2] - rects[:, 0]) * (rects[:, 3] - rects[:, 1])
+
+    kept = []
+    for i in np.argsort(-areas, kind="stable"):
+        if kept:
+            others = rects[kept]
+            inter_w = np.minimum(others[:, 2], rects[i, 2]) - np.maximum(others[:, 0], rects[i, 0])
+            inter_h = np.minimum(others[:, 3], rects[i, 3]) - np.maximum(others[:, 1], rects[i, 1])
+            inter = np.clip(inter_w, 0, None) * np.clip(inter_h, 0, None)
+            if (inter >= contain_thresh * max(areas[i], 1)).any():
+                continue
+        kept.append(i)
+
+    merged = {i: points[i] for i in kept}
+    merged_rects = {i: rects[i] for i in kept}
+    cut = {i for i in kept if cut_flags[i]}
+    changed = True
+    while changed:
+        changed = False
+        for i in list(cut):
+            if i not in merged:
+                continue
+            for j in list(merged):
+                if j == i or not _same_line(merged_rects[i], merged_rects[j], line_overlap):
+                    continue
+                rect = cv2.minAreaRect(np.concatenate([merged[i], merged[j]]))
+                merged[i] = cv2.boxPoints(rect).astype(np.float32)
+                merged_rects[i] = _aabb(merged[i])
+                del merged[j], merged_rects[j]
+                cut.discard(j)
+                changed = True
+    return [merged[i] for i in sorted(merged)]
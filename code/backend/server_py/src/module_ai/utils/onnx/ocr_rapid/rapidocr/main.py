@@ -25,14 +25,14 @@ modelObj = {
 }
 
 
-def detect_recognize(image, lang="ch", detect=True, classify=True , inpaint = False):
+def detect_recognize(image, lang="ch", detect=True, classify=True , inpaint = False, retry=None):
     # 判断modelObj有ch
     if lang in modelObj:
         model = modelObj[lang]
     else:
         model = load_language_model(lang)
         modelObj.setdefault(lang, model)
-    results, ts ,background = model(image, detect=detect, classify=classify , inpaint = inpaint)
+    results, ts ,background = model(image, detect=detect, classify=classify , inpaint = inpaint, retry=retry)
     ts["total"] = sum(ts.values())
     return {"ts": ts, "results": results , "background":background}
 
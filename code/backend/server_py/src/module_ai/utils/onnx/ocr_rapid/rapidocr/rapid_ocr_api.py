@@ -1,95 +1,49 @@
-import copy
+import threading
 
-import cv2
 import numpy as np
 
 from functools import lru_cache
-from module_ai.config.ocr import conf_ocr_models,conf_ocr_ort
+from module_ai.config.ocr import conf_ocr_models,conf_ocr_ort,OCR_INPAINT_MODE
+from module_ai.do.ocr import InpaintMode, RetryPolicy
 from module_ai.utils.onnx.ocr_rapid.text_inpaint.simple_cv import simple_inpaint
 from module_ai.utils.onnx.ocr_rapid.utils import Ticker
 from .classify import TextClassifier
+from .crop import get_crop_img_list
 from .detect import TextDetector
 from .recognize import TextRecognizer
 
 
-def get_rotate_crop_image(img, points, params_retry=None):
-    """根据box定义, 从图像中截取相应的部分, 通过透视变换转换为标准长方形图像"""
-    # 新参数检测
-    if params_retry:
-        img_crop_height = int(
-            max(
-                np.linalg.norm(points[0] - points[3]),
-                np.linalg.norm(points[1] - points[2]),
-            )
-        )
-        # x方向倍数
-        tempAddX = img_crop_height * params_retry[0]
-        tempAddY = img_crop_height * params_retry[1]
-        paddingX = int(img_crop_height * params_retry[2])
-        paddingY = int(img_crop_height * params_retry[3])
-        points[0][0] = points[0][0] - tempAddX + img_crop_height * 0.02
-        points[0][1] = points[0][1] - tempAddY
-        points[1][0] = points[1][0] + tempAddX + img_crop_height * 0.04
-        points[1][1] = points[1][1] - tempAddY
-        points[2][0] = points[2][0] + tempAddX + img_crop_height * 0.04
-        points[2][1] = points[2][1] + tempAddY
-        points[3][0] = points[3][0] - tempAddX + img_crop_height * 0.02
-        points[3][1] = points[3][1] + tempAddY
-        points = np.float32(points)
+class RetryStats:
+    """低置信度重试统计(所有模型共享 线程安全)"""
 
-    img_crop_width = int(
-        max(
-            np.linalg.norm(points[0] - points[1]),
-            np.linalg.norm(points[2] - points[3]),
-        )
-    )
-    img_crop_height = int(
-        max(
-            np.linalg.norm(points[0] - points[3]),
-            np.linalg.norm(points[1] - points[2]),
-        )
-    )
-    pts_std = np.float32(
-        [
-            [0, 0],
-            [img_crop_width, 0],
-            [img_crop_width, img_crop_height],
-            [0, img_crop_height],
-        ]
-    )
-    # 最终检测单句
-    transform = cv2.getPerspectiveTransform(points, pts_std)
-    dst_img = cv2.warpPerspective(
-        img,
-        transform,
-        (img_crop_width, img_crop_height),
-        borderMode=cv2.BORDER_REPLICATE,
-        flags=cv2.INTER_CUBIC,
-    )
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {
+            "requests": 0,  # 识别请求数
+            "retry_requests": 0,  # 触发重试的请求数
+            "low_lines": 0,  # 低于阈值的行数
+            "retried_lines": 0,  # 实际重试的行数
+            "skipped_lines": 0,  # 超出预算未重试的行数
+            "improved_lines": 0,  # 重试后置信度提高的行数
+            "reached_lines": 0,  # 重试后达到目标置信度的行数
+            "variant_runs": 0,  # 执行的参数组批次数
+            "early_exits": 0,  # 提前结束(未用完参数组)的请求数
+        }
 
-    # 弹窗展示dst_img图片
-    if params_retry:
-        dst_img = cv2.copyMakeBorder(
-            dst_img,
-            paddingY,
-            paddingY,
-            paddingX,
-            paddingX,
-            cv2.BORDER_CONSTANT,
-            value=(255, 255, 255),
-        )
-    # debug
-    # cv2.imshow('Image1', img)
-    # 过程图片
-    # cv2.imshow('Image', dst_img)
-    # cv2.waitKey(0)
-    # cv2.destroyAllWindows()
+    def add(self, **counts: int):
+        with self._lock:
+            for key, value in counts.items():
+                self._counts[key] += value
 
-    dst_img_height, dst_img_width = dst_img.shape[:2]
-    # 将竖向的文字方向转为横向, 仅当 高>1.5*宽 时进行转换
-    if dst_img_height * 1.0 / dst_img_width >= 1.5:
-        dst_img = np.rot90(dst_img)
-    return dst_img
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self._counts)
+        retried = stats["retried_lines"]
+        stats["hit_rate"] = stats["improved_lines"] / retried if retried else 0.0
+        return stats
+
+
+retry_stats = RetryStats()
 
 
 @lru_cache(maxsize=None)
@@ -122,8 +76,21 @@ class RapidOCR:
         ]
         # shi用参数标记
         self.text_recognizer_params_index = 0
-
-    def __call__(self, img: np.ndarray, detect=True, classify=True, inpaint=False):
+        # 默认重试策略(请求可单独指定)
+        self.retry_policy = RetryPolicy(**(config["config"].get("retry") or {}))
+
+    def __call__(
+        self,
+        img: np.ndarray,
+        detect=True,
+        classify=True,
+        inpaint: bool | InpaintMode = False,
+        retry: RetryPolicy | None = None,
+    ):
+        """
+        :param inpaint: 是否生成去除文字的背景 True 使用默认方式 也可指定 InpaintMode
+        :return: (识别结果, 各阶段耗时, 背景图)
+        """
         background = None
         self.text_recognizer_params_index = 0
         ticker = Ticker()
@@ -135,7 +102,8 @@ class RapidOCR:
             dt_boxes = self.text_detector(img)
             ticker.tick("detect")
             if dt_boxes is None or len(dt_boxes) < 1:
-                return [], ticker.maps
+                # 没有文字 背景即原图
+                return [], ticker.maps, img.copy() if inpaint else None
             # if conf["global"]["verbose"]:
             #     print(f"boxes num: {len(dt_boxes)}")
 
@@ -156,17 +124,17 @@ class RapidOCR:
             img,
             dt_boxes,
             recog_result,
+            retry or self.retry_policy,
         )
         self.text_recognizer_params_index = 0
         # end
         ticker.tick("recognize")
         results, boxs_ok = self.filter_boxes_rec_by_score(dt_boxes, recog_result)
 
-        # 去除文字返回背景
-        # 深拷贝img
-        img_bg = copy.deepcopy(img)
+        # 去除文字返回背景(simple_inpaint 不修改原图 无需拷贝)
         if inpaint:
-            background = simple_inpaint(img_bg, boxs_ok)
+            mode = OCR_INPAINT_MODE if inpaint is True else InpaintMode(inpaint)
+            background = simple_inpaint(img, boxs_ok, mode)
             # image = cv2.imencode(".jpg", background)[1]
             # background = str(base64.b64encode(image))[2:-1]
             # 转base64
@@ -183,12 +151,7 @@ class RapidOCR:
         return dt_boxes, img_crop_list
 
     def get_crop_img_list(self, img, dt_boxes):
-        img_crop_list = []
-        for box in dt_boxes:
-            tmp_box = copy.deepcopy(box)
-            img_crop = get_rotate_crop_image(img, tmp_box)
-            img_crop_list.append(img_crop)
-        return img_crop_list
+        return get_crop_img_list(img, dt_boxes)
 
     @staticmethod
     def sorted_boxes(dt_boxes):
@@ -227,35 +190,49 @@ class RapidOCR:
                 boxs.append(box)
         return results, boxs
 
-    def retry_text_recognizer(self, img, dt_boxes, recog_result):
-        # 如果置信度低于0.95，则重新设置多组参数识别
-        retryIndexArr = []
-        # 所有重检测图像 text_recognizer_params数*imgs数
-        retryImgsArr = []
-        # 循环recog_result 置信度不合格的添加到retryArrDict
-        for i, result in enumerate(recog_result):
-            if result[1] <= 0.97:
-                retryIndexArr.append(i)
-        retryIndexArrLen = len(retryIndexArr)
-        # 置信度都合格返回
-        if len(retryIndexArr) == 0:
+    def retry_text_recognizer(self, img, dt_boxes, recog_result, policy: RetryPolicy):
+        """
+        低置信度文本行按多组截取参数重新识别 取置信度最高的结果(原地更新 recog_result)
+        置信度最低的行优先 超出预算的行不重试 达到目标置信度的行不再尝试其余参数
+        """
+        retry_stats.add(requests=1)
+        low_index = [
+            i for i, result in enumerate(recog_result) if result[1] <= policy.threshold
+        ]
+        if not low_index:
             return
-        else:
-            # 循环多参数,放入同一批次检测第二遍  参数*置信度不足图像
-            for params_retry in self.text_recognizer_params:
-                for index in retryIndexArr:
-                    tmp_box = copy.deepcopy(dt_boxes[index])
-                    img_crop = get_rotate_crop_image(img, tmp_box, params_retry)
-                    retryImgsArr.append(img_crop)
+        low_index.sort(key=lambda i: recog_result[i][1])
+        retry_index = (
+            low_index if policy.max_lines is None else low_index[: policy.max_lines]
+        )
+        retry_stats.add(
+            low_lines=len(low_index),
+            skipped_lines=len(low_index) - len(retry_index),
+        )
+        if not retry_index or not policy.variants:
+            return
+        retry_stats.add(retry_requests=1, retried_lines=len(retry_index))
+        improved = set()
+        pending = retry_index
+        variants = self.text_recognizer_params[: policy.variants]
+        for variant_no, params_retry in enumerate(variants, start=1):
+            img_crop_list = get_crop_img_list(
+                img, [dt_boxes[index] for index in pending], params_retry
+            )
             # 方向改正
-            img_crop_list_new, _ = self.text_cls(retryImgsArr)
-            # 字符检测
-            recog_result_new = self.text_recognizer(img_crop_list_new)
-            # 检测结果比较取置信度最高值
-            for i, result in enumerate(recog_result_new):
-                recog_result_new_this = recog_result_new[i]
-                index = i % retryIndexArrLen
-                recog_result_old_this = recog_result[retryIndexArr[index]]
-                # 如果新识别的置信度比旧的高，则替换
-                if recog_result_new_this[1] > recog_result_old_this[1]:
-                    recog_result[retryIndexArr[index]] = recog_result_new_this
+            img_crop_list, _ = self.text_cls(img_crop_list)
+            # 字符检测 如果新识别的置信度比旧的高，则替换
+            for index, result in zip(pending, self.text_recognizer(img_crop_list)):
+                if result[1] > recog_result[index][1]:
+                    recog_result[index] = result
+                    improved.add(index)
+            retry_stats.add(variant_runs=1)
+            pending = [index for index in pending if recog_result[index][1] < policy.target]
+            if not pending:
+                if variant_no < len(variants):
+                    retry_stats.add(early_exits=1)
+                break
+        retry_stats.add(
+            improved_lines=len(improved),
+            reached_lines=len(retry_index) - len(pending),
+        )
@@ -1,112 +1,17 @@
 import json
+import math
+import threading
+import cv2
 import numpy as np
-from common.utils.media.FileFormat import resize_norm_img
 from module_ai.utils.onnx.ocr_rapid.utils import OrtInferSession
+from module_ai.utils.onnx.micro_batcher import MicroBatcher
+from .recognize_process import CTCLabelDecode
 
 
-class CTCLabelDecode:
-    """CTC标签解码器 - 在文本标签和文本索引之间进行转换"""
-
-    def __init__(self, characters: list[str]):
-        """
-        初始化CTC标签解码器
-        
-        Args:
-            characters: 字符列表，包含所有可能的字符
-        """
-        super(CTCLabelDecode, self).__init__()
-
-        self.characters = characters
-        self.characters.append(" ")  # 添加空格字符
-
-        dict_character = self.add_special_char(self.characters)
-        self.character = dict_character
-
-        self.dict = {}
-        for i, char in enumerate(dict_character):
-            self.dict[char] = i
-
-    def __call__(self, preds, label=None):
-        """
-        调用函数，执行CTC解码
-        
-        Args:
-            preds: 模型预测结果
-            label: 真实标签(可选)
-            
-        Returns:
-            解码后的文本结果，如果提供了标签则返回预测结果和真实标签
-        """
-        preds_idx = preds.argmax(axis=2)  # 获取每个位置概率最大的字符索引
-        preds_prob = preds.max(axis=2)    # 获取对应的概率值
-        text = self.decode(preds_idx, preds_prob, is_remove_duplicate=True)
-        if label is None:
-            return text
-        label = self.decode(label)
-        return text, label
-
-    def add_special_char(self, dict_character):
-        """
-        添加特殊字符(CTC空白符)
-        
-        Args:
-            dict_character: 原始字符列表
-            
-        Returns:
-            添加了特殊字符后的字符列表
-        """
-        dict_character = ["blank"] + dict_character  # 添加CTC空白符
-        return dict_character
-
-    def get_ignored_tokens(self):
-        """
-        获取需要忽略的token(CTC空白符)
-        
-        Returns:
-            需要忽略的token索引列表
-        """
-        return [0]  # CTC空白符的索引
-
-    def decode(self, text_index, text_prob=None, is_remove_duplicate=False):
-        """
-        将文本索引转换为文本标签
-        
-        Args:
-            text_index: 文本索引数组
-            text_prob: 对应的概率数组(可选)
-            is_remove_duplicate: 是否移除重复字符(用于预测时)
-            
-        Returns:
-            包含文本和置信度的结果列表
-        """
-
-        result_list = []
-        ignored_tokens = self.get_ignored_tokens()  # 获取需要忽略的token
-        batch_size = len(text_index)
-        for batch_idx in range(batch_size):
-            char_list = []  # 存储字符
-            conf_list = []  # 存储置信度
-            for idx in range(len(text_index[batch_idx])):
-                if text_index[batch_idx][idx] in ignored_tokens:
-                    continue  # 跳过空白符
-                if is_remove_duplicate:
-                    # 预测时移除重复字符
-                    if (
-                        idx > 0
-                        and text_index[batch_idx][idx - 1] == text_index[batch_idx][idx]
-                    ):
-                        continue
-                # 将索引转换为字符
-                char_list.append(self.character[int(text_index[batch_idx][idx])])
-                if text_prob is not None:
-                    conf_list.append(text_prob[batch_idx][idx])
-                else:
-                    conf_list.append(1)
-            # 计算平均置信度，避免空列表警告
-            score = np.mean(conf_list) if conf_list else 0
-            text = "".join(char_list)  # 将字符列表拼接成字符串
-            result_list.append((text, score))
-        return result_list
+# 默认宽度桶(归一化后宽度 像素)
+DEFAULT_BUCKET_WIDTHS = [128, 192, 256, 320, 480, 640, 960, 1280, 1920, 2560]
+# 未标定桶的批大小 = 总宽度预算 // 桶宽
+DEFAULT_MAX_BATCH_WIDTH = 8192
 
 
 class TextRecognizer:
@@ -134,6 +39,31 @@ class TextRecognizer:
         self.rec_image_shape = json.loads(metamap["shape"])  # 图像输入形状
         self.input_name = session_instance.get_input_name()  # 模型输入名称
 
+        # 宽度桶: 文本行按自身宽度归入固定宽度桶 同桶合批 只补齐到桶宽 减少填充计算
+        buckets = config.get("buckets") or {}
+        self.bucket_widths = sorted(buckets.get("widths") or DEFAULT_BUCKET_WIDTHS)
+        self.width_step = buckets.get("width_step", 64)  # 超过最大桶时的取整步长
+        # 每桶批大小: 标定结果(tools/benchmark/calibrate_rec_buckets.py) 未标定的桶按总宽度预算计算
+        self.max_batch_width = buckets.get("max_batch_width", DEFAULT_MAX_BATCH_WIDTH)
+        self.bucket_batch = {
+            int(width): int(size) for width, size in (buckets.get("batch") or {}).items()
+        }
+        # 预分配的输入张量(每个线程每个桶一份 重复使用)
+        self._buffers = threading.local()
+
+        # 跨请求微批: 并发OCR请求的文本行按宽度桶合并为一次推理
+        batching = config.get("batching") or {}
+        self.batcher = None
+        if batching.get("enabled"):
+            self.batcher = MicroBatcher(
+                self._run_bucket,
+                max_batch=lambda width: min(
+                    self.bucket_batch_size(width), batching.get("max_batch", 32)
+                ),
+                max_wait_ms=batching.get("max_wait_ms", 5),
+                name="rec_batcher",
+            )
+
     def __call__(self, img_list: list[np.ndarray]):
         """
         执行文本识别
@@ -146,44 +76,102 @@ class TextRecognizer:
         """
         if isinstance(img_list, np.ndarray):
             img_list = [img_list]  # 如果是单个图像，转换为列表
-
-        # 计算所有文本条的宽高比
-        width_list = [img.shape[1] / float(img.shape[0]) for img in img_list]
-
-        # 按宽高比排序，可以加速识别过程
-        indices = np.argsort(np.array(width_list))
-
-        img_num = len(img_list)
-        rec_res = [["", 0.0]] * img_num  # 初始化结果列表
-
-        batch_num = self.rec_batch_num
-        # 分批处理图像
-        for beg_img_no in range(0, img_num, batch_num):
-            end_img_no = min(img_num, beg_img_no + batch_num)
-            max_wh_ratio = 0
-            # 计算当前批次的最大宽高比
-            for ino in range(beg_img_no, end_img_no):
-                h, w = img_list[indices[ino]].shape[0:2]
-                wh_ratio = w * 1.0 / h
-                max_wh_ratio = max(max_wh_ratio, wh_ratio)
-
-            norm_img_batch = []
-            # 对当前批次图像进行归一化处理
-            for ino in range(beg_img_no, end_img_no):
-                img_c, img_h, img_w = self.rec_image_shape
-                # 根据最大宽高比动态计算新宽度(基准高度32像素)解决文本行长度不一致的问题
-                img_w = int((32 * max_wh_ratio))
-                # 强制固定高度，用于批量处理和标准OCR模型
-                norm_img = resize_norm_img(img_list[indices[ino]], img_w, img_h, img_c)
-                norm_img_batch.append(norm_img[np.newaxis, :])
-            norm_img_batch = np.concatenate(norm_img_batch).astype(np.float32)
-
-            # 执行ONNX模型推理
-            onnx_inputs = {self.input_name: norm_img_batch}
-            preds = self.session.run(None, onnx_inputs)[0]
-            rec_result = self.postprocess_op(preds)  # 对预测结果进行CTC解码
-
-            # 将结果存储到正确的位置
-            for rno in range(len(rec_result)):
-                rec_res[indices[beg_img_no + rno]] = rec_result[rno]
+        if self.batcher is not None:
+            return self._call_batched(img_list)
+
+        # 按宽度桶分组(组内保持原顺序)
+        buckets: dict[int, list[int]] = {}
+        for index, img in enumerate(img_list):
+            buckets.setdefault(self.bucket_width(self.norm_width(img)), []).append(index)
+
+        rec_res = [["", 0.0]] * len(img_list)  # 初始化结果列表
+        for width, indices in buckets.items():
+            batch_num = self.bucket_batch_size(width)
+            # 分批处理图像 直接归一化写入预分配张量
+            for beg_img_no in range(0, len(indices), batch_num):
+                batch_indices = indices[beg_img_no : beg_img_no + batch_num]
+                norm_img_batch = self._input_buffer(width, len(batch_indices))
+                for row, index in enumerate(batch_indices):
+                    self._norm_into(img_list[index], norm_img_batch[row])
+                rec_result = self._infer(norm_img_batch)
+                # 将结果存储到正确的位置
+                for index, result in zip(batch_indices, rec_result):
+                    rec_res[index] = result
         return rec_res
+
+    def _infer(self, norm_img_batch: np.ndarray) -> list:
+        """执行ONNX模型推理并CTC解码"""
+        onnx_inputs = {self.input_name: norm_img_batch}
+        preds = self.session.run(None, onnx_inputs)[0]
+        return self.postprocess_op(preds)
+
+    def norm_width(self, img: np.ndarray) -> int:
+        """单条文本归一化后的宽度(基准高度32 与逐条识别一致)"""
+        h, w = img.shape[0:2]
+        return max(int(32 * w * 1.0 / h), 1)
+
+    def bucket_width(self, width: int) -> int:
+        """宽度向上取整到桶宽"""
+        for bucket in self.bucket_widths:
+            if width <= bucket:
+                return bucket
+        return -(-width // self.width_step) * self.width_step
+
+    def bucket_batch_size(self, width: int) -> int:
+        """桶的批大小"""
+        if width in self.bucket_batch:
+            return self.bucket_batch[width]
+        return max(self.max_batch_width // width, self.rec_batch_num, 1)
+
+    def _input_buffer(self, width: int, batch_size: int) -> np.ndarray:
+        """取当前线程该桶的预分配输入张量(前 batch_size 行)"""
+        img_c, img_h, _ = self.rec_image_shape
+        if width > self.bucket_widths[-1]:
+            # 超长文本行少见 不缓存
+            return np.empty((batch_size, img_c, img_h, width), dtype=np.float32)
+        buffers = getattr(self._buffers, "by_width", None)
+        if buffers is None:
+            buffers = self._buffers.by_width = {}
+        buffer = buffers.get(width)
+        if buffer is None or len(buffer) < batch_size:
+            buffer = np.empty(
+                (max(batch_size, self.bucket_batch_size(width)), img_c, img_h, width),
+                dtype=np.float32,
+            )
+            buffers[width] = buffer
+        return buffer[:batch_size]
+
+    def _norm_into(self, img: np.ndarray, out: np.ndarray):
+        """
+        缩放、归一化到 [-1, 1] 并写入输入张量的一行 其余部分补0(与 resize_norm_img 一致)
+        :param img: 文本行图像 (h, w, c)
+        :param out: 输入张量的一行 (c, img_h, 桶宽)
+        """
+        _, img_h, _ = self.rec_image_shape
+        h, w = img.shape[0:2]
+        ratio = w / float(h)
+        resized_w = min(self.norm_width(img), int(math.ceil(img_h * ratio)))
+        resized_image = cv2.resize(img, (resized_w, img_h))
+        view = out[:, :, :resized_w]
+        np.divide(resized_image.transpose((2, 0, 1)), 255, out=view, dtype=np.float32)
+        view -= 0.5
+        view /= 0.5
+        out[:, :, resized_w:] = 0
+
+    def _call_batched(self, img_list: list[np.ndarray]):
+        # 归一化在当前推理线程完成 调度线程只负责拼批和推理
+        img_c, img_h, _ = self.rec_image_shape
+        items = []
+        for img in img_list:
+            norm_width = self.norm_width(img)
+            norm_img = np.empty((img_c, img_h, norm_width), dtype=np.float32)
+            self._norm_into(img, norm_img)
+            items.append((self.bucket_width(norm_width), norm_img))
+        return self.batcher.submit(items)
+
+    def _run_bucket(self, width: int, norm_imgs: list[np.ndarray]) -> list:
+        norm_img_batch = self._input_buffer(width, len(norm_imgs))
+        for row, norm_img in enumerate(norm_imgs):
+            norm_img_batch[row, :, :, : norm_img.shape[2]] = norm_img
+            norm_img_batch[row, :, :, norm_img.shape[2] :] = 0
+        return self._infer(norm_img_batch)
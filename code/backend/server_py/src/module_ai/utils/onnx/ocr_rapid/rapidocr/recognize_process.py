@@ -0,0 +1,105 @@
+import numpy as np
+
+
+class CTCLabelDecode:
+    """CTC标签解码器 - 在文本标签和文本索引之间进行转换"""
+
+    def __init__(self, characters: list[str]):
+        """
+        初始化CTC标签解码器
+        
+        Args:
+            characters: 字符列表，包含所有可能的字符
+        """
+        super(CTCLabelDecode, self).__init__()
+
+        self.characters = characters
+        self.characters.append(" ")  # 添加空格字符
+
+        dict_character = self.add_special_char(self.characters)
+        self.character = dict_character
+
+        self.dict = {}
+        for i, char in enumerate(dict_character):
+            self.dict[char] = i
+        # 字符数组 按索引批量取字符
+        self.character_array = np.array(dict_character, dtype=object)
+
+    def __call__(self, preds, label=None):
+        """
+        调用函数，执行CTC解码
+        
+        Args:
+            preds: 模型预测结果
+            label: 真实标签(可选)
+            
+        Returns:
+            解码后的文本结果，如果提供了标签则返回预测结果和真实标签
+        """
+        preds_idx = preds.argmax(axis=2)  # 获取每个位置概率最大的字符索引
+        # 获取对应的概率值(按索引取 避免再遍历一次类别维)
+        preds_prob = np.take_along_axis(preds, preds_idx[..., np.newaxis], axis=2)[..., 0]
+        text = self.decode(preds_idx, preds_prob, is_remove_duplicate=True)
+        if label is None:
+            return text
+        label = self.decode(label)
+        return text, label
+
+    def add_special_char(self, dict_character):
+        """
+        添加特殊字符(CTC空白符)
+        
+        Args:
+            dict_character: 原始字符列表
+            
+        Returns:
+            添加了特殊字符后的字符列表
+        """
+        dict_character = ["blank"] + dict_character  # 添加CTC空白符
+        return dict_character
+
+    def get_ignored_tokens(self):
+        """
+        获取需要忽略的token(CTC空白符)
+        
+        Returns:
+            需要忽略的token索引列表
+        """
+        return [0]  # CTC空白符的索引
+
+    def decode(self, text_index, text_prob=None, is_remove_duplicate=False):
+        """
+        将文本索引转换为文本标签(整批向量化: 掩码去除空白符和重复字符 掩码求平均置信度)
+        
+        Args:
+            text_index: 文本索引数组 [batch_size, 时间步]
+            text_prob: 对应的概率数组(可选)
+            is_remove_duplicate: 是否移除重复字符(用于预测时)
+            
+        Returns:
+            包含文本和置信度的结果列表
+        """
+        text_index = np.asarray(text_index)
+        if text_index.ndim == 1:
+            text_index = text_index[np.newaxis, :]
+        # 保留的位置: 非空白符 且(预测时)与前一个时间步不同
+        keep = ~np.isin(text_index, self.get_ignored_tokens())
+        if is_remove_duplicate:
+            keep[:, 1:] &= text_index[:, 1:] != text_index[:, :-1]
+        counts = keep.sum(axis=1)
+        if text_prob is not None:
+            text_prob = np.asarray(text_prob)
+            conf_sum = np.where(keep, text_prob, 0).sum(axis=1, dtype=text_prob.dtype)
+            # 计算平均置信度(保持概率的精度) 空文本为0
+            scores = (conf_sum / np.maximum(counts, 1)).astype(text_prob.dtype)
+        else:
+            scores = np.ones(len(counts))
+
+        result_list = []
+        for row_index, row_keep, count, score in zip(text_index, keep, counts, scores):
+            if not count:
+                result_list.append(("", 0))
+                continue
+            text = "".join(self.character_array[row_index[row_keep]])
+            result_list.append((text, score))
+        return result_list
@@ -1,6 +1,15 @@
 from cv2 import UMat
 import numpy as np
 import cv2 as cv
+from module_ai.do.ocr import InpaintMode
+
+INPAINT_RADIUS = 3
+# 修复区域外扩(像素) 修复只依赖邻近像素 按区域修复与整图修复基本一致
+ROI_MARGIN = 8
+# telea: 文字粗细超过该值时缩小后修复
+TELEA_MAX_TEXT_HEIGHT = 24
+# fill: 取文字框外该宽度的一圈像素求平均色
+FILL_RING = 3
 
 
 # 给出图片和遮罩boxs数组，将图片中boxs对应区域进行填充
@@ -17,11 +26,67 @@ def mask_from_boxs(img, boxs):
     return inpaintMask
 
 
-def simple_inpaint(img, boxs) -> UMat:
-    inpaintMask = mask_from_boxs(img, boxs)
-    res = cv.inpaint(
-        src=img, inpaintMask=inpaintMask, inpaintRadius=3, flags=cv.INPAINT_NS
+def mask_rois(inpaintMask, margin=ROI_MARGIN) -> list[tuple[int, int, int, int]]:
+    """遮罩外扩后的连通区域 [(x0, y0, x1, y1)] 相邻文字框合并为一个区域"""
+    kernel = np.ones((2 * margin + 1, 2 * margin + 1), np.uint8)
+    dilated = cv.dilate(inpaintMask, kernel)
+    _, _, stats, _ = cv.connectedComponentsWithStats(dilated, connectivity=8)
+    return [(x, y, x + w, y + h) for x, y, w, h, _ in stats[1:]]
+
+
+def _inpaint_telea(roi, roi_mask):
+    # 文字粗细(遮罩内最大内切圆直径) 大字缩小后修复再放大 只回填遮罩内像素
+    thickness = cv.distanceTransform(roi_mask, cv.DIST_L2, 3).max() * 2
+    scale = min(1.0, TELEA_MAX_TEXT_HEIGHT / thickness) if thickness else 1.0
+    if scale >= 0.75:
+        return cv.inpaint(roi, roi_mask, INPAINT_RADIUS, cv.INPAINT_TELEA)
+    h, w = roi_mask.shape
+    small = cv.resize(roi, None, fx=scale, fy=scale, interpolation=cv.INTER_AREA)
+    small_mask = cv.resize(
+        roi_mask, (small.shape[1], small.shape[0]), interpolation=cv.INTER_NEAREST
+    )
+    # 缩小后遮罩外扩一像素 避免文字边缘残留
+    small_mask = cv.dilate(small_mask, np.ones((3, 3), np.uint8))
+    restored = cv.resize(
+        cv.inpaint(small, small_mask, INPAINT_RADIUS, cv.INPAINT_TELEA),
+        (w, h),
+        interpolation=cv.INTER_LINEAR,
     )
+    res = roi.copy()
+    res[roi_mask > 0] = restored[roi_mask > 0]
+    return res
+
+
+def _fill_mean(roi, roi_mask):
+    kernel = np.ones((2 * FILL_RING + 1, 2 * FILL_RING + 1), np.uint8)
+    ring = cv.subtract(cv.dilate(roi_mask, kernel), roi_mask)
+    res = roi.copy()
+    channels = roi.shape[2] if roi.ndim == 3 else 1
+    res[roi_mask > 0] = cv.mean(roi, mask=ring)[:channels]
+    return res
+
+
+def simple_inpaint(img, boxs, mode: InpaintMode = InpaintMode.NS) -> UMat:
+    """
+    去除文字框内容生成背景 按文字所在区域分块修复 不修改原图
+    :param img: 原图
+    :param boxs: 文字框列表
+    :param mode: ns / telea(大字缩小修复) / fill(周围平均色填充)
+    :return: 背景图
+    """
+    inpaintMask = mask_from_boxs(img, boxs)
+    res = img.copy()
+    for x0, y0, x1, y1 in mask_rois(inpaintMask):
+        roi = img[y0:y1, x0:x1]
+        roi_mask = inpaintMask[y0:y1, x0:x1]
+        if mode == InpaintMode.FILL:
+            res[y0:y1, x0:x1] = _fill_mean(roi, roi_mask)
+        elif mode == InpaintMode.TELEA:
+            res[y0:y1, x0:x1] = _inpaint_telea(roi, roi_mask)
+        else:
+            res[y0:y1, x0:x1] = cv.inpaint(
+                src=roi, inpaintMask=roi_mask, inpaintRadius=INPAINT_RADIUS, flags=cv.INPAINT_NS
+            )
     return res
 
 
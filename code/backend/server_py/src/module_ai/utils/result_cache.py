@@ -0,0 +1,235 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 残留的临时文件/孤立图像超过该时间(秒)才清理 避免删除其他进程正在写入的文件
+STALE_SECONDS = 60
+# 图像字段列表在 JSON 中的键
+IMAGES_FIELD = "__images__"
+
+
+def _json_default(value):
+    # numpy 标量/数组转为 Python 类型
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+class ResultCache:
+    """
+    内容寻址的本地磁盘结果缓存 总大小超过上限时按最近访问(mtime)淘汰
+    条目: <目录>/<键前2位>/<键>.json 顶层的图像字段(ndarray)另存为 <键>.<字段>.png
+    只存 JSON/PNG 数据 不使用 pickle 缓存目录的内容不会被当作代码执行
+    写入时扫描目录统计总大小 多进程共享目录时上限对整个目录生效
+    最近访问的条目同时保留在内存 命中时返回副本(可放心修改)
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, memory_items: int = 64):
+        """
+        :param directory: 缓存目录
+        :param max_bytes: 缓存目录总大小上限(字节)
+        :param memory_items: 内存中保留的最近条目数 0 不使用内存层
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self._lock = threading.Lock()
+        # 键 -> (JSON 字节, {图像字段: 图像})
+        self._memory: OrderedDict[str, tuple[bytes, dict[str, np.ndarray]]] = OrderedDict()
+        self._items = 0
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.directory.exists():
+            self._evict()
+            logger.info(f"结果缓存 {self.directory}: {self._items} 条 {self._size} 字节")
+
+    @staticmethod
+    def make_key(image: np.ndarray, **params) -> str:
+        """
+        缓存键 = sha256(图像尺寸 + 解码后像素 + 参数)
+        同一图片不同编码/文件名 像素一致即命中
+        :param image: 解码后的图像
+        :param params: 影响结果的参数(语言、开关、模型指纹等) 需可 JSON 序列化
+        :return: 十六进制摘要
+        """
+        hasher = hashlib.sha256()
+        hasher.update(f"{image.shape}{image.dtype}".encode())
+        hasher.update(np.ascontiguousarray(image))
+        hasher.update(json.dumps(params, sort_keys=True, default=str).encode())
+        return hasher.hexdigest()
+
+    def _json_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _image_path(self, key: str, field: str) -> Path:
+        return self.directory / key[:2] / f"{key}.{field}.png"
+
+    @staticmethod
+    def _write(path: Path, data: bytes):
+        # 先写临时文件再替换 其他读取不会读到写了一半的文件
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _touch(path: Path):
+        # 更新访问时间(淘汰顺序) 显式传入 ns 时间 文件系统默认时间戳精度较粗 连续写入会相同
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+
+    def _remember(self, key: str, data: bytes, images: dict[str, np.ndarray]):
+        # 调用方持有锁
+        if self.memory_items <= 0:
+            return
+        self._memory[key] = (data, images)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Any | None:
+        """
+        读取缓存
+        :param key: 缓存键
+        :return: 缓存的结果 未命中返回 None
+        """
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory.move_to_end(key)
+        json_path = self._json_path(key)
+        try:
+            if cached is None:
+                data = json_path.read_bytes()
+                images = {}
+                for field in json.loads(data).get(IMAGES_FIELD, []):
+                    encoded = np.fromfile(self._image_path(key, field), dtype=np.uint8)
+                    images[field] = cv2.imdecode(encoded, cv2.IMREAD_UNCHANGED)
+                    if images[field] is None:
+                        raise ValueError(f"图像解码失败: {field}")
+                cached = (data, images)
+            self._touch(json_path)
+        except (OSError, ValueError) as e:
+            # 已被淘汰(可能是其他进程)或文件损坏
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"结果缓存读取失败 {key}: {e}")
+            with self._lock:
+                self._memory.pop(key, None)
+                self.misses += 1
+            return None
+        data, images = cached
+        with self._lock:
+            self.hits += 1
+            self._remember(key, data, images)
+        value = json.loads(data)
+        for field in value.pop(IMAGES_FIELD, []):
+            value[field] = images[field].copy()
+        return value
+
+    def put(self, key: str, value: dict):
+        """
+        写入缓存 图像先写 JSON 最后写(JSON 存在即条目完整) 写入后按目录总大小淘汰
+        :param key: 缓存键
+        :param value: 结果(JSON 可序列化 顶层值可为图像 ndarray)
+        """
+        images = {field: v for field, v in value.items() if isinstance(v, np.ndarray)}
+        payload = {field: v for field, v in value.items() if field not in images}
+        payload[IMAGES_FIELD] = list(images)
+        data = json.dumps(payload, ensure_ascii=False, default=_json_default).encode()
+        encoded = {}
+        for field, image in images.items():
+            ok, buffer = cv2.imencode(".png", image, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+            if not ok:
+                logger.warning(f"结果缓存图像编码失败 {key}.{field}")
+                return
+            encoded[field] = buffer.tobytes()
+        if len(data) + sum(len(b) for b in encoded.values()) > self.max_bytes:
+            return
+        self._json_path(key).parent.mkdir(parents=True, exist_ok=True)
+        for field, buffer in encoded.items():
+            self._write(self._image_path(key, field), buffer)
+        self._write(self._json_path(key), data)
+        self._touch(self._json_path(key))
+        with self._lock:
+            self._remember(key, data, {field: image.copy() for field, image in images.items()})
+        self._evict()
+
+    def _scan(self) -> list[tuple[int, str, int]]:
+        """扫描目录 [(访问时间 ns, 键, 条目总大小)] 同时清理残留的临时文件与孤立图像"""
+        now = time.time()
+        entries: dict[str, list] = {}
+        orphans = []
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for file in os.scandir(shard.path):
+                try:
+                    stat = file.stat()
+                except FileNotFoundError:
+                    continue
+                key, _, suffix = file.name.partition(".")
+                if suffix == "json":
+                    entry = entries.setdefault(key, [0, 0, True])
+                    entry[0] = stat.st_mtime_ns
+                    entry[1] += stat.st_size
+                    entry[2] = False
+                elif suffix.endswith(".png"):
+                    entry = entries.setdefault(key, [0, 0, True])
+                    entry[1] += stat.st_size
+                    orphans.append((key, file.path, stat.st_mtime))
+                elif now - stat.st_mtime > STALE_SECONDS:
+                    Path(file.path).unlink(missing_ok=True)
+        for key, path, mtime in orphans:
+            if entries[key][2] and now - mtime > STALE_SECONDS:
+                Path(path).unlink(missing_ok=True)
+        return [(mtime, key, size) for key, (mtime, size, orphan) in entries.items() if not orphan]
+
+    def _evict(self):
+        entries = sorted(self._scan())
+        total = sum(size for _, _, size in entries)
+        evicted = 0
+        for _, key, size in entries:
+            if total <= self.max_bytes:
+                break
+            # 先删 JSON(条目立即失效) 再删图像
+            json_path = self._json_path(key)
+            json_path.unlink(missing_ok=True)
+            for image_path in json_path.parent.glob(f"{key}.*.png"):
+                image_path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+            with self._lock:
+                self._memory.pop(key, None)
+        with self._lock:
+            self._items = len(entries) - evicted
+            self._size = total
+            self.evictions += evicted
+
+    def stats(self) -> dict:
+        """条目数、占用字节(最近一次写入时扫描)、命中/未命中/淘汰次数"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "items": self._items,
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+            }
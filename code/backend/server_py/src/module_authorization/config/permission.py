@@ -0,0 +1,55 @@
+# permission.py 路由级权限中间件配置
+from common.config.index import conf
+from common.middleware.permission import PermissionMiddleware
+from module_authorization.config.casbin_config import enforcer
+from module_authorization.dependencies.auth import auth_service_shared
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 默认免登录路径前缀
+PUBLIC_PATHS_DEFAULT = [
+    "/docs",
+    "/openapi.json",
+    "/authorization/auth/login",
+    "/authorization/auth/register",
+    "/authorization/auth/refresh",
+    "/authorization/token/jwks",
+    "/authorization/docs",
+    "/authorization/openapi.json",
+]
+# 默认仅需登录的路径(不做 casbin 鉴权)
+LOGIN_PATHS_DEFAULT = [
+    "/authorization/auth/me",
+    "/authorization/auth/me_id",
+    "/authorization/auth/logout",
+]
+
+
+async def resolve_principal(token: str):
+    """token -> 当前用户"""
+    return await auth_service_shared.get_current_user(token)
+
+
+async def check_permission(user, obj: str, act: str) -> bool:
+    """casbin 鉴权 主体为用户ID 对象为权限代码 动作为请求方法"""
+    return enforcer.enforce(user.id, obj, act)
+
+
+async def load_policy():
+    """应用启动完成后加载 casbin 策略"""
+    await enforcer.load_policy()
+
+
+def setup_permission_middleware(app):
+    """为根应用添加权限中间件"""
+    middleware_conf = conf.middleware
+    app.add_middleware(
+        PermissionMiddleware,
+        resolve_principal=resolve_principal,
+        check_permission=check_permission,
+        public_paths=list(middleware_conf.get("permission_public") or PUBLIC_PATHS_DEFAULT),
+        login_paths=list(middleware_conf.get("permission_login") or LOGIN_PATHS_DEFAULT),
+        on_startup=load_policy,
+    )
+    logger.info("权限中间件已启用")
@@ -1,11 +1,26 @@
 from common.config.server import app
+from common.config.index import conf
+from common.config.lifespan import startup_hooks, shutdown_hooks
+from common.utils.sys.periodic_task import PeriodicTask
+from module_authorization.service.token_sweeper import TokenSweeper
 # lib
 from fastapi import FastAPI
 import logging
-# # 引入权限中间件
-# from common.middleware.permission import PermissionMiddleware
-# # 添加权限中间件
-# app.add_middleware(PermissionMiddleware)
+
+# 路由级权限中间件(token/用户/casbin 每个请求只解析一次)
+if conf.middleware.get("permission"):
+    from module_authorization.config.permission import setup_permission_middleware
+
+    setup_permission_middleware(app)
+
+# 过期刷新令牌后台清理
+token_sweeper = PeriodicTask(
+    TokenSweeper(batch_size=conf.token.get("sweep_batch_size", 1000)).sweep_once,
+    interval_seconds=conf.token.get("sweep_interval_seconds", 3600),
+    name="token_sweeper",
+)
+startup_hooks.append(token_sweeper.start)
+shutdown_hooks.append(token_sweeper.stop)
 
 logger = logging.getLogger(__name__)
 
@@ -1,15 +1,39 @@
-from common.utils.security.token_util import TokenConfig
+from common.utils.security.token_util import TokenConfig, TokenUtil
+from common.utils.security.key_ring import KeyRing, ASYMMETRIC_ALGORITHMS
 # 从配置文件中读取token配置
 from common.config.index import conf
+from common.config.path import DIR_DB
 import logging
 logger = logging.getLogger(__name__)
 token_config: TokenConfig = None
+# 非对称签名密钥环(ES256/EdDSA) 进程内共享
+token_key_ring: KeyRing | None = None
 if 'token' in conf and conf.token:
     token_config = TokenConfig(
         secret=conf.token.secret_key,
         algorithm=conf.token.algorithm,
         expire_minutes=conf.token.expire_minutes,
         refresh_expire_days=conf.token.refresh_expire_days,
+        key_dir=conf.token.get("key_dir") or str(DIR_DB / "jwt_keys"),
+        key_rotate_days=conf.token.get("key_rotate_days", 30),
+        key_retain=conf.token.get("key_retain", 3),
     )
+    if token_config.algorithm in ASYMMETRIC_ALGORITHMS:
+        token_key_ring = KeyRing(
+            token_config.key_dir,
+            algorithm=token_config.algorithm,
+            rotate_days=token_config.key_rotate_days,
+            retain=token_config.key_retain,
+            # 刷新令牌有效期最长 签名密钥至少保留到其签出的令牌全部过期
+            token_ttl_seconds=max(
+                token_config.refresh_expire_days * 24 * 60 * 60,
+                token_config.expire_minutes * 60,
+            ),
+        )
 else:
     logger.error("token配置不存在")
+
+# 全局共享 TokenUtil(密钥对象只解析一次)
+token_util: TokenUtil | None = (
+    TokenUtil(token_config, token_key_ring) if token_config else None
+)
@@ -71,11 +71,11 @@ async def logout(
 async def refresh_access_token(
     refresh_token_request: RefreshTokenRequest,
     auth_service: AuthService = Depends(get_auth_service),
-) -> TokenResponseBase:
-    """刷新访问令牌"""
+) -> TokenResponseFull:
+    """刷新访问令牌 同时轮换刷新令牌"""
     try:
         token_response = await auth_service.token_refresh(refresh_token_request.token_refresh)
-    except HTTPException as e:
+    except Exception as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
     return token_response
 
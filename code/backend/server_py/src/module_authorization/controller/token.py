@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 import jwt
 
 from module_authorization.config.server import module_app
@@ -47,10 +47,15 @@ async def token_refresh(
     
     - **token_refresh**: 有效的刷新令牌
     
-    返回包含新的访问令牌和刷新令牌的Token对象
+    返回包含新的访问令牌和刷新令牌的Token对象(旧刷新令牌作废, 重复使用将撤销整个令牌族)
     """
     try:
         return await service.token_refresh(request.token_refresh)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -85,7 +90,7 @@ async def verify_token(
             "valid": True,
             "payload": payload
         }
-    except jwt.JWTError as e:
+    except jwt.PyJWTError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid token: {str(e)}",
@@ -155,5 +160,29 @@ async def get_token_info(
         )
 
 
+@router.get(
+    "/jwks",
+    summary="签名公钥集合(JWKS)"
+)
+async def get_jwks(
+    response: Response,
+    service:TokenService = Depends(get_token_service)
+):
+    """
+    获取令牌签名公钥集合(仅 ES256/EdDSA 非对称签名可用)
+    
+    边缘服务按令牌头 kid 选取公钥本地验签, 无需回调本服务
+    """
+    jwks = service.jwks()
+    if jwks is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="当前为对称签名, 无公钥集合"
+        )
+    # 允许边缘服务缓存 轮换后旧公钥仍保留一段时间
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return jwks
+
+
 # 将路由器挂载到模块应用
 module_app.include_router(router, prefix="/token", tags=["刷新令牌管理"])
\ No newline at end of file
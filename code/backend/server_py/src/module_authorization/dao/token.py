@@ -1,3 +1,4 @@
+from datetime import datetime
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select, update, delete
 from common.config.db import DaoRel
@@ -20,13 +21,25 @@ class TokenDao:
         await session.flush()
         return db_token
 
+    @DaoRel
+    async def get_token_by_jti(
+        self, jti: str, session: AsyncSession | None = None
+    ) -> Token | None:
+        """
+        根据jti(主键)获取令牌信息
+        :param jti: 令牌jti
+        :param session: 可选数据库会话
+        :return: 令牌对象，未找到返回None
+        """
+        return await session.get(Token, jti)
+
     @DaoRel
     async def get_token_by_user_id(
         self, user_id, session: AsyncSession | None = None
     ):
         """
         根据用户ID获取令牌信息
-        :param user_id: 用户ID  
+        :param user_id: 用户ID
         :param session: 可选数据库会话
         :return: 令牌对象，未找到返回None
         """
@@ -34,6 +47,30 @@ class TokenDao:
         result = await session.exec(stmt)
         return result.first()
 
+    @DaoRel
+    async def mark_token_replaced(
+        self, jti: str, replaced_by: str, session: AsyncSession | None = None
+    ) -> bool:
+        """
+        标记刷新令牌已被轮换(条件更新, 并发下只有一个请求能成功)
+        :param jti: 旧令牌jti
+        :param replaced_by: 新令牌jti
+        :param session: 可选数据库会话
+        :return: 是否标记成功, False 表示令牌已被使用或已撤销
+        """
+        stmt = (
+            update(Token)
+            .where(
+                Token.id == jti,
+                Token.replaced_by.is_(None),
+                Token.is_revoked.is_(False),
+            )
+            .values(replaced_by=replaced_by)
+        )
+        result = await session.exec(stmt)
+        await session.flush()
+        return result.rowcount > 0
+
     @DaoRel
     async def revoke_token_by_token_id(
         self, token_id, session: AsyncSession | None = None
@@ -48,17 +85,36 @@ class TokenDao:
         await session.flush()
         return result.rowcount > 0
 
+    @DaoRel
+    async def revoke_tokens_by_family_id(
+        self, family_id: str, session: AsyncSession | None = None
+    ) -> int:
+        """
+        撤销整个令牌族(检测到刷新令牌重放时使用)
+        :param family_id: 令牌族ID
+        :param session: 可选数据库会话
+        :return: 撤销数量
+        """
+        stmt = (
+            update(Token)
+            .where(Token.family_id == family_id, Token.is_revoked.is_(False))
+            .values(is_revoked=True)
+        )
+        result = await session.exec(stmt)
+        await session.flush()
+        return result.rowcount
+
     @DaoRel
     async def delete_token(
-        self, token, session: AsyncSession | None = None
+        self, jti, session: AsyncSession | None = None
     ):
         """
         删除令牌信息
-        :param token: 访问令牌
+        :param jti: 令牌jti
         :param session: 可选数据库会话
         :return: 删除是否成功
         """
-        stmt = delete(Token).where(Token.token == token)
+        stmt = delete(Token).where(Token.id == jti)
         result = await session.exec(stmt)
         await session.flush()
         return result.rowcount > 0
@@ -76,4 +132,23 @@ class TokenDao:
         stmt = delete(Token).where(Token.user_id == user_id)
         result = await session.exec(stmt)
         await session.flush()
-        return result.rowcount > 0
\ No newline at end of file
+        return result.rowcount > 0
+
+    @DaoRel
+    async def delete_expired_batch(
+        self, now: datetime, batch_size: int, session: AsyncSession | None = None
+    ) -> int:
+        """
+        分批删除过期令牌(走 expires_at 索引, 每批一个短事务)
+        :param now: 当前时间
+        :param batch_size: 每批删除数量
+        :param session: 可选数据库会话
+        :return: 本批删除数量
+        """
+        stmt = select(Token.id).where(Token.expires_at < now).limit(batch_size)
+        ids = (await session.exec(stmt)).all()
+        if not ids:
+            return 0
+        result = await session.exec(delete(Token).where(Token.id.in_(ids)))
+        await session.flush()
+        return result.rowcount
@@ -1,14 +1,20 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from module_authorization.service.auth import AuthService
 from module_authorization.service.user import UserService
 from module_authorization.service.token import TokenService
+from module_authorization.dao.user import UserDao
+from module_authorization.dao.token import TokenDao
 from module_authorization.dependencies.user import get_user_service
 from module_authorization.dependencies.token import get_token_service
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/authorization/auth/login")
 
+# 认证服务无状态 全局复用一份(权限中间件与当前用户依赖共用), 避免每个请求重建依赖图
+auth_service_shared = AuthService(UserService(UserDao()), TokenService(TokenDao()))
+
+
 async def get_auth_service(
     user_service: UserService = Depends(get_user_service),
     token_service: TokenService = Depends(get_token_service),
@@ -17,26 +23,30 @@ async def get_auth_service(
     return AuthService(user_service, token_service)
 
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
-    auth_service: AuthService = Depends(get_auth_service),
 ):
-    """获取当前用户"""
+    """获取当前用户 优先使用权限中间件已解析的用户"""
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
     try:
-        return await auth_service.get_current_user(token)
+        return await auth_service_shared.get_current_user(token)
 
     except Exception as e:
         # 捕获所有其他异常，确保错误信息能够传递给前端
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
 
 async def get_current_user_id(
+    request: Request,
     token: str = Depends(oauth2_scheme),
-    auth_service: AuthService = Depends(get_auth_service),
 ):
-    """获取当前用户ID"""
+    """获取当前用户ID 优先使用权限中间件已解析的用户"""
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user.id
     try:
-        return await auth_service.get_current_user_id(token)
+        return await auth_service_shared.get_current_user_id(token)
     except Exception as e:
         # 捕获所有其他异常，确保错误信息能够传递给前端
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
-
-
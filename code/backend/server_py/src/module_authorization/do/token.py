@@ -6,26 +6,33 @@ from common.utils.security.token_util import TokenType
 
 
 class TokenBase(SQLModel):
-    """令牌基础模型(不含数据库表配置)"""
+    """刷新令牌基础模型(不含数据库表配置) 只存元数据, 不存令牌原文"""
 
-    user_id: str = Field(..., description="用户ID")
-    token: str = Field(..., description="访问令牌")
-    token_type: TokenType = Field(default=TokenType.access, description="令牌类型")
+    user_id: str = Field(..., index=True, description="用户ID")
+    family_id: str = Field(
+        ..., index=True, description="令牌族ID(同一次登录轮换出的刷新令牌共用)"
+    )
+    token_type: TokenType = Field(default=TokenType.refresh, description="令牌类型")
     expires_in: int = Field(..., description="过期时间(秒)")
     expires_at: datetime = Field(
-        ..., sa_column=Column(DateTime(timezone=True)), description="过期时间"
+        ...,
+        sa_column=Column(DateTime(timezone=True), index=True),
+        description="过期时间",
     )
     is_revoked: bool = Field(default=False, description="是否已撤销")
+    replaced_by: str | None = Field(
+        default=None, description="轮换后的新令牌jti(已使用标记)"
+    )
 
 
 class Token(TokenBase, table=True):
-    """令牌数据库模型(对应数据库表)"""
+    """刷新令牌数据库模型(对应数据库表) 主键即令牌jti"""
 
     id: str = Field(
         default_factory=lambda: uuid4().hex,
-        primary_key=True,  # 主键
+        primary_key=True,  # 主键 jti
         index=True,  # 索引
-        description="唯一标识符",
+        description="唯一标识符(jti)",
     )
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
@@ -46,7 +53,7 @@ class Token(TokenBase, table=True):
 class TokenCreate(TokenBase):
     """创建令牌的请求模型"""
 
-    pass
+    id: str = Field(..., description="令牌jti")
 
 
 class TokenUpdate(TokenBase):
@@ -77,6 +84,7 @@ class TokenCreateRequest(BaseModel):
     user_id: str = Field(..., description="用户ID")
     token_type: TokenType = Field(default=TokenType.access, description="令牌类型")
     additional_data: dict | None = Field(None, description="附加数据")
+    family_id: str | None = Field(None, description="刷新令牌族ID(轮换时沿用)")
 
 
 class RefreshTokenRequest(BaseModel):
@@ -8,8 +8,8 @@ from module_authorization.do.token import (
 )
 from module_authorization.do.auth import AuthResponse, AuthLogoutRequest
 
-# db_cache redis客户端 用于存储已吊销的 access_token 的黑名单
-from common.config.db import db_cache 
+# async_cache redis客户端 用于存储已吊销的 access_token 的黑名单
+from common.config.db import async_cache
 from module_authorization.config.token import token_config
 
 import logging
@@ -104,7 +104,7 @@ class AuthService:
             raise ValueError("访问令牌无效")
         try:
             # 对于安全性要求较高的系统，采用黑名单/废止列表来使 access_token 立即失效
-            await db_cache .set(
+            await async_cache.set(
                 logout_request.token_access,
                 "revoked",
                 ex=token_config.expire_minutes * 60,
@@ -128,9 +128,7 @@ class AuthService:
         """
         try:
             # 黑名单 检查令牌是否已被吊销
-            revoked = await db_cache .get(token_access)
-            # 查看所有async_redis内的键值对
-            logger.info(f"db_cache  内的键值对: {await db_cache .keys()}")
+            revoked = await async_cache.get(token_access)
             if revoked == b"revoked":
                 raise ValueError("令牌已被吊销")
             return await self.token_service.verify_token(token_access)
@@ -181,12 +179,12 @@ class AuthService:
 
     async def token_refresh(self, token_refresh: str) -> TokenResponseFull:
         """
-        刷新访问令牌
+        刷新访问令牌(刷新令牌同时轮换, 旧刷新令牌作废)
         :param token_refresh: 刷新令牌
-        :return: 新的令牌响应
-        :raises: ValueError 如果刷新令牌无效
+        :return: 新的访问令牌和刷新令牌
+        :raises: ValueError 如果刷新令牌无效或已被使用
         """
-        # 验证刷新令牌有效性
+        # 验证刷新令牌有效性(只解码一次 载荷直接用于轮换)
         payload = await self.token_service.verify_token(token_refresh, TokenType.refresh)
         user_id = payload.get("sub")
         if not user_id:
@@ -198,11 +196,5 @@ class AuthService:
         if not user.is_active:
             raise ValueError("用户账户已被禁用")
 
-        # 创建新的令牌请求
-        token_request = TokenCreateRequest(
-            user_id=user.id,
-            token_type=TokenType.access,
-        )
-        # 生成新令牌
-        new_token = await self.token_service.create_token(token_request)
-        return new_token
+        # 轮换刷新令牌并生成新的访问令牌
+        return await self.token_service.rotate_refresh_token(payload)
@@ -1,10 +1,14 @@
 from module_authorization.do.token import TokenType
-from datetime import datetime, timedelta, timezone
+from uuid import uuid4
 import jwt
-from common.utils.security.token_util import TokenUtil, TokenConfig
+from common.utils.security.token_util import TokenUtil
 from module_authorization.dao.token import TokenDao
-from module_authorization.do.token import TokenCreate, TokenResponseBase
-from module_authorization.config.token import token_config
+from module_authorization.do.token import (
+    TokenCreate,
+    TokenResponseBase,
+    TokenResponseFull,
+)
+from module_authorization.config.token import token_util
 from module_authorization.do.token import TokenCreateRequest
 import logging
 
@@ -16,37 +20,42 @@ class TokenService:
 
     def __init__(self, token_dao: TokenDao):
         self.token_dao = token_dao
-        # 初始化TokenUtil工具类(使用BaseModel配置类)
-        self.token_util = TokenUtil(token_config)
+        # 共享TokenUtil工具类(非对称签名时复用已解析的密钥对象)
+        self.token_util: TokenUtil = token_util
 
     async def create_token(self, request: TokenCreateRequest) -> TokenResponseBase:
         """
-        创建访问令牌和刷新令牌
-        :param request: 令牌创建请求对象，包含user_id、username和additional_data
+        创建访问令牌或刷新令牌
+        :param request: 令牌创建请求对象，包含user_id、token_type和additional_data
         :return: Token对象
         """
         token_id = None
-        # 使用TokenUtil创建访问令牌
+        additional_data = dict(request.additional_data or {})
+        # 刷新令牌以jti为主键入库 载荷中携带jti
+        if request.token_type == TokenType.refresh:
+            token_id = uuid4().hex
+            additional_data["jti"] = token_id
+        # 使用TokenUtil创建令牌
         token = self.token_util.create_token(
             user_id=request.user_id,
             token_type=request.token_type,
-            additional_data=request.additional_data,
+            additional_data=additional_data,
         )
         # 获取过期时间
         expires_at, expires_in = self.token_util.get_token_expiry(request.token_type)
 
-        # 只保存刷新令牌信息，访问令牌不保存
+        # 只保存刷新令牌元数据，访问令牌不保存
         if request.token_type == TokenType.refresh:
             token_info = TokenCreate(
+                id=token_id,
                 user_id=request.user_id,
-                token=token,  # 这里存储的是刷新令牌
+                family_id=request.family_id or token_id,
                 token_type=request.token_type,
                 expires_in=expires_in,
                 expires_at=expires_at,
             )
-            token_info = await self.token_dao.save_token(token_info)
-            token_id = token_info.id
-        # 返回访问令牌和过期时间
+            await self.token_dao.save_token(token_info)
+        # 返回令牌和过期时间
         token_response = TokenResponseBase(
             token=token, expires_in=expires_in, token_id=token_id
         )
@@ -60,64 +69,92 @@ class TokenService:
         :param token: 待验证的令牌字符串
         :param token_type: 令牌类型，必须为 access 或 refresh
         :return: 令牌载荷(用户ID等信息)
-        :raises jwt.JWTError: 令牌无效、过期或已被撤销
+        :raises jwt.InvalidTokenError: 令牌无效、过期、已被撤销或已被使用
         """
         try:
             payload = self.token_util.verify_token(token)
-            user_id = payload.get("sub")
-            if not user_id:
-                raise jwt.JWTError("Invalid token payload: missing 'sub'")
-
-            # 刷新令牌必须检查数据库状态(是否被撤销)
-            if token_type == TokenType.refresh:
-                token_info = await self.token_dao.get_token_by_user_id(user_id)
-                if not token_info or token_info.is_revoked:
-                    raise jwt.JWTError("Token has been revoked")
-
-            return payload
-
         except jwt.ExpiredSignatureError:
-            # 过期刷新令牌自动撤销，仅抛出错误，由上层决定是否清理
-            raise jwt.JWTError("Token has expired")
+            raise jwt.InvalidTokenError("Token has expired")
+        except jwt.PyJWTError:
+            raise jwt.InvalidTokenError("Invalid token")
+
+        user_id = payload.get("sub")
+        if not user_id:
+            raise jwt.InvalidTokenError("Invalid token payload: missing 'sub'")
+
+        # 刷新令牌必须按jti(主键)检查数据库状态
+        if token_type == TokenType.refresh:
+            jti = payload.get("jti")
+            if not jti:
+                raise jwt.InvalidTokenError("Invalid token payload: missing 'jti'")
+            token_info = await self.token_dao.get_token_by_jti(jti)
+            if not token_info or token_info.user_id != user_id:
+                raise jwt.InvalidTokenError("Token not found")
+            if token_info.is_revoked:
+                raise jwt.InvalidTokenError("Token has been revoked")
+            if token_info.replaced_by:
+                # 已轮换的刷新令牌再次出现 视为泄露重放 撤销整个令牌族
+                await self._revoke_family_on_reuse(token_info.family_id, jti)
+                raise jwt.InvalidTokenError("Token has already been used")
+            payload["family_id"] = token_info.family_id
+
+        return payload
+
+    async def _revoke_family_on_reuse(self, family_id: str, jti: str):
+        count = await self.token_dao.revoke_tokens_by_family_id(family_id)
+        logger.warning(
+            f"检测到刷新令牌重放 jti={jti}, 已撤销令牌族 {family_id} 共 {count} 个"
+        )
 
-        except (jwt.InvalidTokenError, jwt.PyJWTError):
-            raise jwt.JWTError("Invalid token")
+    async def rotate_refresh_token(self, payload: dict) -> TokenResponseFull:
+        """
+        刷新令牌轮换: 旧刷新令牌只能使用一次, 换发新的访问令牌和刷新令牌(同一令牌族)
+        :param payload: 已验证的刷新令牌载荷(verify_token 返回 含 sub/jti/family_id)
+        :return: 新的访问令牌和刷新令牌
+        :raises jwt.InvalidTokenError: 刷新令牌已被使用
+        """
+        user_id = payload["sub"]
+        jti = payload["jti"]
+        family_id = payload["family_id"]
+
+        token_refresh_new = await self.create_token(
+            TokenCreateRequest(
+                user_id=user_id, token_type=TokenType.refresh, family_id=family_id
+            )
+        )
+        # 条件更新 并发请求中只有一个能完成轮换 其余视为重放
+        if not await self.token_dao.mark_token_replaced(
+            jti, token_refresh_new.token_id
+        ):
+            await self._revoke_family_on_reuse(family_id, jti)
+            raise jwt.InvalidTokenError("Token has already been used")
+        token_access = await self.create_token(
+            TokenCreateRequest(user_id=user_id, token_type=TokenType.access)
+        )
+        return TokenResponseFull(access=token_access, refresh=token_refresh_new)
 
-    async def token_refresh(self, token_refresh):
+    async def token_refresh(self, token_refresh) -> TokenResponseFull:
         """
-        使用刷新令牌获取新的访问令牌
+        使用刷新令牌获取新的访问令牌(刷新令牌同时轮换)
         :param token_refresh: 刷新令牌
-        :return: 新的Token对象
+        :return: 新的访问令牌和刷新令牌
         """
         try:
-            # 验证刷新令牌
-            payload = await self.verify_token(
-                token_refresh, token_type=TokenType.refresh
-            )
-
-            # 从载荷中获取用户信息
-            user_id = payload.get("sub")
-
-            # 创建TokenCreateRequest对象
-            request = TokenCreateRequest(user_id=user_id)
-
-            # 创建新的令牌对
-            return await self.create_token(request)
-        except jwt.JWTError as e:
+            payload = await self.verify_token(token_refresh, token_type=TokenType.refresh)
+            return await self.rotate_refresh_token(payload)
+        except jwt.PyJWTError as e:
             raise ValueError(f"Invalid refresh token: {str(e)}")
 
-    async def revoke_token(self, token, token_id):
+    async def revoke_token(self, token, token_id=None):
         """
         撤销令牌
-        :param token: 要撤销的令牌
+        :param token: 要撤销的刷新令牌
+        :param token_id: 刷新令牌ID(jti) 以令牌载荷为准
         :return: 撤销是否成功
         """
         # 验证并获取信息
         payload = await self.verify_token(token, token_type=TokenType.refresh)
-        token_id = payload.get("token_id")
-        if not token_id:
-            raise ValueError("Invalid token payload: missing 'token_id'")
-        return await self.token_dao.revoke_token_by_token_id(token_id)
+        return await self.token_dao.revoke_token_by_token_id(payload["jti"])
 
     async def revoke_all_tokens_by_user(self, user_id):
         """
@@ -126,6 +163,15 @@ class TokenService:
         """
         await self.token_dao.delete_tokens_by_user_id(user_id)
 
+    def jwks(self) -> dict | None:
+        """
+        获取签名公钥集合(JWKS) 仅非对称签名时可用
+        :return: JWKS字典 对称签名返回None
+        """
+        if self.token_util.key_ring is None:
+            return None
+        return self.token_util.key_ring.jwks()
+
     async def get_token_by_user_id(self, user_id):
         """
         通过用户ID获取令牌信息
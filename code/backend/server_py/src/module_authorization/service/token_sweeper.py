@@ -0,0 +1,39 @@
+import asyncio
+from datetime import datetime, timezone
+from module_authorization.dao.token import TokenDao
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TokenSweeper:
+    """
+    过期刷新令牌清理(由 PeriodicTask 定时执行 脱离请求链路)
+    按 expires_at 索引分批删除, 每批独立短事务, 批间让出事件循环
+    """
+
+    def __init__(self, token_dao: TokenDao | None = None, batch_size: int = 1000):
+        """
+        :param token_dao: 令牌DAO
+        :param batch_size: 每批删除数量
+        """
+        self.token_dao = token_dao or TokenDao()
+        self.batch_size = batch_size
+
+    async def sweep_once(self) -> int:
+        """
+        执行一轮清理
+        :return: 删除总数
+        """
+        now = datetime.now(timezone.utc)
+        total = 0
+        while True:
+            deleted = await self.token_dao.delete_expired_batch(now, self.batch_size)
+            total += deleted
+            if deleted < self.batch_size:
+                break
+            # 批间让出事件循环 避免长时间占用数据库连接
+            await asyncio.sleep(0)
+        if total:
+            logger.info(f"已清理过期刷新令牌 {total} 个")
+        return total
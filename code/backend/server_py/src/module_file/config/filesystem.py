@@ -6,19 +6,92 @@ from module_file.utils.multi_storage.do.storage_config import (
     StorageConfigFactory,
     StorageConfig,
 )
+from module_file.utils.multi_storage.chunk.fastcdc import FastCDC
+from module_file.utils.multi_storage.chunk.chunk_store import ChunkStore
+from module_file.dao.chunk import ChunkDao
+from module_file.utils.content_hash import resolve_algorithm
 from common.config.index import conf, is_dev
 from common.config.path import DIR_UPLOAD
 import logging
 
 logger = logging.getLogger(__name__)
 storage: StorageInterface = None
+storage_config: StorageConfig = None
 if conf.file_system.storage_type:
-    storage_config: StorageConfig = StorageConfigFactory.create(
-        conf.file_system.storage_type, conf.file_system
-    )
+    storage_config_dict = dict(conf.file_system)
     # 默认使用common配置
     if conf.file_system.storage_type == "local":
-        if not conf.file_system.local:
-            storage_config.base_dir = str(DIR_UPLOAD)
+        if not conf.file_system.get("base_dir"):
+            storage_config_dict["base_dir"] = str(DIR_UPLOAD)
+    # S3/MinIO/rustfs 连接配置在 s3 子节点下
+    storage_config_dict.update(dict(conf.file_system.get("s3") or {}))
+    storage_config = StorageConfigFactory.create(
+        conf.file_system.storage_type, storage_config_dict
+    )
 
     storage: StorageInterface = StorageFactory.create(storage_config)
+
+# 单文件上传大小限制(字节)
+max_size: int = storage_config.max_size if storage_config else StorageConfig().max_size
+# 上传流式读取块大小
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# 内容哈希算法(去重键/ETag) 可选依赖未安装时回退 sha256-tree
+CONTENT_HASH_ALGORITHM: str = resolve_algorithm(
+    conf.file_system.get("hash_algorithm", "md5")
+)
+
+# 块级去重存储(可选) 开启后新上传文件按内容定义分块存储
+chunk_store: ChunkStore | None = None
+chunking_conf = conf.file_system.get("chunking") or {}
+if storage and chunking_conf.get("enabled"):
+    chunk_store = ChunkStore(
+        storage,
+        ChunkDao(),
+        FastCDC(
+            min_size=chunking_conf.get("min_size", 16 * 1024),
+            avg_size=chunking_conf.get("avg_size", 64 * 1024),
+            max_size=chunking_conf.get("max_size", 256 * 1024),
+        ),
+    )
+    logger.info("块级去重存储已启用")
+
+# 断点续传分片上传配置
+multipart_conf = conf.file_system.get("multipart") or {}
+# 默认分片大小(S3 要求除最后一片外不小于5MB)
+MULTIPART_PART_SIZE: int = StorageConfig.parse_max_size(
+    multipart_conf.get("part_size", 8 * 1024 * 1024)
+)
+# 分片上传单文件大小上限
+MULTIPART_MAX_SIZE: int = StorageConfig.parse_max_size(
+    multipart_conf.get("max_size", 10 * 1024 * 1024 * 1024)
+)
+# 未完成会话过期时间(小时)
+MULTIPART_EXPIRE_HOURS: int = multipart_conf.get("expire_hours", 24)
+
+# 物理文件回收(引用归零后延迟删除)
+gc_conf = conf.file_system.get("gc") or {}
+# 宽限期(秒) 期间重新被引用的对象不回收
+GC_GRACE_SECONDS: int = gc_conf.get("grace_seconds", 3600)
+# 每批回收数量
+GC_BATCH_SIZE: int = gc_conf.get("batch_size", 500)
+
+# 图片派生(缩略图)缓存
+derivative_conf = conf.file_system.get("derivative") or {}
+# 允许的目标宽高(防止任意尺寸撑爆缓存)
+DERIVATIVE_SIZES: list[int] = sorted(
+    derivative_conf.get("sizes", [64, 128, 256, 512, 1024, 2048])
+)
+# 默认有损压缩质量
+DERIVATIVE_QUALITY: int = derivative_conf.get("quality", 80)
+# 原图大小上限
+DERIVATIVE_MAX_SOURCE_SIZE: int = StorageConfig.parse_max_size(
+    derivative_conf.get("max_source_size", 50 * 1024 * 1024)
+)
+# 原图像素上限(防止解压炸弹)
+DERIVATIVE_MAX_PIXELS: int = StorageConfig.parse_max_size(
+    derivative_conf.get("max_pixels", 100_000_000)
+)
+# 生成线程数
+DERIVATIVE_WORKERS: int = derivative_conf.get("workers", 2)
+# 浏览器缓存时间(秒)
+DERIVATIVE_CACHE_MAX_AGE: int = derivative_conf.get("cache_max_age", 7 * 24 * 3600)
@@ -1,12 +1,40 @@
 from common.config.server import app
+from common.config.lifespan import startup_hooks, shutdown_hooks
+from common.utils.sys.periodic_task import PeriodicTask
+from module_file.config.filesystem import storage, multipart_conf, gc_conf
+from module_file.service.upload_session import UploadSessionService
+from module_file.service.storage_gc import StorageGcService
 # lib
 from fastapi import FastAPI
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 对象存储共享客户端(每个worker一个连接池) 随应用启动/关闭
+if hasattr(storage, "connect"):
+    startup_hooks.append(storage.connect)
+    shutdown_hooks.append(storage.close)
+
+# 过期未完成的分片上传会话后台清理
+upload_session_sweeper = PeriodicTask(
+    UploadSessionService().sweep_expired,
+    interval_seconds=multipart_conf.get("sweep_interval_seconds", 3600),
+    name="upload_session_sweeper",
+)
+startup_hooks.append(upload_session_sweeper.start)
+shutdown_hooks.append(upload_session_sweeper.stop)
+
+# 无引用物理文件后台回收
+storage_gc = PeriodicTask(
+    StorageGcService().collect,
+    interval_seconds=gc_conf.get("interval_seconds", 300),
+    name="storage_gc",
+)
+startup_hooks.append(storage_gc.start)
+shutdown_hooks.append(storage_gc.stop)
+
 module_app = FastAPI()
 
 app.mount("/file", module_app)
 
-logger.info("ok...server module_file服务配置")
\ No newline at end of file
+logger.info("ok...server module_file服务配置")
@@ -0,0 +1,69 @@
+from module_file.config.server import module_app
+from module_file.config.filesystem import DERIVATIVE_CACHE_MAX_AGE
+from module_file.dependencies.derivative import get_derivative_service
+from module_file.service.derivative import DerivativeService
+from module_file.do.derivative import DerivativeFit, DerivativeFormat
+from common.utils.fastapiEX.http_range import etag_matches
+
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    status,
+    Depends,
+    Header,
+    Query,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+
+router = APIRouter()
+
+
+@router.get("/{file_id}", summary="获取图片缩略图/派生图")
+async def get_derivative(
+    file_id: str,
+    width: int = Query(..., alias="w", description="目标宽度(只允许配置的尺寸)"),
+    height: int | None = Query(None, alias="h", description="目标高度 不填按宽度等比"),
+    fit: DerivativeFit = Query(DerivativeFit.CONTAIN, description="缩放方式"),
+    format: DerivativeFormat = Query(DerivativeFormat.WEBP, alias="fmt", description="输出格式"),
+    quality: int | None = Query(None, alias="q", ge=1, le=100, description="压缩质量"),
+    if_none_match: str | None = Header(None, alias="If-None-Match"),
+    service: DerivativeService = Depends(get_derivative_service),
+):
+    """
+    获取图片缩略图/派生图 首次请求生成并缓存 支持 ETag 协商缓存
+    :param file_id: 原图文件ID
+    :param width: 目标宽度
+    :param height: 目标高度
+    :param fit: 缩放方式 contain/cover
+    :param format: 输出格式 webp/jpeg/png
+    :param quality: 压缩质量
+    :param if_none_match: If-None-Match 请求头
+    :param service: 派生图服务依赖注入
+    :return: 派生图数据流
+    """
+    try:
+        spec = service.build_spec(width, height, fit, format, quality)
+        file_info = await service.get_source(file_id)
+        # 派生图由原图内容与规格唯一确定 生成前即可协商缓存
+        headers = {
+            "ETag": f'"{file_info.content_hash}-{spec.name}"',
+            "Cache-Control": f"public, max-age={DERIVATIVE_CACHE_MAX_AGE}",
+        }
+        if etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        key, size = await service.ensure(file_info, spec)
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(
+            service.storage.stream(key), media_type=spec.media_type, headers=headers
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+# 将路由注册到模块应用
+module_app.include_router(router, prefix="/derivative", tags=["图片派生"])
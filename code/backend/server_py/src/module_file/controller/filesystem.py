@@ -1,7 +1,12 @@
 from module_file.config.server import module_app
 from module_file.dependencies.filesystem import get_file_service
 from module_file.service.filesystem import FileService
-from module_file.do.filesystem import FileEntry, FileEntryUpdate
+from module_file.do.filesystem import (
+    FileEntry,
+    FileEntryUpdate,
+    FileIdList,
+    BulkResult,
+)
 from common.utils.db.schema.pagination import (
     InfiniteScrollParams,
     InfiniteScrollResponse,
@@ -17,8 +22,16 @@ from fastapi import (
     UploadFile,
     File as FastAPIFile,
     Query,
+    Header,
+    Response,
 )
 from fastapi.responses import StreamingResponse
+from urllib.parse import quote
+from common.utils.fastapiEX.http_range import (
+    parse_range,
+    etag_matches,
+    RangeNotSatisfiable,
+)
 
 router = APIRouter()
 
@@ -44,6 +57,74 @@ async def upload_file(
     """
     try:
         return await service.upload_file(file, description, owner_user_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.post(
+    "/bulk/upload",
+    summary="批量上传文件",
+    status_code=status.HTTP_200_OK,
+    response_model=BulkResult,
+)
+async def bulk_upload_files(
+    files: list[UploadFile] = FastAPIFile(...),
+    description: str = None,
+    owner_user_id: str = None,
+    service: FileService = Depends(get_file_service),
+) -> BulkResult:
+    """
+    一次请求上传多个文件 返回逐项结果
+    :param files: 要上传的文件列表
+    :param description: 文件描述
+    :param owner_user_id: 上传者ID
+    :param service: 文件服务依赖注入
+    :return: 批量结果报告
+    """
+    try:
+        return await service.upload_files(files, description, owner_user_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.post("/bulk/delete", summary="批量删除文件", response_model=BulkResult)
+async def bulk_delete_files(
+    request: FileIdList,
+    service: FileService = Depends(get_file_service),
+) -> BulkResult:
+    """
+    批量删除文件(一个事务批量删除记录 物理文件由后台回收) 返回逐项结果
+    :param request: 文件ID列表
+    :param service: 文件服务依赖注入
+    :return: 批量结果报告
+    """
+    try:
+        return await service.delete_many(request.ids)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.post("/bulk/get", summary="批量获取文件信息", response_model=BulkResult)
+async def bulk_get_files(
+    request: FileIdList,
+    service: FileService = Depends(get_file_service),
+) -> BulkResult:
+    """
+    按ID列表批量获取文件信息 返回逐项结果
+    :param request: 文件ID列表
+    :param service: 文件服务依赖注入
+    :return: 批量结果报告
+    """
+    try:
+        return await service.get_many(request.ids)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
@@ -51,25 +132,63 @@ async def upload_file(
 
 
 @router.get("/download/{file_id}", summary="下载文件")
-async def download_file(file_id: str, service: FileService = Depends(get_file_service)):
+async def download_file(
+    file_id: str,
+    range_header: str | None = Header(None, alias="Range"),
+    if_none_match: str | None = Header(None, alias="If-None-Match"),
+    if_range: str | None = Header(None, alias="If-Range"),
+    service: FileService = Depends(get_file_service),
+):
     """
-    下载文件
+    下载文件 支持 Range 断点续传/拖动播放 与 ETag 协商缓存
     :param file_id: 文件ID
+    :param range_header: Range 请求头(仅支持单段范围)
+    :param if_none_match: If-None-Match 请求头
+    :param if_range: If-Range 请求头 与 ETag 不一致时返回整个文件
     :param service: 文件服务依赖注入
     :return: 文件数据流
     """
     try:
-        file_name, mime_type, file_path = await service.get_file_info_for_download(
-            file_id
-        )
+        file_info = await service.get_file_info_for_download(file_id)
+        file_size = file_info.file_size_bytes
+        headers = {
+            "Content-Disposition": f"attachment; filename*=UTF-8''{quote(file_info.name)}",
+            "Accept-Ranges": "bytes",
+        }
+        etag = f'"{file_info.content_hash}"' if file_info.content_hash else None
+        if etag:
+            headers["ETag"] = etag
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        byte_range = None
+        if not if_range or (etag and if_range.strip() == etag):
+            try:
+                byte_range = parse_range(range_header, file_size)
+            except RangeNotSatisfiable as e:
+                return Response(
+                    status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                    headers={"Content-Range": str(e)},
+                )
+
+        if byte_range:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+            headers["Content-Length"] = str(end - start + 1)
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+        else:
+            start, end = 0, None
+            headers["Content-Length"] = str(file_size)
+            status_code = status.HTTP_200_OK
 
         # 返回文件流
-        iter_file = service.stream_file_content(file_path)
+        iter_file = service.stream_file_content(file_info.physical_storage, start, end)
 
         return StreamingResponse(
             iter_file,
-            media_type=mime_type,
-            headers={"Content-Disposition": f'attachment; filename="{file_name}"'},
+            status_code=status_code,
+            media_type=file_info.mime_type,
+            headers=headers,
         )
     except HTTPException:
         raise
@@ -0,0 +1,147 @@
+from module_file.config.server import module_app
+from module_file.dependencies.upload_session import get_upload_session_service
+from module_file.service.upload_session import UploadSessionService
+from module_file.do.filesystem import FileEntry
+from module_file.do.upload_session import (
+    UploadSessionCreate,
+    UploadSessionInfo,
+    UploadPart,
+)
+
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    status,
+    Depends,
+    Header,
+    Path,
+    Request,
+)
+
+router = APIRouter()
+
+
+@router.post(
+    "",
+    summary="创建分片上传会话",
+    status_code=status.HTTP_201_CREATED,
+    response_model=UploadSessionInfo,
+)
+async def create_upload_session(
+    request: UploadSessionCreate,
+    service: UploadSessionService = Depends(get_upload_session_service),
+) -> UploadSessionInfo:
+    """
+    创建分片上传会话
+    :param request: 文件名、总大小、分片大小等
+    :param service: 上传会话服务依赖注入
+    :return: 上传会话信息
+    """
+    try:
+        return await service.create(request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.get("/{session_id}", summary="查询上传会话及已上传分片", response_model=UploadSessionInfo)
+async def get_upload_session(
+    session_id: str,
+    service: UploadSessionService = Depends(get_upload_session_service),
+) -> UploadSessionInfo:
+    """
+    查询上传会话 断线重连后据此只重传缺失分片
+    :param session_id: 会话ID
+    :param service: 上传会话服务依赖注入
+    :return: 上传会话信息
+    """
+    try:
+        return await service.get_info(session_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.put("/{session_id}/parts/{part_number}", summary="上传分片", response_model=UploadPart)
+async def upload_part(
+    request: Request,
+    session_id: str,
+    part_number: int = Path(..., ge=1, description="分片号(从1开始)"),
+    checksum: str | None = Header(None, alias="X-Part-MD5", description="分片MD5(十六进制)"),
+    service: UploadSessionService = Depends(get_upload_session_service),
+) -> UploadPart:
+    """
+    上传分片 请求体为分片原始字节(流式接收) 不同分片可并行上传
+    :param request: 请求对象(读取原始请求体)
+    :param session_id: 会话ID
+    :param part_number: 分片号
+    :param checksum: 分片MD5 校验失败返回400
+    :param service: 上传会话服务依赖注入
+    :return: 分片记录
+    """
+    try:
+        return await service.upload_part(
+            session_id, part_number, request.stream(), checksum
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.post(
+    "/{session_id}/complete",
+    summary="合并分片完成上传",
+    status_code=status.HTTP_201_CREATED,
+    response_model=FileEntry,
+)
+async def complete_upload_session(
+    session_id: str,
+    service: UploadSessionService = Depends(get_upload_session_service),
+) -> FileEntry:
+    """
+    合并分片完成上传
+    :param session_id: 会话ID
+    :param service: 上传会话服务依赖注入
+    :return: 文件信息
+    """
+    try:
+        return await service.complete(session_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.delete("/{session_id}", summary="取消上传会话", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload_session(
+    session_id: str,
+    service: UploadSessionService = Depends(get_upload_session_service),
+):
+    """
+    取消上传会话 清理已上传分片
+    :param session_id: 会话ID
+    :param service: 上传会话服务依赖注入
+    """
+    try:
+        await service.abort(session_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+# 将路由注册到模块应用
+module_app.include_router(router, prefix="/upload_session", tags=["分片上传"])
@@ -0,0 +1,208 @@
+from collections import Counter, defaultdict
+from typing import Awaitable, Callable
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel import select, update, delete, insert, func
+from common.config.db import DaoRel
+from common.utils.db.utils.statement import batched, insert_ignore
+from module_file.do.chunk import FileChunk, FileChunkRef
+
+
+class ChunkDao:
+    @DaoRel
+    async def reserve(
+        self,
+        counter: Counter,
+        sizes: dict[str, int],
+        session: AsyncSession | None = None,
+    ) -> set[str]:
+        """
+        预占块并增加引用计数: 不存在的块先登记(stored=False) 与加引用在同一事务(行锁)
+        物理块写入前块已有引用 并发释放同一块的一方不会删除它
+        释放方删除块记录与物理块时持有同一行锁 加上引用的块不会被并发删除
+        :param counter: 块哈希 -> 引用次数
+        :param sizes: 块哈希 -> 块大小
+        :param session: 可选数据库会话
+        :return: 物理块已写入的块哈希集合(其余由调用方写入后 mark_stored)
+        """
+        found: dict[str, bool] = {}
+        for batch in batched(list(counter)):
+            stmt = (
+                select(FileChunk.hash, FileChunk.stored)
+                .where(FileChunk.hash.in_(batch))
+                .with_for_update()
+            )
+            found.update((await session.exec(stmt)).all())
+        missing = [h for h in counter if h not in found]
+        # 并发预占同一新块时 主键冲突忽略后各自增加引用
+        for batch in batched(missing):
+            await session.exec(
+                insert_ignore(session, FileChunk).values(
+                    [{"hash": h, "size": sizes[h], "ref_count": 0, "stored": False} for h in batch]
+                )
+            )
+        await self._change_ref_count(counter, 1, session)
+        await session.flush()
+        return {h for h, stored in found.items() if stored}
+
+    @DaoRel
+    async def mark_stored(self, hashes: list[str], session: AsyncSession | None = None):
+        """
+        标记物理块已写入
+        :param hashes: 块哈希列表
+        :param session: 可选数据库会话
+        """
+        for batch in batched(hashes):
+            await session.exec(
+                update(FileChunk).where(FileChunk.hash.in_(batch)).values(stored=True)
+            )
+        await session.flush()
+
+    @DaoRel
+    async def add_object(
+        self,
+        object_key: str,
+        chunks: list[tuple[str, int]],
+        session: AsyncSession | None = None,
+    ):
+        """
+        登记分块对象的块清单(块引用已由 reserve 增加)
+        :param object_key: 分块对象键
+        :param chunks: 按顺序的 (块哈希, 块大小) 列表
+        :param session: 可选数据库会话
+        """
+        rows = []
+        offset = 0
+        for seq, (chunk_hash, size) in enumerate(chunks):
+            rows.append(
+                {
+                    "object_key": object_key,
+                    "seq": seq,
+                    "chunk_hash": chunk_hash,
+                    "offset": offset,
+                    "size": size,
+                }
+            )
+            offset += size
+        for batch in batched(rows):
+            await session.exec(insert(FileChunkRef).values(batch))
+        await session.flush()
+
+    async def _change_ref_count(
+        self, counter: Counter, sign: int, session: AsyncSession
+    ):
+        # 按增量分组 大多数块只出现一次 通常一条语句完成
+        by_count: dict[int, list[str]] = defaultdict(list)
+        for chunk_hash, count in counter.items():
+            by_count[count].append(chunk_hash)
+        for count, hashes in by_count.items():
+            for batch in batched(hashes):
+                stmt = (
+                    update(FileChunk)
+                    .where(FileChunk.hash.in_(batch))
+                    .values(ref_count=FileChunk.ref_count + sign * count)
+                )
+                await session.exec(stmt)
+
+    @DaoRel
+    async def list_refs(
+        self, object_key: str, session: AsyncSession | None = None
+    ) -> list[FileChunkRef]:
+        """
+        获取分块对象的块清单
+        :param object_key: 分块对象键
+        :param session: 可选数据库会话
+        :return: 按序号排列的块清单
+        """
+        stmt = (
+            select(FileChunkRef)
+            .where(FileChunkRef.object_key == object_key)
+            .order_by(FileChunkRef.seq)
+        )
+        return list((await session.exec(stmt)).all())
+
+    @DaoRel
+    async def object_size(
+        self, object_key: str, session: AsyncSession | None = None
+    ) -> int | None:
+        """
+        获取分块对象大小
+        :param object_key: 分块对象键
+        :param session: 可选数据库会话
+        :return: 对象大小 对象不存在返回None
+        """
+        stmt = select(func.count(), func.sum(FileChunkRef.size)).where(
+            FileChunkRef.object_key == object_key
+        )
+        count, size = (await session.exec(stmt)).one()
+        return (size or 0) if count else None
+
+    @DaoRel
+    async def release_chunks(
+        self, counter: Counter, session: AsyncSession | None = None
+    ) -> list[str]:
+        """
+        减少块引用计数(未提交清单的对象释放已加的引用)
+        :param counter: 块哈希 -> 引用次数
+        :param session: 可选数据库会话
+        :return: 引用归零的块哈希列表(记录保留 由 delete_unreferenced 删除)
+        """
+        await self._change_ref_count(counter, -1, session)
+        return await self._unreferenced(list(counter), session)
+
+    @DaoRel
+    async def remove_object(
+        self, object_key: str, session: AsyncSession | None = None
+    ) -> list[str]:
+        """
+        删除分块对象的块清单并减少引用计数
+        :param object_key: 分块对象键
+        :param session: 可选数据库会话
+        :return: 引用归零的块哈希列表(记录保留 由 delete_unreferenced 删除)
+        """
+        stmt = select(FileChunkRef.chunk_hash).where(
+            FileChunkRef.object_key == object_key
+        )
+        counter = Counter((await session.exec(stmt)).all())
+        if not counter:
+            return []
+        await session.exec(
+            delete(FileChunkRef).where(FileChunkRef.object_key == object_key)
+        )
+        await self._change_ref_count(counter, -1, session)
+        return await self._unreferenced(list(counter), session)
+
+    async def _unreferenced(self, hashes: list[str], session: AsyncSession) -> list[str]:
+        zero = []
+        for batch in batched(hashes):
+            stmt = select(FileChunk.hash).where(
+                FileChunk.hash.in_(batch), FileChunk.ref_count <= 0
+            )
+            zero.extend((await session.exec(stmt)).all())
+        await session.flush()
+        return zero
+
+    @DaoRel
+    async def delete_unreferenced(
+        self,
+        chunk_hash: str,
+        delete_blob: Callable[[str], Awaitable],
+        session: AsyncSession | None = None,
+    ) -> bool:
+        """
+        删除引用仍为0的块: 先删记录(持有行锁) 再删物理块 最后提交
+        并发的 reserve 等待提交后看不到该块 会重新登记并写入物理块
+        物理块删除失败时回滚 记录保留待下次清理
+        :param chunk_hash: 块哈希
+        :param delete_blob: 删除物理块的回调
+        :param session: 可选数据库会话
+        :return: 是否删除
+        """
+        result = await session.exec(
+            delete(FileChunk).where(
+                FileChunk.hash == chunk_hash, FileChunk.ref_count <= 0
+            )
+        )
+        if not result.rowcount:
+            return False
+        await delete_blob(chunk_hash)
+        return True
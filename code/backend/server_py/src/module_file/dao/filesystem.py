@@ -1,15 +1,23 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import select, func, update
+from sqlmodel import select, func, update, delete
 from common.utils.db.schema.pagination import (
     InfiniteScrollParams,
     PaginationParams,
     ScrollDirection,
 )
 from common.config.db import DaoRel
+from common.utils.db.utils.statement import batched
 from module_file.do.filesystem import FileEntry, FileEntryCreate, FileEntryUpdate
+from module_file.dao.physical_object import PhysicalObjectDao
 
 
 class FileDao:
+    def __init__(self, physical_object_dao: PhysicalObjectDao | None = None):
+        """
+        :param physical_object_dao: 物理对象引用计数DAO，可选
+        """
+        self.physical_object_dao = physical_object_dao or PhysicalObjectDao()
+
     @DaoRel
     async def add(
         self, file: FileEntryCreate, session: AsyncSession | None = None
@@ -23,12 +31,15 @@ class FileDao:
         db_file = FileEntry.model_validate(file.model_dump(exclude_unset=True))
         session.add(db_file)
         await session.flush()
+        await self.physical_object_dao.acquire(
+            [db_file.physical_storage], session=session
+        )
         return db_file.id
 
     @DaoRel
-    async def delete(self, id, session: AsyncSession | None = None) -> str:
+    async def delete(self, id, session: AsyncSession | None = None) -> None:
         """
-        删除文件记录
+        删除文件记录 并释放物理对象引用(物理文件由后台回收任务删除)
         :param id: 要删除的文件ID
         :param session: 可选数据库会话
         """
@@ -37,6 +48,9 @@ class FileDao:
             raise ValueError(f"未找到ID为 {id} 的文件")
         await session.delete(file)
         await session.flush()
+        await self.physical_object_dao.release(
+            [file.physical_storage], session=session
+        )
 
     @DaoRel
     async def update(
@@ -152,4 +166,90 @@ class FileDao:
         """
         statement = select(FileEntry).where(FileEntry.content_hash == content_hash)
         result = await session.exec(statement)
-        return result.first()
\ No newline at end of file
+        return result.first()
+
+    @DaoRel
+    async def get_many(
+        self, ids: list[str], session: AsyncSession | None = None
+    ) -> list[FileEntry]:
+        """
+        按ID列表批量查询文件
+        :param ids: 文件ID列表
+        :param session: 可选数据库会话
+        :return: 文件列表(不保证顺序 不存在的ID不返回)
+        """
+        files = []
+        for batch in batched(ids):
+            statement = select(FileEntry).where(FileEntry.id.in_(batch))
+            files.extend((await session.exec(statement)).all())
+        return files
+
+    @DaoRel
+    async def delete_many(
+        self, ids: list[str], session: AsyncSession | None = None
+    ) -> dict[str, str | None]:
+        """
+        按ID列表批量删除文件记录(同一事务) 并释放物理对象引用
+        :param ids: 文件ID列表
+        :param session: 可选数据库会话
+        :return: 已删除的 {文件ID: 物理存储位置}
+        """
+        deleted: dict[str, str | None] = {}
+        for batch in batched(ids):
+            statement = select(FileEntry.id, FileEntry.physical_storage).where(
+                FileEntry.id.in_(batch)
+            )
+            deleted.update((await session.exec(statement)).all())
+            await session.exec(delete(FileEntry).where(FileEntry.id.in_(batch)))
+        await session.flush()
+        await self.physical_object_dao.release(list(deleted.values()), session=session)
+        return deleted
+
+    @DaoRel
+    async def list_physical_storage(
+        self,
+        prefix: str,
+        start_after: str,
+        limit: int,
+        session: AsyncSession | None = None,
+    ) -> list[str]:
+        """
+        按字典序分页列出去重后的物理存储位置(存储布局迁移)
+        :param prefix: 物理存储位置前缀
+        :param start_after: 从该值之后开始
+        :param limit: 数量上限
+        :param session: 可选数据库会话
+        :return: 物理存储位置列表
+        """
+        statement = (
+            select(FileEntry.physical_storage)
+            .where(
+                FileEntry.physical_storage.startswith(prefix),
+                FileEntry.physical_storage > start_after,
+            )
+            .distinct()
+            .order_by(FileEntry.physical_storage)
+            .limit(limit)
+        )
+        return list((await session.exec(statement)).all())
+
+    @DaoRel
+    async def rename_physical_storage(
+        self, old_key: str, new_key: str, session: AsyncSession | None = None
+    ) -> int:
+        """
+        物理存储位置改名 同一事务更新所有引用的文件记录与引用计数
+        :param old_key: 原物理存储位置
+        :param new_key: 新物理存储位置
+        :param session: 可选数据库会话
+        :return: 更新的文件记录数
+        """
+        statement = (
+            update(FileEntry)
+            .where(FileEntry.physical_storage == old_key)
+            .values(physical_storage=new_key)
+        )
+        result = await session.exec(statement)
+        await self.physical_object_dao.rename(old_key, new_key, session=session)
+        await session.flush()
+        return result.rowcount
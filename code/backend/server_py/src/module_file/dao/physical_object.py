@@ -0,0 +1,169 @@
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel import select, update, delete, func
+from common.config.db import DaoRel
+from common.utils.db.utils.statement import batched, insert_ignore
+from module_file.do.filesystem import FileEntry
+from module_file.do.physical_object import PhysicalObject
+
+
+class PhysicalObjectDao:
+    @DaoRel
+    async def acquire(self, keys: list[str], session: AsyncSession | None = None):
+        """
+        增加物理对象引用计数(对象记录不存在时创建) 与文件记录写入同一事务
+        :param keys: 物理存储位置列表(可重复 每次出现计一次引用)
+        :param session: 可选数据库会话
+        """
+        counter = Counter(key for key in keys if key)
+        if not counter:
+            return
+        await self._ensure(list(counter), session)
+        await self._change_ref_count(counter, 1, session)
+        await session.flush()
+
+    @DaoRel
+    async def release(self, keys: list[str], session: AsyncSession | None = None):
+        """
+        减少物理对象引用计数 归零的对象标记孤立时间 等待后台回收
+        :param keys: 物理存储位置列表(可重复 每次出现计一次引用)
+        :param session: 可选数据库会话
+        """
+        counter = Counter(key for key in keys if key)
+        if not counter:
+            return
+        # 引用计数上线前已存在的对象没有记录 先补建 回收前会按文件记录校正
+        await self._ensure(list(counter), session)
+        await self._change_ref_count(counter, -1, session)
+        now = datetime.now(timezone.utc)
+        for batch in batched(list(counter)):
+            await session.exec(
+                update(PhysicalObject)
+                .where(
+                    PhysicalObject.key.in_(batch),
+                    PhysicalObject.ref_count <= 0,
+                    PhysicalObject.orphaned_at.is_(None),
+                )
+                .values(orphaned_at=now)
+            )
+        await session.flush()
+
+    @DaoRel
+    async def claim_garbage(
+        self, before: datetime, limit: int, session: AsyncSession | None = None
+    ) -> list[str]:
+        """
+        领取待回收的物理对象(引用归零且孤立时间早于 before) 领取即删除计数记录
+        仍被文件记录引用的对象(计数偏差)按实际引用数校正 不返回
+        :param before: 孤立时间上限(当前时间 - 宽限期)
+        :param limit: 数量上限
+        :param session: 可选数据库会话
+        :return: 可删除的物理存储位置列表
+        """
+        stmt = (
+            select(PhysicalObject.key)
+            .where(
+                PhysicalObject.ref_count <= 0,
+                PhysicalObject.orphaned_at < before,
+            )
+            .limit(limit)
+        )
+        keys = list((await session.exec(stmt)).all())
+        if not keys:
+            return []
+        referenced: dict[str, int] = {}
+        for batch in batched(keys):
+            stmt = (
+                select(FileEntry.physical_storage, func.count(FileEntry.id))
+                .where(FileEntry.physical_storage.in_(batch))
+                .group_by(FileEntry.physical_storage)
+            )
+            referenced.update((await session.exec(stmt)).all())
+        by_count: dict[int, list[str]] = defaultdict(list)
+        for key, count in referenced.items():
+            by_count[count].append(key)
+        for count, batch in by_count.items():
+            await session.exec(
+                update(PhysicalObject)
+                .where(PhysicalObject.key.in_(batch))
+                .values(ref_count=count, orphaned_at=None)
+            )
+        garbage = [key for key in keys if key not in referenced]
+        for batch in batched(garbage):
+            await session.exec(
+                delete(PhysicalObject).where(
+                    PhysicalObject.key.in_(batch), PhysicalObject.ref_count <= 0
+                )
+            )
+        await session.flush()
+        return garbage
+
+    @DaoRel
+    async def restore(self, keys: list[str], session: AsyncSession | None = None):
+        """
+        物理删除失败时恢复待回收记录 下一轮宽限期后重试
+        :param keys: 物理存储位置列表
+        :param session: 可选数据库会话
+        """
+        await self._ensure(keys, session, orphaned_at=datetime.now(timezone.utc))
+        await session.flush()
+
+    @DaoRel
+    async def rename(
+        self, old_key: str, new_key: str, session: AsyncSession | None = None
+    ):
+        """
+        物理对象改名(存储布局迁移)
+        :param old_key: 原物理存储位置
+        :param new_key: 新物理存储位置
+        :param session: 可选数据库会话
+        """
+        await session.exec(
+            update(PhysicalObject)
+            .where(PhysicalObject.key == old_key)
+            .values(key=new_key)
+        )
+        await session.flush()
+
+    async def _ensure(
+        self,
+        keys: list[str],
+        session: AsyncSession,
+        orphaned_at: datetime | None = None,
+    ):
+        # 并发写入相同对象 主键冲突忽略
+        now = datetime.now(timezone.utc)
+        for batch in batched(keys):
+            await session.exec(
+                insert_ignore(session, PhysicalObject).values(
+                    [
+                        {
+                            "key": key,
+                            "ref_count": 0,
+                            "orphaned_at": orphaned_at,
+                            "created_at": now,
+                        }
+                        for key in batch
+                    ]
+                )
+            )
+
+    async def _change_ref_count(
+        self, counter: Counter, sign: int, session: AsyncSession
+    ):
+        # 按增量分组 通常每个对象只出现一次 一条语句完成
+        by_count: dict[int, list[str]] = defaultdict(list)
+        for key, count in counter.items():
+            by_count[count].append(key)
+        for count, keys in by_count.items():
+            for batch in batched(keys):
+                values = {"ref_count": PhysicalObject.ref_count + sign * count}
+                if sign > 0:
+                    # 重新被引用 取消回收
+                    values["orphaned_at"] = None
+                await session.exec(
+                    update(PhysicalObject)
+                    .where(PhysicalObject.key.in_(batch))
+                    .values(**values)
+                )
@@ -0,0 +1,125 @@
+from datetime import datetime
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel import select, update, delete
+from common.config.db import DaoRel
+from module_file.do.upload_session import (
+    UploadSession,
+    UploadSessionStatus,
+    UploadPart,
+)
+
+
+class UploadSessionDao:
+    @DaoRel
+    async def add(
+        self, upload_session: UploadSession, session: AsyncSession | None = None
+    ) -> UploadSession:
+        """
+        新增上传会话
+        :param upload_session: 上传会话
+        :param session: 可选数据库会话
+        :return: 上传会话
+        """
+        session.add(upload_session)
+        await session.flush()
+        return upload_session
+
+    @DaoRel
+    async def get(
+        self, id: str, session: AsyncSession | None = None
+    ) -> UploadSession | None:
+        """
+        查询上传会话
+        :param id: 会话ID
+        :param session: 可选数据库会话
+        :return: 上传会话，未找到返回None
+        """
+        return await session.get(UploadSession, id)
+
+    @DaoRel
+    async def save_part(self, part: UploadPart, session: AsyncSession | None = None):
+        """
+        保存分片记录(重复上传覆盖)
+        :param part: 分片记录
+        :param session: 可选数据库会话
+        """
+        await session.merge(part)
+        await session.flush()
+
+    @DaoRel
+    async def list_parts(
+        self, session_id: str, session: AsyncSession | None = None
+    ) -> list[UploadPart]:
+        """
+        查询会话已上传分片
+        :param session_id: 会话ID
+        :param session: 可选数据库会话
+        :return: 按分片号排序的分片列表
+        """
+        stmt = (
+            select(UploadPart)
+            .where(UploadPart.session_id == session_id)
+            .order_by(UploadPart.part_number)
+        )
+        return list((await session.exec(stmt)).all())
+
+    @DaoRel
+    async def finish(
+        self,
+        id: str,
+        status: UploadSessionStatus,
+        file_id: str | None = None,
+        expected: UploadSessionStatus = UploadSessionStatus.UPLOADING,
+        session: AsyncSession | None = None,
+    ) -> bool:
+        """
+        切换上传会话状态(条件更新 只有处于 expected 状态时才更新 防止并发重复完成/清理)
+        :param id: 会话ID
+        :param status: 目标状态
+        :param file_id: 完成后生成的文件ID
+        :param expected: 当前应处于的状态
+        :param session: 可选数据库会话
+        :return: 是否更新成功
+        """
+        stmt = (
+            update(UploadSession)
+            .where(
+                UploadSession.id == id,
+                UploadSession.status == expected,
+            )
+            .values(status=status, file_id=file_id)
+        )
+        result = await session.exec(stmt)
+        await session.flush()
+        return result.rowcount > 0
+
+    @DaoRel
+    async def list_expired(
+        self, now: datetime, limit: int, session: AsyncSession | None = None
+    ) -> list[UploadSession]:
+        """
+        查询已过期且未完成的上传会话
+        :param now: 当前时间
+        :param limit: 数量上限
+        :param session: 可选数据库会话
+        :return: 上传会话列表
+        """
+        stmt = (
+            select(UploadSession)
+            .where(
+                UploadSession.expires_at < now,
+                UploadSession.status == UploadSessionStatus.UPLOADING,
+            )
+            .limit(limit)
+        )
+        return list((await session.exec(stmt)).all())
+
+    @DaoRel
+    async def delete_parts(self, session_id: str, session: AsyncSession | None = None):
+        """
+        删除会话的分片记录
+        :param session_id: 会话ID
+        :param session: 可选数据库会话
+        """
+        await session.exec(delete(UploadPart).where(UploadPart.session_id == session_id))
+        await session.flush()
@@ -0,0 +1,12 @@
+from fastapi import Depends
+
+from module_file.dependencies.filesystem import get_file_service
+from module_file.service.filesystem import FileService
+from module_file.service.derivative import DerivativeService
+
+
+async def get_derivative_service(
+    file_service: FileService = Depends(get_file_service),
+) -> DerivativeService:
+    """Service工厂"""
+    return DerivativeService(file_service)
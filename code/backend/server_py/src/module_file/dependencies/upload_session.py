@@ -0,0 +1,19 @@
+from fastapi import Depends
+
+from module_file.dao.upload_session import UploadSessionDao
+from module_file.dependencies.filesystem import get_file_service
+from module_file.service.filesystem import FileService
+from module_file.service.upload_session import UploadSessionService
+
+
+async def get_upload_session_dao() -> UploadSessionDao:
+    """DAO工厂"""
+    return UploadSessionDao()
+
+
+async def get_upload_session_service(
+    dao: UploadSessionDao = Depends(get_upload_session_dao),
+    file_service: FileService = Depends(get_file_service),
+) -> UploadSessionService:
+    """Service工厂"""
+    return UploadSessionService(dao, file_service)
@@ -0,0 +1,32 @@
+from sqlmodel import Column, DateTime, Field, SQLModel
+from datetime import datetime, timezone
+
+
+class FileChunk(SQLModel, table=True):
+    """
+    内容定义分块的块索引表(按块内容哈希去重)
+    """
+
+    hash: str = Field(..., primary_key=True, max_length=64, description="块内容SHA-256")
+    size: int = Field(..., description="块大小(字节)")
+    ref_count: int = Field(default=0, description="引用计数(被多少个对象分块引用)")
+    stored: bool = Field(default=False, description="物理块是否已写入")
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(DateTime(timezone=True)),
+        description="创建时间",
+    )
+
+
+class FileChunkRef(SQLModel, table=True):
+    """
+    分块对象的块清单(按序号重组对象内容)
+    """
+
+    object_key: str = Field(
+        ..., primary_key=True, max_length=500, description="分块对象键(物理存储位置)"
+    )
+    seq: int = Field(..., primary_key=True, description="块序号")
+    chunk_hash: str = Field(..., index=True, max_length=64, description="块内容哈希")
+    offset: int = Field(..., description="块在对象中的偏移(字节)")
+    size: int = Field(..., description="块大小(字节)")
@@ -0,0 +1,37 @@
+from sqlmodel import Field, SQLModel
+from enum import Enum
+
+
+class DerivativeFit(str, Enum):
+    CONTAIN = "contain"  # 等比缩放到框内
+    COVER = "cover"  # 等比缩放并居中裁剪填满
+
+
+class DerivativeFormat(str, Enum):
+    WEBP = "webp"
+    JPEG = "jpeg"
+    PNG = "png"
+
+
+class DerivativeSpec(SQLModel):
+    """
+    图片派生规格(缩略图尺寸、裁剪方式、输出格式)
+    """
+
+    width: int = Field(..., gt=0, description="目标宽度")
+    height: int | None = Field(default=None, gt=0, description="目标高度 不填按宽度等比")
+    fit: DerivativeFit = Field(default=DerivativeFit.CONTAIN, description="缩放方式")
+    format: DerivativeFormat = Field(default=DerivativeFormat.WEBP, description="输出格式")
+    quality: int = Field(default=80, ge=1, le=100, description="有损压缩质量")
+
+    @property
+    def name(self) -> str:
+        """规格名(缓存键/ETag 组成部分)"""
+        return (
+            f"{self.width}x{self.height or 0}_{self.fit.value}_q{self.quality}"
+            f".{self.format.value}"
+        )
+
+    @property
+    def media_type(self) -> str:
+        return f"image/{self.format.value}"
@@ -130,3 +130,44 @@ class FileEntryInfo(SQLModel):
 
 
 # 获取或插入多层 非Sqlmodel
+
+
+class FileIdList(SQLModel):
+    """
+    批量操作的文件ID列表
+    """
+
+    ids: list[str] = Field(..., min_length=1, max_length=10000, description="文件ID列表")
+
+
+class BulkItemResult(SQLModel):
+    """
+    批量操作单项结果
+    """
+
+    id: str | None = Field(default=None, description="文件ID")
+    name: str | None = Field(default=None, description="文件名(批量上传)")
+    success: bool = Field(..., description="是否成功")
+    error: str | None = Field(default=None, description="失败原因")
+    data: FileEntry | None = Field(default=None, description="文件信息")
+
+
+class BulkResult(SQLModel):
+    """
+    批量操作结果报告
+    """
+
+    total: int
+    succeeded: int
+    failed: int
+    items: list[BulkItemResult]
+
+    @classmethod
+    def create(cls, items: list[BulkItemResult]) -> "BulkResult":
+        succeeded = sum(1 for item in items if item.success)
+        return cls(
+            total=len(items),
+            succeeded=succeeded,
+            failed=len(items) - succeeded,
+            items=items,
+        )
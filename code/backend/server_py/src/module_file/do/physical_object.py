@@ -0,0 +1,24 @@
+from sqlmodel import Column, DateTime, Field, SQLModel
+from datetime import datetime, timezone
+
+
+class PhysicalObject(SQLModel, table=True):
+    """
+    物理存储对象引用计数表
+    去重上传时多条文件记录共享同一物理对象 引用归零后由后台回收任务延迟删除
+    """
+
+    key: str = Field(
+        ..., primary_key=True, max_length=500, description="物理存储位置(存储键)"
+    )
+    ref_count: int = Field(default=0, description="引用计数(引用该对象的文件记录数)")
+    orphaned_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), index=True),
+        description="引用归零时间(超过宽限期后回收 重新被引用时清空)",
+    )
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(DateTime(timezone=True)),
+        description="创建时间",
+    )
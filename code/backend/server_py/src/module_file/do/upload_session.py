@@ -0,0 +1,94 @@
+from sqlmodel import Column, DateTime, Field, SQLModel
+from uuid import uuid4
+from datetime import datetime, timezone
+from enum import Enum
+
+
+class UploadSessionStatus(str, Enum):
+    UPLOADING = "uploading"
+    # 合并中(已被某个完成请求占用 其他完成请求与过期清理跳过)
+    COMPLETING = "completing"
+    COMPLETED = "completed"
+    ABORTED = "aborted"
+
+
+class UploadSessionBase(SQLModel):
+    """
+    断点续传上传会话基础模型
+    """
+
+    file_name: str = Field(..., max_length=255, description="文件名")
+    mime_type: str | None = Field(default=None, max_length=100, description="MIME类型")
+    total_size: int | None = Field(default=None, description="声明的文件总大小(字节)")
+    description: str | None = Field(default=None, max_length=500, description="文件描述")
+    owner_user_id: str | None = Field(default=None, description="上传者ID")
+
+
+class UploadSession(UploadSessionBase, table=True):
+    """
+    断点续传上传会话数据库模型
+    """
+
+    id: str = Field(
+        default_factory=lambda: uuid4().hex,
+        primary_key=True,
+        index=True,
+        description="会话ID",
+    )
+    object_key: str = Field(..., max_length=500, description="目标存储键")
+    upload_id: str = Field(..., max_length=1024, description="存储后端分片上传ID")
+    part_size: int = Field(..., description="分片大小(字节 最后一片可更小)")
+    status: UploadSessionStatus = Field(
+        default=UploadSessionStatus.UPLOADING, description="会话状态"
+    )
+    file_id: str | None = Field(default=None, description="完成后生成的文件ID")
+    expires_at: datetime = Field(
+        ...,
+        sa_column=Column(DateTime(timezone=True), index=True),
+        description="过期时间(过期未完成的会话会被清理)",
+    )
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(DateTime(timezone=True)),
+        description="创建时间",
+    )
+
+
+class UploadSessionCreate(UploadSessionBase):
+    """
+    创建上传会话的请求模型
+    """
+
+    part_size: int | None = Field(default=None, description="分片大小(字节) 不填使用配置值")
+
+
+class UploadPart(SQLModel, table=True):
+    """
+    已上传分片(同一分片重复上传以最后一次为准)
+    """
+
+    session_id: str = Field(..., primary_key=True, description="会话ID")
+    part_number: int = Field(..., primary_key=True, description="分片号(从1开始)")
+    size: int = Field(..., description="分片大小(字节)")
+    checksum: str = Field(..., max_length=64, description="分片MD5")
+    etag: str = Field(..., max_length=128, description="存储后端返回的分片ETag")
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(DateTime(timezone=True)),
+        description="上传时间",
+    )
+
+
+class UploadSessionInfo(SQLModel):
+    """
+    上传会话响应模型(含已上传分片 客户端据此续传)
+    """
+
+    id: str
+    file_name: str
+    total_size: int | None
+    part_size: int
+    status: UploadSessionStatus
+    file_id: str | None
+    expires_at: datetime
+    parts: list[UploadPart] = []
@@ -0,0 +1,150 @@
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from module_file.config.filesystem import (
+    storage,
+    DERIVATIVE_SIZES,
+    DERIVATIVE_QUALITY,
+    DERIVATIVE_MAX_SOURCE_SIZE,
+    DERIVATIVE_MAX_PIXELS,
+    DERIVATIVE_WORKERS,
+)
+from module_file.do.derivative import DerivativeFit, DerivativeFormat, DerivativeSpec
+from module_file.do.filesystem import FileEntry
+from module_file.service.filesystem import FileService
+from module_file.utils.image_derivative import render_derivative
+from PIL import Image, UnidentifiedImageError
+from uuid import uuid4
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 派生图生成线程池(每个worker一个) 限制并发生成的 CPU 与内存占用
+_executor: ThreadPoolExecutor | None = None
+_semaphore = asyncio.Semaphore(DERIVATIVE_WORKERS)
+# 生成中的派生图(同一派生并发请求只生成一次)
+_inflight: dict[str, asyncio.Future] = {}
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=DERIVATIVE_WORKERS, thread_name_prefix="derivative"
+        )
+    return _executor
+
+
+class DerivativeService:
+    """
+    图片派生(缩略图)服务
+    派生图按 原图内容哈希 + 规格 缓存到存储 相同内容的文件共享派生图
+    首次请求时在线程池中生成 之后直接从存储读取
+    """
+
+    def __init__(self, file_service: FileService | None = None, storage_interface=None):
+        """
+        :param file_service: 文件服务
+        :param storage_interface: 存储接口实现，可选
+        """
+        self.file_service = file_service or FileService()
+        self.storage = storage_interface or storage
+
+    @staticmethod
+    def build_spec(
+        width: int,
+        height: int | None = None,
+        fit: DerivativeFit = DerivativeFit.CONTAIN,
+        format: DerivativeFormat = DerivativeFormat.WEBP,
+        quality: int | None = None,
+    ) -> DerivativeSpec:
+        """
+        校验并构造派生规格 宽高只允许配置的尺寸
+        :param width: 目标宽度
+        :param height: 目标高度
+        :param fit: 缩放方式
+        :param format: 输出格式
+        :param quality: 有损压缩质量
+        :return: 派生规格
+        """
+        for size in (width, height):
+            if size is not None and size not in DERIVATIVE_SIZES:
+                raise HTTPException(
+                    status_code=400, detail=f"尺寸只允许 {DERIVATIVE_SIZES}"
+                )
+        return DerivativeSpec(
+            width=width,
+            height=height,
+            fit=fit,
+            format=format,
+            quality=quality or DERIVATIVE_QUALITY,
+        )
+
+    def cache_key(self, content_hash: str, spec: DerivativeSpec) -> str:
+        """派生图存储键 derivatives/<内容哈希>/<规格名>"""
+        return f"{self.storage.object_key('derivatives', content_hash)}/{spec.name}"
+
+    async def get_source(self, file_id: str) -> FileEntry:
+        """
+        获取可生成派生图的原图信息
+        :param file_id: 文件ID
+        :return: 文件信息对象
+        """
+        file_info = await self.file_service.get_file_info_for_download(file_id)
+        mime_type = file_info.mime_type or ""
+        if not mime_type.startswith("image/") or mime_type == "image/svg+xml":
+            raise HTTPException(status_code=415, detail=f"不支持的图片类型: {mime_type}")
+        if not file_info.content_hash:
+            raise HTTPException(status_code=409, detail="文件缺少内容哈希")
+        return file_info
+
+    async def ensure(self, file_info: FileEntry, spec: DerivativeSpec) -> tuple[str, int]:
+        """
+        确保派生图已生成
+        :param file_info: 原图信息
+        :param spec: 派生规格
+        :return: (派生图存储键, 大小)
+        """
+        key = self.cache_key(file_info.content_hash, spec)
+        if await self.storage.exists(key):
+            return key, await self.storage.size(key)
+        future = _inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._generate(file_info, spec, key))
+            _inflight[key] = future
+            future.add_done_callback(lambda _: _inflight.pop(key, None))
+        # shield: 单个请求断开不取消其他请求共享的生成任务
+        return key, await asyncio.shield(future)
+
+    async def _generate(self, file_info: FileEntry, spec: DerivativeSpec, key: str) -> int:
+        if (file_info.file_size_bytes or 0) > DERIVATIVE_MAX_SOURCE_SIZE:
+            raise HTTPException(
+                status_code=413, detail=f"原图超过 {DERIVATIVE_MAX_SOURCE_SIZE} 字节"
+            )
+        async with _semaphore:
+            source = bytearray()
+            async for chunk in self.file_service.stream_file_content(
+                file_info.physical_storage
+            ):
+                source += chunk
+            try:
+                data = await asyncio.get_running_loop().run_in_executor(
+                    _get_executor(),
+                    render_derivative,
+                    bytes(source),
+                    spec,
+                    DERIVATIVE_MAX_PIXELS,
+                )
+            except (
+                UnidentifiedImageError,
+                Image.DecompressionBombError,
+                ValueError,
+                OSError,
+            ) as e:
+                raise HTTPException(status_code=422, detail=f"图片无法处理: {e}")
+        # 先写临时键再提交 其他请求不会读到写了一半的派生图
+        tmp_key = f"derivatives/.tmp/{uuid4().hex}"
+        await self.storage.save(tmp_key, data)
+        await self.storage.move(tmp_key, key)
+        logger.info(f"生成派生图 {key}: {len(source)} -> {len(data)} 字节")
+        return len(data)
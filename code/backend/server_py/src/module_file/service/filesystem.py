@@ -5,16 +5,29 @@ from common.utils.db.schema.pagination import (
     PaginationParams,
     PaginationResponse,
 )
-from module_file.do.filesystem import FileEntry, FileEntryCreate, FileEntryUpdate
+from module_file.do.filesystem import (
+    FileEntry,
+    FileEntryCreate,
+    FileEntryUpdate,
+    BulkItemResult,
+    BulkResult,
+)
 from module_file.dao.filesystem import FileDao
-from module_file.config.filesystem import storage
-import hashlib
+from module_file.config.filesystem import (
+    storage,
+    chunk_store,
+    max_size,
+    UPLOAD_CHUNK_SIZE,
+    CONTENT_HASH_ALGORITHM,
+)
+from module_file.utils.content_hash import hash_file, new_hasher
+from module_file.utils.multi_storage.chunk.chunk_store import ChunkStore
 import secrets  # 导入secrets模块
 from uuid import uuid4  # 导入uuid4
 from fastapi import UploadFile, HTTPException
-import aiofiles
 from pathlib import Path
 from common.config.path import DIR_UPLOAD
+import asyncio
 import logging
 import io
 
@@ -25,14 +38,21 @@ logger = logging.getLogger(__name__)
 class FileService:
     """文件服务类，提供文件上传、下载、管理等功能"""
 
-    def __init__(self, file_dao: FileDao | None = None, storage_interface=None):
+    def __init__(
+        self,
+        file_dao: FileDao | None = None,
+        storage_interface=None,
+        chunk_store_interface: ChunkStore | None = None,
+    ):
         """
         初始化文件服务
         :param file_dao: 文件数据访问对象，可选
         :param storage_interface: 存储接口实现，可选
+        :param chunk_store_interface: 块级去重存储，可选(默认按配置启用)
         """
         self.file_dao = file_dao or FileDao()
         self.storage = storage_interface or storage
+        self.chunk_store = chunk_store_interface or chunk_store
 
     async def add(self, file: FileEntryCreate) -> str:
         """
@@ -44,22 +64,14 @@ class FileService:
 
     async def delete(self, id: str):
         """
-        删除文件记录和物理文件
+        删除文件记录 并释放物理文件引用
+        物理文件在无记录引用且超过宽限期后由后台回收任务删除(StorageGcService)
         :param id: 文件ID
         """
         try:
             # 先获取文件信息
             file_info = await self.get(id)
             if file_info:
-                # 尝试删除物理文件
-                try:
-                    file_path = Path(file_info.physical_storage)
-                    if file_path.exists():
-                        file_path.unlink()
-                        logger.info(f"已删除物理文件: {file_path}")
-                except Exception as e:
-                    logger.error(f"删除物理文件失败: {e}")
-
                 # 删除数据库记录
                 await self.file_dao.delete(id)
                 logger.info(f"已删除文件记录: {id}")
@@ -69,6 +81,74 @@ class FileService:
             logger.error(f"删除文件时发生错误: {e}")
             raise
 
+    async def delete_many(self, ids: list[str]) -> BulkResult:
+        """
+        批量删除文件记录 记录在一个事务中批量删除并释放物理文件引用
+        物理文件由后台回收任务批量删除
+        :param ids: 文件ID列表
+        :return: 批量结果报告
+        """
+        ids = list(dict.fromkeys(ids))
+        deleted = await self.file_dao.delete_many(ids)
+        logger.info(f"批量删除文件 {len(deleted)}/{len(ids)} 条")
+        return BulkResult.create(
+            [
+                BulkItemResult(id=id, success=True)
+                if id in deleted
+                else BulkItemResult(id=id, success=False, error="文件不存在")
+                for id in ids
+            ]
+        )
+
+    async def get_many(self, ids: list[str]) -> BulkResult:
+        """
+        按ID列表批量获取文件信息
+        :param ids: 文件ID列表
+        :return: 批量结果报告(按请求顺序)
+        """
+        ids = list(dict.fromkeys(ids))
+        files = {file.id: file for file in await self.file_dao.get_many(ids)}
+        return BulkResult.create(
+            [
+                BulkItemResult(id=id, success=True, data=files[id])
+                if id in files
+                else BulkItemResult(id=id, success=False, error="文件不存在")
+                for id in ids
+            ]
+        )
+
+    async def upload_files(
+        self,
+        files: list[UploadFile],
+        description: str = None,
+        owner_user_id: str = None,
+        concurrency: int = 4,
+    ) -> BulkResult:
+        """
+        批量上传文件 单个文件失败不影响其他文件
+        :param files: 上传的文件列表
+        :param description: 文件描述
+        :param owner_user_id: 上传者ID
+        :param concurrency: 并发上传数量
+        :return: 批量结果报告(按上传顺序)
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def upload_one(file: UploadFile) -> BulkItemResult:
+            async with semaphore:
+                try:
+                    file_entry = await self.upload_file(file, description, owner_user_id)
+                    return BulkItemResult(
+                        id=file_entry.id, name=file.filename, success=True, data=file_entry
+                    )
+                except HTTPException as e:
+                    return BulkItemResult(name=file.filename, success=False, error=str(e.detail))
+                except Exception as e:
+                    return BulkItemResult(name=file.filename, success=False, error=str(e))
+
+        items = await asyncio.gather(*(upload_one(file) for file in files))
+        return BulkResult.create(list(items))
+
     async def update(self, file_id: str, file_update: FileEntryUpdate):
         """
         更新文件信息并返回更新后的文件信息（在同一事务中）
@@ -112,11 +192,7 @@ class FileService:
         :param file_path: 文件路径
         :return: MD5哈希值
         """
-        md5_hash = hashlib.md5()
-        async with aiofiles.open(file_path, "rb") as f:
-            while chunk := await f.read(8192):
-                md5_hash.update(chunk)
-        return md5_hash.hexdigest()
+        return await hash_file(file_path, "md5")
 
     async def upload_file(
         self, file: UploadFile, description: str = None, owner_user_id: str = None
@@ -128,45 +204,58 @@ class FileService:
         :param owner_user_id: 上传者ID
         :return: 文件信息对象
         """
-        try:
-            # 先读取文件内容到内存
-            content = await file.read()
+        # 先流式写入临时键 边读边计算内容哈希并校验大小 单次上传内存占用恒定
+        file_ext = Path(file.filename).suffix
+        unique_filename = f"{uuid4().hex}{file_ext}"
+        if self.chunk_store:
+            # 开启块级去重时直接分块写入 块清单即正式对象
+            tmp_key = f"{ChunkStore.OBJECT_PREFIX}uploads/{unique_filename}"
+        else:
+            tmp_key = f"uploads/.tmp/{uuid4().hex}"
+        content_hasher = new_hasher(CONTENT_HASH_ALGORITHM)
+        file_size = 0
 
-            # 计算MD5值 最好单独有个接口前端校验md5是否一致
-            content_hash = hashlib.md5(content).hexdigest()
+        async def iter_chunks():
+            nonlocal file_size
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > max_size:
+                    raise HTTPException(
+                        status_code=413, detail=f"文件大小超过限制 {max_size} 字节"
+                    )
+                # 大块哈希在线程中计算(释放GIL) 不阻塞事件循环
+                await asyncio.to_thread(content_hasher.update, chunk)
+                yield chunk
+
+        try:
+            if self.chunk_store:
+                await self.chunk_store.put(tmp_key, iter_chunks())
+            else:
+                await self.storage.save(tmp_key, iter_chunks())
+            # 内容哈希(去重键) 最好单独有个接口前端校验哈希是否一致
+            content_hash = await asyncio.to_thread(content_hasher.hexdigest)
 
-            # 检查文件是否已存在(通过MD5)
+            # 检查文件是否已存在(通过内容哈希)
             existing_file = await self.file_dao.get_by_content_hash(content_hash)
 
             if existing_file:
-                # 文件已存在，复用现有文件信息
-                file_create = FileEntryCreate(
-                    name=existing_file.name,
-                    logical_path=existing_file.logical_path,
-                    physical_storage=existing_file.physical_storage,
-                    file_size_bytes=existing_file.file_size_bytes,
-                    file_extension=existing_file.file_extension,
-                    mime_type=existing_file.mime_type,
-                    content_hash=existing_file.content_hash,
-                    description=existing_file.description,
-                    owner_user_id=owner_user_id,
-                    is_active=True,
-                )
+                # 文件已存在，复用现有文件信息 丢弃临时文件
+                await self._discard(tmp_key)
+                file_create = self._reuse_entry(existing_file, owner_user_id)
             else:
-                # 文件不存在，生成新文件名并保存
-                file_ext = Path(file.filename).suffix
-                unique_filename = f"{uuid4().hex}{file_ext}"
-
-                # 使用存储接口保存文件
-                file_key = f"uploads/{unique_filename}"
-                await self.storage.save(file_key, content)
+                # 文件不存在，临时文件提交到正式键(分块对象已是正式键)
+                physical_storage = tmp_key
+                if not self.chunk_store:
+                    # 存储键按存储布局生成(本地存储可能分目录)
+                    physical_storage = self.storage.object_key("uploads", unique_filename)
+                    await self.storage.move(tmp_key, physical_storage)
 
                 # 创建新文件记录
                 file_create = FileEntryCreate(
                     name=file.filename,
-                    logical_path=f"/{file_key}",
-                    physical_storage=file_key,  # 存储键而不是本地路径
-                    file_size_bytes=len(content),
+                    logical_path=f"/uploads/{unique_filename}",
+                    physical_storage=physical_storage,  # 存储键而不是本地路径
+                    file_size_bytes=file_size,
                     file_extension=file_ext[1:] if file_ext else "",
                     mime_type=file.content_type or "application/octet-stream",
                     content_hash=content_hash,
@@ -182,8 +271,93 @@ class FileService:
             return await self.file_dao.get(created_file_id)
         except Exception as e:
             logger.error(f"上传文件时发生错误: {e}")
+            # 清理未提交的临时文件
+            try:
+                await self._discard(tmp_key)
+            except Exception:
+                pass
             raise
 
+    @staticmethod
+    def _reuse_entry(existing_file: FileEntry, owner_user_id: str | None) -> FileEntryCreate:
+        """内容哈希命中时 复用已有物理文件创建新记录"""
+        return FileEntryCreate(
+            name=existing_file.name,
+            logical_path=existing_file.logical_path,
+            physical_storage=existing_file.physical_storage,
+            file_size_bytes=existing_file.file_size_bytes,
+            file_extension=existing_file.file_extension,
+            mime_type=existing_file.mime_type,
+            content_hash=existing_file.content_hash,
+            description=existing_file.description,
+            owner_user_id=owner_user_id,
+            is_active=True,
+        )
+
+    async def hash_object(self, file_key: str) -> str:
+        """
+        流式读取已写入存储的对象 按配置的算法计算内容哈希(与单次上传一致)
+        :param file_key: 存储键
+        :return: 内容哈希
+        """
+        hasher = new_hasher(CONTENT_HASH_ALGORITHM)
+        async for chunk in self.stream_file_content(file_key):
+            await asyncio.to_thread(hasher.update, chunk)
+        return await asyncio.to_thread(hasher.hexdigest)
+
+    async def add_stored_object(
+        self,
+        file_key: str,
+        file_name: str,
+        file_size: int,
+        content_hash: str,
+        mime_type: str | None = None,
+        description: str | None = None,
+        owner_user_id: str | None = None,
+        logical_path: str | None = None,
+    ) -> FileEntry:
+        """
+        登记已写入存储的对象为文件记录(如分片上传合并后的对象)
+        内容哈希命中时复用已有物理文件 并删除新写入的对象
+        :param file_key: 存储键
+        :param file_name: 文件名
+        :param file_size: 文件大小
+        :param content_hash: 内容哈希
+        :param mime_type: MIME类型
+        :param description: 文件描述
+        :param owner_user_id: 上传者ID
+        :param logical_path: 逻辑路径 默认为 /存储键
+        :return: 文件信息对象
+        """
+        existing_file = await self.file_dao.get_by_content_hash(content_hash)
+        if existing_file:
+            await self.storage.delete(file_key)
+            file_create = self._reuse_entry(existing_file, owner_user_id)
+        else:
+            file_ext = Path(file_name).suffix
+            file_create = FileEntryCreate(
+                name=file_name,
+                logical_path=logical_path or f"/{file_key}",
+                physical_storage=file_key,
+                file_size_bytes=file_size,
+                file_extension=file_ext[1:] if file_ext else "",
+                mime_type=mime_type or "application/octet-stream",
+                content_hash=content_hash,
+                description=description,
+                owner_user_id=owner_user_id,
+                is_active=True,
+            )
+        created_file_id = await self.file_dao.add(file_create)
+        logger.info(f"文件登记成功: {file_create.name} -> {file_create.logical_path}")
+        return await self.file_dao.get(created_file_id)
+
+    async def _discard(self, key: str):
+        """丢弃未入库的上传对象"""
+        if ChunkStore.is_chunked(key):
+            await self.chunk_store.release(key)
+        else:
+            await self.storage.delete(key)
+
     async def generate_presigned_url(
         self, file_key: str, method: str = "put", expiration: int = 3600
     ) -> str | None:
@@ -243,11 +417,11 @@ class FileService:
             logger.error(f"使用预签名URL删除时发生错误: {e}")
             raise
 
-    async def get_file_info_for_download(self, file_id: str) -> tuple[str, str, str]:
+    async def get_file_info_for_download(self, file_id: str) -> FileEntry:
         """
         获取文件下载所需的信息
         :param file_id: 文件ID
-        :return: (文件名, MIME类型, 物理存储路径)
+        :return: 文件信息(file_size_bytes 保证有值)
         """
         try:
             file_info = await self.file_dao.get(file_id)
@@ -256,29 +430,46 @@ class FileService:
                 raise HTTPException(status_code=404, detail="文件不存在或已被禁用")
 
             # 使用存储接口检查文件是否存在
-            file_exists = await self.storage.exists(file_info.physical_storage)
+            if ChunkStore.is_chunked(file_info.physical_storage):
+                file_exists = await self.chunk_store.exists(file_info.physical_storage)
+            else:
+                file_exists = await self.storage.exists(file_info.physical_storage)
             if not file_exists:
                 logger.error(f"物理文件不存在: {file_info.physical_storage}")
                 raise HTTPException(status_code=404, detail="物理文件不存在")
 
-            return file_info.name, file_info.mime_type, file_info.physical_storage
+            # 历史记录可能没有大小 Range 计算需要总大小
+            if file_info.file_size_bytes is None:
+                if ChunkStore.is_chunked(file_info.physical_storage):
+                    size = await self.chunk_store.size(file_info.physical_storage)
+                else:
+                    size = await self.storage.size(file_info.physical_storage)
+                file_info.file_size_bytes = size
+            return file_info
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"获取文件信息时发生错误: {e}")
-            raise f"获取文件信息时发生错误: {e}"
+            raise
 
-    async def stream_file_content(self, file_path: str, chunk_size: int = 8192):
+    async def stream_file_content(
+        self, file_path: str, start: int = 0, end: int | None = None
+    ):
         """
-        流式读取文件内容
-        :param file_path: 文件路径
-        :param chunk_size: 每次读取的块大小
+        流式读取文件内容(按范围读取 不整体加载到内存)
+        :param file_path: 物理存储位置
+        :param start: 起始偏移
+        :param end: 结束偏移(含) None 表示读到末尾
         :yield: 文件内容块
         """
         try:
-            # 使用存储接口加载文件内容
-            content = await self.storage.load(file_path)
-            # 将内容分块发送
-            for i in range(0, len(content), chunk_size):
-                yield content[i : i + chunk_size]
+            # 分块对象按块清单重组
+            if ChunkStore.is_chunked(file_path):
+                stream = self.chunk_store.stream(file_path, start, end)
+            else:
+                stream = self.storage.stream(file_path, start, end)
+            async for chunk in stream:
+                yield chunk
         except Exception as e:
             logger.error(f"读取文件内容时发生错误: {e}")
             raise
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta, timezone
+import asyncio
+from module_file.config.filesystem import (
+    storage,
+    chunk_store,
+    GC_GRACE_SECONDS,
+    GC_BATCH_SIZE,
+)
+from module_file.dao.physical_object import PhysicalObjectDao
+from module_file.utils.multi_storage.chunk.chunk_store import ChunkStore
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StorageGcService:
+    """
+    物理存储回收服务
+    文件记录删除只释放引用计数 引用归零且超过宽限期的物理对象由后台任务分批删除
+    宽限期内重新被引用(去重上传命中)的对象不会被回收
+    """
+
+    def __init__(
+        self,
+        physical_object_dao: PhysicalObjectDao | None = None,
+        storage_interface=None,
+        chunk_store_interface: ChunkStore | None = None,
+        grace_seconds: int = GC_GRACE_SECONDS,
+    ):
+        """
+        :param physical_object_dao: 物理对象引用计数DAO，可选
+        :param storage_interface: 存储接口实现，可选
+        :param chunk_store_interface: 块级去重存储，可选
+        :param grace_seconds: 引用归零后的宽限期(秒)
+        """
+        self.physical_object_dao = physical_object_dao or PhysicalObjectDao()
+        self.storage = storage_interface or storage
+        self.chunk_store = chunk_store_interface or chunk_store
+        self.grace_seconds = grace_seconds
+
+    async def collect(self, batch_size: int = GC_BATCH_SIZE) -> int:
+        """
+        回收无引用的物理对象
+        :param batch_size: 每批数量
+        :return: 删除的物理对象数量
+        """
+        total = 0
+        while True:
+            before = datetime.now(timezone.utc) - timedelta(seconds=self.grace_seconds)
+            keys = await self.physical_object_dao.claim_garbage(before, batch_size)
+            if keys:
+                failed = await self._delete(keys)
+                if failed:
+                    await self.physical_object_dao.restore(failed)
+                total += len(keys) - len(failed)
+            if len(keys) < batch_size:
+                break
+            await asyncio.sleep(0)
+        if total:
+            logger.info(f"已回收物理文件 {total} 个")
+        return total
+
+    async def _delete(self, keys: list[str]) -> list[str]:
+        """删除物理对象 返回删除失败的键"""
+        errors: dict[str, str | None] = {}
+        plain_keys = [key for key in keys if not ChunkStore.is_chunked(key)]
+        if plain_keys:
+            try:
+                errors.update(await self.storage.delete_many(plain_keys))
+            except Exception as e:
+                errors.update(dict.fromkeys(plain_keys, str(e)))
+        for key in keys:
+            if not ChunkStore.is_chunked(key):
+                continue
+            try:
+                await self.chunk_store.release(key)
+            except Exception as e:
+                errors[key] = str(e)
+        failed = [key for key, error in errors.items() if error]
+        for key in failed:
+            logger.error(f"回收物理文件失败 {key}: {errors[key]}")
+        return failed
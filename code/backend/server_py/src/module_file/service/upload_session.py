@@ -0,0 +1,319 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import AsyncIterator
+from uuid import uuid4
+import asyncio
+import hashlib
+from fastapi import HTTPException
+from module_file.config.filesystem import (
+    storage,
+    MULTIPART_PART_SIZE,
+    MULTIPART_MAX_SIZE,
+    MULTIPART_EXPIRE_HOURS,
+)
+from module_file.dao.upload_session import UploadSessionDao
+from module_file.do.filesystem import FileEntry
+from module_file.do.upload_session import (
+    UploadSession,
+    UploadSessionCreate,
+    UploadSessionInfo,
+    UploadSessionStatus,
+    UploadPart,
+)
+from module_file.service.filesystem import FileService
+from module_file.utils.multi_storage.session.interface.strorage_interface import (
+    PartChecksumError,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# S3 分片上传限制
+MIN_PART_SIZE = 5 * 1024 * 1024
+# S3 允许 5GB 但 S3 分片需整片缓冲计算 Content-MD5 限制单个请求的内存占用
+MAX_PART_SIZE = 64 * 1024 * 1024
+MAX_PART_COUNT = 10000
+
+
+class UploadSessionService:
+    """
+    断点续传分片上传服务
+    创建会话 -> 并行上传编号分片(可重传/续传) -> 合并完成
+    S3 映射为原生分片上传 本地存储为分片文件 + 顺序拼接
+    """
+
+    def __init__(
+        self,
+        upload_session_dao: UploadSessionDao | None = None,
+        file_service: FileService | None = None,
+        storage_interface=None,
+    ):
+        """
+        :param upload_session_dao: 上传会话DAO
+        :param file_service: 文件服务(完成后登记文件记录)
+        :param storage_interface: 存储接口实现，可选
+        """
+        self.upload_session_dao = upload_session_dao or UploadSessionDao()
+        self.file_service = file_service or FileService()
+        self.storage = storage_interface or storage
+
+    async def create(
+        self, request: UploadSessionCreate, owner_user_id: str | None = None
+    ) -> UploadSessionInfo:
+        """
+        创建上传会话
+        :param request: 会话创建请求
+        :param owner_user_id: 上传者ID
+        :return: 上传会话信息
+        """
+        part_size = request.part_size or MULTIPART_PART_SIZE
+        if not MIN_PART_SIZE <= part_size <= MAX_PART_SIZE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"分片大小需在 {MIN_PART_SIZE} ~ {MAX_PART_SIZE} 字节之间",
+            )
+        if request.total_size is not None:
+            if request.total_size > MULTIPART_MAX_SIZE:
+                raise HTTPException(
+                    status_code=413, detail=f"文件大小超过限制 {MULTIPART_MAX_SIZE} 字节"
+                )
+            if -(-request.total_size // part_size) > MAX_PART_COUNT:
+                raise HTTPException(
+                    status_code=400, detail=f"分片数量超过 {MAX_PART_COUNT} 请增大分片大小"
+                )
+
+        object_key = self.storage.object_key(
+            "uploads", f"{uuid4().hex}{Path(request.file_name).suffix}"
+        )
+        upload_id = await self.storage.create_multipart(object_key)
+        upload_session = UploadSession(
+            **request.model_dump(exclude={"part_size", "owner_user_id"}),
+            owner_user_id=owner_user_id or request.owner_user_id,
+            object_key=object_key,
+            upload_id=upload_id,
+            part_size=part_size,
+            expires_at=datetime.now(timezone.utc)
+            + timedelta(hours=MULTIPART_EXPIRE_HOURS),
+        )
+        await self.upload_session_dao.add(upload_session)
+        logger.info(f"创建上传会话 {upload_session.id}: {request.file_name}")
+        return UploadSessionInfo.model_validate(upload_session, update={"parts": []})
+
+    async def _get_active(self, session_id: str) -> UploadSession:
+        upload_session = await self.upload_session_dao.get(session_id)
+        if not upload_session:
+            raise HTTPException(status_code=404, detail="上传会话不存在")
+        if upload_session.status != UploadSessionStatus.UPLOADING:
+            raise HTTPException(
+                status_code=409, detail=f"上传会话已结束: {upload_session.status.value}"
+            )
+        expires_at = upload_session.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if expires_at < datetime.now(timezone.utc):
+            raise HTTPException(status_code=410, detail="上传会话已过期")
+        return upload_session
+
+    async def get_info(self, session_id: str) -> UploadSessionInfo:
+        """
+        获取上传会话信息及已上传分片(客户端据此续传缺失分片)
+        :param session_id: 会话ID
+        :return: 上传会话信息
+        """
+        upload_session = await self.upload_session_dao.get(session_id)
+        if not upload_session:
+            raise HTTPException(status_code=404, detail="上传会话不存在")
+        parts = await self.upload_session_dao.list_parts(session_id)
+        return UploadSessionInfo.model_validate(upload_session, update={"parts": parts})
+
+    async def upload_part(
+        self,
+        session_id: str,
+        part_number: int,
+        data: AsyncIterator[bytes],
+        checksum: str | None = None,
+    ) -> UploadPart:
+        """
+        上传分片 边接收边计算MD5 大小超过分片大小立即中断
+        校验在存储提交分片前完成 校验失败的重传不会覆盖已上传的同号分片
+        :param session_id: 会话ID
+        :param part_number: 分片号(从1开始)
+        :param data: 分片数据流
+        :param checksum: 客户端计算的分片MD5(十六进制) 不一致时拒绝该分片
+        :return: 分片记录
+        """
+        upload_session = await self._get_active(session_id)
+        part_count = None
+        if upload_session.total_size is not None:
+            part_count = max(-(-upload_session.total_size // upload_session.part_size), 1)
+        if not 1 <= part_number <= (part_count or MAX_PART_COUNT):
+            raise HTTPException(status_code=400, detail=f"分片号超出范围: {part_number}")
+
+        md5_hash = hashlib.md5()
+        part_size = 0
+
+        async def iter_part():
+            nonlocal part_size
+            async for chunk in data:
+                part_size += len(chunk)
+                if part_size > upload_session.part_size:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"分片大小超过 {upload_session.part_size} 字节",
+                    )
+                md5_hash.update(chunk)
+                yield chunk
+
+        try:
+            etag = await self.storage.upload_part(
+                upload_session.object_key,
+                upload_session.upload_id,
+                part_number,
+                iter_part(),
+                checksum=checksum,
+            )
+        except PartChecksumError:
+            # 存储未提交该分片 不登记 客户端重传
+            raise HTTPException(status_code=400, detail=f"分片 {part_number} 校验失败")
+        part_md5 = md5_hash.hexdigest()
+        part = UploadPart(
+            session_id=session_id,
+            part_number=part_number,
+            size=part_size,
+            checksum=part_md5,
+            etag=etag,
+        )
+        await self.upload_session_dao.save_part(part)
+        return part
+
+    async def complete(self, session_id: str) -> FileEntry:
+        """
+        合并分片完成上传 并登记文件记录
+        :param session_id: 会话ID
+        :return: 文件信息对象
+        """
+        upload_session = await self._get_active(session_id)
+        parts = await self.upload_session_dao.list_parts(session_id)
+        if not parts:
+            raise HTTPException(status_code=400, detail="没有已上传的分片")
+        missing = [
+            number
+            for number, part in enumerate(parts, start=1)
+            if part.part_number != number
+        ]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"分片不连续 缺少分片 {missing[0]}")
+        if any(part.size != upload_session.part_size for part in parts[:-1]):
+            raise HTTPException(status_code=400, detail="除最后一片外分片大小需等于分片大小")
+        total_size = sum(part.size for part in parts)
+        if upload_session.total_size is not None and total_size != upload_session.total_size:
+            raise HTTPException(
+                status_code=400,
+                detail=f"文件大小不一致 已上传 {total_size} 声明 {upload_session.total_size}",
+            )
+        if total_size > MULTIPART_MAX_SIZE:
+            raise HTTPException(
+                status_code=413, detail=f"文件大小超过限制 {MULTIPART_MAX_SIZE} 字节"
+            )
+
+        # 先占用会话(UPLOADING -> COMPLETING) 并发的完成请求返回 409 过期清理跳过合并中的会话
+        if not await self.upload_session_dao.finish(
+            session_id, UploadSessionStatus.COMPLETING
+        ):
+            raise HTTPException(status_code=409, detail="上传会话正在完成或已结束")
+        merged = False
+        try:
+            await self.storage.complete_multipart(
+                upload_session.object_key,
+                upload_session.upload_id,
+                [(part.part_number, part.etag) for part in parts],
+            )
+            merged = True
+            # 存储返回的是 MD5 / 分片ETag(md5-分片数) 与单次上传的哈希算法不同 重新按配置算法计算
+            content_hash = await self.file_service.hash_object(upload_session.object_key)
+            file_entry = await self.file_service.add_stored_object(
+                upload_session.object_key,
+                upload_session.file_name,
+                total_size,
+                content_hash,
+                mime_type=upload_session.mime_type,
+                description=upload_session.description,
+                owner_user_id=upload_session.owner_user_id,
+                logical_path=f"/uploads/{Path(upload_session.object_key).name}",
+            )
+        except BaseException:
+            await asyncio.shield(self._release_claim(upload_session, merged))
+            raise
+        await self.upload_session_dao.finish(
+            session_id,
+            UploadSessionStatus.COMPLETED,
+            file_entry.id,
+            expected=UploadSessionStatus.COMPLETING,
+        )
+        await self.upload_session_dao.delete_parts(session_id)
+        logger.info(f"上传会话完成 {session_id}: {upload_session.file_name} {total_size} 字节")
+        return file_entry
+
+    async def _release_claim(self, upload_session: UploadSession, merged: bool):
+        """完成失败: 未合并时恢复为上传中(可重试) 已合并时分片已消耗 删除合并结果并结束会话"""
+        try:
+            if not merged:
+                await self.upload_session_dao.finish(
+                    upload_session.id,
+                    UploadSessionStatus.UPLOADING,
+                    expected=UploadSessionStatus.COMPLETING,
+                )
+                return
+            await self.storage.delete(upload_session.object_key)
+            await self.upload_session_dao.finish(
+                upload_session.id,
+                UploadSessionStatus.ABORTED,
+                expected=UploadSessionStatus.COMPLETING,
+            )
+            await self.upload_session_dao.delete_parts(upload_session.id)
+        except Exception as e:
+            logger.error(f"恢复上传会话状态失败 {upload_session.id}: {e}")
+
+    async def abort(self, session_id: str):
+        """
+        取消上传会话 清理已上传分片
+        :param session_id: 会话ID
+        """
+        upload_session = await self._get_active(session_id)
+        if not await self._abort(upload_session):
+            raise HTTPException(status_code=409, detail="上传会话正在完成或已结束")
+
+    async def _abort(self, upload_session: UploadSession) -> bool:
+        # 先条件更新状态再清理存储 已被完成请求占用(合并中)的会话不清理
+        if not await self.upload_session_dao.finish(
+            upload_session.id, UploadSessionStatus.ABORTED
+        ):
+            return False
+        try:
+            await self.storage.abort_multipart(
+                upload_session.object_key, upload_session.upload_id
+            )
+        except Exception as e:
+            logger.error(f"清理分片上传失败 {upload_session.id}: {e}")
+        await self.upload_session_dao.delete_parts(upload_session.id)
+        return True
+
+    async def sweep_expired(self, batch_size: int = 100) -> int:
+        """
+        清理过期未完成的上传会话
+        :param batch_size: 每批数量
+        :return: 清理数量
+        """
+        total = 0
+        while True:
+            expired = await self.upload_session_dao.list_expired(
+                datetime.now(timezone.utc), batch_size
+            )
+            for upload_session in expired:
+                total += await self._abort(upload_session)
+            if len(expired) < batch_size:
+                break
+            await asyncio.sleep(0)
+        if total:
+            logger.info(f"已清理过期上传会话 {total} 个")
+        return total
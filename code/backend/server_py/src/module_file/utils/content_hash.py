@@ -0,0 +1,159 @@
+"""
+文件内容哈希(去重键)
+可选 blake3 / xxh3_128(需安装 blake3 / xxhash) 未安装时回退到标准库 sha256 树哈希
+md5 为默认的兼容算法(与历史数据、ETag 一致)
+"""
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Protocol
+import asyncio
+import hashlib
+import os
+import logging
+
+try:
+    import blake3
+except ImportError:  # 可选依赖
+    blake3 = None
+try:
+    import xxhash
+except ImportError:  # 可选依赖
+    xxhash = None
+
+logger = logging.getLogger(__name__)
+
+# 读文件缓冲 大块读取减少系统调用与线程切换
+READ_BUFFER_SIZE = 4 * 1024 * 1024
+# 树哈希叶子大小
+TREE_LEAF_SIZE = 4 * 1024 * 1024
+# 树哈希最多同时计算的叶子数(限制内存 约 叶子大小 x 数量)
+TREE_MAX_PENDING = (os.cpu_count() or 1) * 2
+
+_tree_executor: ThreadPoolExecutor | None = None
+
+
+def _get_tree_executor() -> ThreadPoolExecutor:
+    # hashlib 计算大块数据时释放 GIL(sha256 多数CPU有硬件指令) 线程池即可多核并行
+    global _tree_executor
+    if _tree_executor is None:
+        _tree_executor = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 1, thread_name_prefix="content_hash"
+        )
+    return _tree_executor
+
+
+class Hasher(Protocol):
+    def update(self, data: bytes) -> None: ...
+
+    def hexdigest(self) -> str: ...
+
+
+class TreeHasher:
+    """
+    标准库 sha256 树哈希(多核)
+    按固定大小切分叶子 叶子在线程池并行计算 根哈希 = sha256(叶子摘要序列 + 总长度)
+    结果与整体 sha256 不同 只用于去重键
+    """
+
+    def __init__(self, leaf_size: int = TREE_LEAF_SIZE):
+        self.leaf_size = leaf_size
+        self._buffer = bytearray()
+        self._leaves: list[Future] = []
+        self._pending: deque[Future] = deque()
+        self._length = 0
+
+    @staticmethod
+    def _hash_leaf(data: bytes) -> bytes:
+        return hashlib.sha256(data).digest()
+
+    def _submit(self, data: bytes):
+        # 背压 等待最早的叶子完成后再提交
+        while len(self._pending) >= TREE_MAX_PENDING:
+            self._pending.popleft().result()
+        future = _get_tree_executor().submit(self._hash_leaf, data)
+        self._leaves.append(future)
+        self._pending.append(future)
+
+    def update(self, data: bytes):
+        self._length += len(data)
+        if not self._buffer and len(data) == self.leaf_size:
+            self._submit(bytes(data))
+            return
+        self._buffer += data
+        while len(self._buffer) >= self.leaf_size:
+            self._submit(bytes(self._buffer[: self.leaf_size]))
+            del self._buffer[: self.leaf_size]
+
+    def hexdigest(self) -> str:
+        leaves = [leaf.result() for leaf in self._leaves]
+        if self._buffer or not leaves:
+            leaves.append(self._hash_leaf(bytes(self._buffer)))
+        root = hashlib.sha256()
+        for leaf in leaves:
+            root.update(leaf)
+        root.update(self._length.to_bytes(8, "little"))
+        return root.hexdigest()
+
+
+def resolve_algorithm(algorithm: str) -> str:
+    """
+    解析可用的哈希算法 可选依赖未安装时回退到 sha256-tree
+    :param algorithm: md5 / sha256 / blake3 / xxh3_128 / sha256-tree
+    :return: 实际使用的算法
+    """
+    if algorithm in ("md5", "sha256", "sha256-tree"):
+        return algorithm
+    if algorithm == "blake3" and blake3 is not None:
+        return algorithm
+    if algorithm == "xxh3_128" and xxhash is not None:
+        return algorithm
+    if algorithm in ("blake3", "xxh3_128"):
+        logger.warning(f"未安装 {algorithm} 依赖 内容哈希回退为 sha256-tree")
+        return "sha256-tree"
+    raise ValueError(f"不支持的哈希算法: {algorithm}")
+
+
+def new_hasher(algorithm: str) -> Hasher:
+    """
+    创建增量哈希对象
+    :param algorithm: 已解析的算法(resolve_algorithm)
+    :return: 支持 update / hexdigest 的哈希对象
+    """
+    if algorithm == "blake3":
+        # blake3 本身是树哈希 大块 update 自动多线程
+        return blake3.blake3(max_threads=blake3.blake3.AUTO)
+    if algorithm == "xxh3_128":
+        return xxhash.xxh3_128()
+    if algorithm == "sha256-tree":
+        return TreeHasher()
+    return hashlib.new(algorithm)
+
+
+def _hash_file(path: str, algorithm: str, buffer_size: int) -> str:
+    if algorithm == "blake3":
+        # 内存映射 + 多线程
+        hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+        hasher.update_mmap(path)
+        return hasher.hexdigest()
+    hasher = new_hasher(algorithm)
+    with open(path, "rb", buffering=0) as f:
+        buffer = bytearray(buffer_size)
+        view = memoryview(buffer)
+        while size := f.readinto(buffer):
+            hasher.update(view[:size] if size < buffer_size else buffer)
+    return hasher.hexdigest()
+
+
+async def hash_file(
+    path: str | Path, algorithm: str, buffer_size: int = READ_BUFFER_SIZE
+) -> str:
+    """
+    计算文件哈希 在线程中大块读取 不阻塞事件循环
+    :param path: 文件路径
+    :param algorithm: 已解析的算法(resolve_algorithm)
+    :param buffer_size: 读取缓冲大小
+    :return: 十六进制摘要
+    """
+    return await asyncio.to_thread(_hash_file, str(path), algorithm, buffer_size)
@@ -0,0 +1,54 @@
+from PIL import Image, ImageOps
+from module_file.do.derivative import DerivativeFit, DerivativeFormat, DerivativeSpec
+import io
+
+# Pillow 保存格式名与参数
+_SAVE_OPTIONS = {
+    DerivativeFormat.WEBP: ("WEBP", {"method": 4}),
+    DerivativeFormat.JPEG: ("JPEG", {"optimize": True, "progressive": True}),
+    DerivativeFormat.PNG: ("PNG", {"optimize": True}),
+}
+
+
+def render_derivative(data: bytes, spec: DerivativeSpec, max_pixels: int) -> bytes:
+    """
+    生成图片派生(线程中执行 Pillow 解码/缩放/编码时释放 GIL)
+    :param data: 原图数据
+    :param spec: 派生规格
+    :param max_pixels: 原图像素上限(防止解压炸弹)
+    :return: 派生图数据
+    :raises ValueError: 原图像素超过上限
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        if image.width * image.height > max_pixels:
+            raise ValueError(f"图片像素超过上限 {max_pixels}")
+        # JPEG 按目标尺寸 DCT 降采样解码 大图解码快数倍(取长边防止EXIF旋转后不足)
+        edge = max(spec.width, spec.height or spec.width)
+        image.draft("RGB", (edge, edge))
+        image = ImageOps.exif_transpose(image)
+
+        if spec.fit == DerivativeFit.COVER and spec.height:
+            image = ImageOps.fit(image, (spec.width, spec.height), Image.Resampling.LANCZOS)
+        else:
+            # 只缩小不放大
+            image.thumbnail(
+                (spec.width, spec.height or image.height), Image.Resampling.LANCZOS
+            )
+
+        has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+        if spec.format == DerivativeFormat.JPEG:
+            if has_alpha:
+                background = Image.new("RGB", image.size, (255, 255, 255))
+                background.paste(image, mask=image.convert("RGBA").getchannel("A"))
+                image = background
+            elif image.mode != "RGB":
+                image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+        save_format, options = _SAVE_OPTIONS[spec.format]
+        if spec.format != DerivativeFormat.PNG:
+            options = {**options, "quality": spec.quality}
+        buffer = io.BytesIO()
+        image.save(buffer, save_format, **options)
+        return buffer.getvalue()
@@ -0,0 +1,183 @@
+from collections import Counter
+from typing import AsyncIterator, Awaitable, Callable, Protocol
+import asyncio
+import hashlib
+import logging
+from module_file.utils.multi_storage.session.interface.strorage_interface import (
+    StorageInterface,
+)
+from module_file.utils.multi_storage.chunk.fastcdc import FastCDC
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkIndex(Protocol):
+    """块索引(由业务模块的 DAO 实现)"""
+
+    async def reserve(self, counter: Counter, sizes: dict[str, int]) -> set[str]: ...
+
+    async def mark_stored(self, hashes: list[str]): ...
+
+    async def add_object(self, object_key: str, chunks: list[tuple[str, int]]): ...
+
+    async def release_chunks(self, counter: Counter) -> list[str]: ...
+
+    async def list_refs(self, object_key: str) -> list: ...
+
+    async def object_size(self, object_key: str) -> int | None: ...
+
+    async def remove_object(self, object_key: str) -> list[str]: ...
+
+    async def delete_unreferenced(
+        self, chunk_hash: str, delete_blob: Callable[[str], Awaitable]
+    ) -> bool: ...
+
+
+class ChunkStore:
+    """
+    块级去重存储
+    - 对象按 FastCDC 切分 每个块以 SHA-256 内容寻址存放在 chunks/ 下
+    - 已存在的块不重复写入 存储与写入带宽只随唯一字节增长
+    - 对象的块清单与块引用计数保存在块索引表中 读取时按序重组
+    - 写入时先预占块记录并加引用 再写入尚未写入(stored=False)的物理块 写入失败释放已加的引用
+      并发写入同一新块的各方都会写入物理块(内容相同) 各自写完才登记清单
+      引用归零的块在行锁内先删记录再删物理块
+    """
+
+    # 分块对象在 physical_storage 中的前缀
+    OBJECT_PREFIX = "cdc://"
+    # 每攒够多少个块查询一次索引
+    LOOKUP_BATCH = 64
+
+    def __init__(self, storage: StorageInterface, index: ChunkIndex, chunker: FastCDC):
+        """
+        :param storage: 底层存储(块实际写入位置)
+        :param index: 块索引
+        :param chunker: 分块器
+        """
+        self.storage = storage
+        self.index = index
+        self.chunker = chunker
+
+    @classmethod
+    def is_chunked(cls, physical_storage: str | None) -> bool:
+        """判断物理存储位置是否为分块对象"""
+        return bool(physical_storage) and physical_storage.startswith(cls.OBJECT_PREFIX)
+
+    @staticmethod
+    def chunk_key(chunk_hash: str) -> str:
+        """块存储键 两级哈希前缀目录"""
+        return f"chunks/{chunk_hash[:2]}/{chunk_hash[2:4]}/{chunk_hash}"
+
+    async def put(self, object_key: str, stream: AsyncIterator[bytes]) -> tuple[int, int]:
+        """
+        分块写入对象
+        :param object_key: 分块对象键(OBJECT_PREFIX 开头)
+        :param stream: 对象内容异步字节流
+        :return: (对象大小, 实际新写入字节数)
+        """
+        chunks: list[tuple[str, int]] = []
+        pending: list[tuple[str, bytes]] = []
+        # 已加的块引用 对象清单提交前失败时释放
+        referenced: Counter = Counter()
+        stored_bytes = 0
+
+        async def flush_pending():
+            nonlocal stored_bytes
+            counter = Counter(h for h, _ in pending)
+            # 先预占(加引用)再写物理块 写入期间同一块不会被其他对象的释放删除
+            stored = await self.index.reserve(counter, {h: len(data) for h, data in pending})
+            referenced.update(counter)
+            new = {h: data for h, data in pending if h not in stored}
+            for chunk_hash, data in new.items():
+                await self.storage.save(self.chunk_key(chunk_hash), data)
+                stored_bytes += len(data)
+            if new:
+                await self.index.mark_stored(list(new))
+            pending.clear()
+
+        try:
+            async for data in self.chunker.chunk_stream(stream):
+                chunk_hash = hashlib.sha256(data).hexdigest()
+                chunks.append((chunk_hash, len(data)))
+                pending.append((chunk_hash, data))
+                if len(pending) >= self.LOOKUP_BATCH:
+                    await flush_pending()
+            if pending:
+                await flush_pending()
+            # 块全部落盘后再登记清单 读取方不会看到缺块的对象
+            await self.index.add_object(object_key, chunks)
+        except BaseException:
+            # 超限(413)、客户端断开、数据库错误: 释放已加的引用 请求取消时也要完成清理
+            # 只被本次写入引用的块(含已写入的物理块)随引用归零一并删除
+            if referenced:
+                await asyncio.shield(self._release_chunks(referenced))
+            raise
+        total = sum(size for _, size in chunks)
+        logger.info(
+            f"分块写入 {object_key}: {len(chunks)} 块 {total} 字节 新写入 {stored_bytes} 字节"
+        )
+        return total, stored_bytes
+
+    async def _release_chunks(self, counter: Counter):
+        try:
+            await self._collect(await self.index.release_chunks(counter))
+        except Exception as e:
+            logger.error(f"释放块引用失败({len(counter)} 块): {e}")
+
+    async def stream(
+        self, object_key: str, start: int = 0, end: int | None = None
+    ) -> AsyncIterator[bytes]:
+        """
+        按范围读取分块对象 只加载与 [start, end] 相交的块
+        :param object_key: 分块对象键
+        :param start: 起始偏移
+        :param end: 结束偏移(含) None 表示读到末尾
+        :yield: 数据
+        """
+        refs = await self.index.list_refs(object_key)
+        if not refs:
+            raise FileNotFoundError(f"分块对象不存在: {object_key}")
+        for ref in refs:
+            ref_end = ref.offset + ref.size - 1
+            if ref_end < start:
+                continue
+            if end is not None and ref.offset > end:
+                break
+            data = await self.storage.load(self.chunk_key(ref.chunk_hash))
+            lo = max(start - ref.offset, 0)
+            hi = ref.size if end is None else min(end - ref.offset + 1, ref.size)
+            yield data[lo:hi] if lo or hi < ref.size else data
+
+    async def exists(self, object_key: str) -> bool:
+        """判断分块对象是否存在"""
+        return await self.index.object_size(object_key) is not None
+
+    async def size(self, object_key: str) -> int:
+        """获取分块对象大小"""
+        size = await self.index.object_size(object_key)
+        if size is None:
+            raise FileNotFoundError(f"分块对象不存在: {object_key}")
+        return size
+
+    async def release(self, object_key: str) -> int:
+        """
+        释放分块对象 引用归零的块从底层存储删除
+        :param object_key: 分块对象键
+        :return: 删除的块数量
+        """
+        return await self._collect(await self.index.remove_object(object_key))
+
+    async def _collect(self, chunk_hashes: list[str]) -> int:
+        # 删除时再次确认引用仍为0(期间被其他写入加了引用的块保留)
+        deleted = 0
+        for chunk_hash in chunk_hashes:
+            try:
+                if await self.index.delete_unreferenced(chunk_hash, self._delete_blob):
+                    deleted += 1
+            except Exception as e:
+                logger.error(f"删除块失败 {chunk_hash}: {e}")
+        return deleted
+
+    async def _delete_blob(self, chunk_hash: str):
+        await self.storage.delete(self.chunk_key(chunk_hash))
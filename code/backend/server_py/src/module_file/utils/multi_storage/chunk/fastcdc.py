@@ -0,0 +1,169 @@
+from typing import AsyncIterator
+import asyncio
+import random
+
+import numpy as np
+
+# gear 表 固定种子生成 保证不同进程/版本切分结果一致
+_rng = random.Random(0x5EED_CDC)
+_GEAR = np.array([_rng.getrandbits(64) for _ in range(256)], dtype=np.uint64)
+del _rng
+# gear 哈希每步左移一位 64 步后更早的字节全部移出 哈希只取决于最近 64 字节
+_WINDOW = 64
+# 哈希分段大小(字节)
+HASH_BLOCK = 64 * 1024
+
+
+def _high_mask(bits: int) -> np.uint64:
+    """取 gear 哈希高位作为判断位(高位包含更长的窗口历史)"""
+    return np.uint64(((1 << bits) - 1) << (64 - bits))
+
+
+def gear_hashes(data: bytes | bytearray | memoryview) -> np.ndarray:
+    """
+    整段计算 gear 滚动哈希(从 data[0] 开始 h = (h << 1) + gear[b] 每个位置的值)
+    h[i] = sum(gear[data[i - k]] << k) k < min(i + 1, 64) 按窗口倍增求和 每段只需 6 次整段运算
+    按 HASH_BLOCK 分段计算(段间重叠 63 字节) 中间数组留在 CPU 缓存内
+    uint64 运算自然按 2^64 取模 numpy 计算时释放 GIL
+    :param data: 数据
+    :return: 每个位置的哈希 [len(data)] uint64
+    """
+    raw = np.frombuffer(data, dtype=np.uint8)
+    out = np.empty(len(raw), dtype=np.uint64)
+    shifted = np.empty(HASH_BLOCK + _WINDOW, dtype=np.uint64)
+    for block_start in range(0, len(raw), HASH_BLOCK):
+        lo = max(block_start - _WINDOW + 1, 0)
+        h = _GEAR[raw[lo : block_start + HASH_BLOCK]]
+        width = 1
+        while width < min(_WINDOW, len(h)):
+            tail = shifted[: len(h) - width]
+            np.left_shift(h[:-width], np.uint64(width), out=tail)
+            h[width:] += tail
+            width *= 2
+        out[block_start : block_start + HASH_BLOCK] = h[block_start - lo :]
+    return out
+
+
+class FastCDC:
+    """
+    FastCDC 内容定义分块(gear 滚动哈希 + 归一化分块)
+    - 跳过 min_size 之前的字节 减少哈希计算
+    - 平均块大小之前用更严格的掩码 之后用更宽松的掩码 块大小分布集中在 avg_size 附近
+    - 插入/删除只影响附近的块边界 近似文件可复用大部分块
+    """
+
+    def __init__(
+        self,
+        min_size: int = 16 * 1024,
+        avg_size: int = 64 * 1024,
+        max_size: int = 256 * 1024,
+    ):
+        """
+        :param min_size: 最小块大小(字节)
+        :param avg_size: 平均块大小(字节) 需为2的幂
+        :param max_size: 最大块大小(字节)
+        """
+        if not 0 < min_size <= avg_size <= max_size:
+            raise ValueError("分块大小需满足 0 < min_size <= avg_size <= max_size")
+        self.min_size = min_size
+        self.avg_size = avg_size
+        self.max_size = max_size
+        bits = max(avg_size.bit_length() - 1, 3)
+        self.mask_s = _high_mask(bits + 2)
+        self.mask_l = _high_mask(bits - 2)
+
+    def cut(self, data: bytes | bytearray | memoryview) -> int:
+        """
+        计算首个块的长度
+        :param data: 数据缓冲 长度不足 max_size 时视为流的末尾
+        :return: 首个块长度
+        """
+        if len(data) <= self.min_size:
+            return len(data)
+        return self._cut_sizes(memoryview(data)[: self.max_size], final=True)[0]
+
+    def _cut_sizes(self, view: memoryview, final: bool) -> list[int]:
+        """
+        连续切分缓冲 整段只算一次哈希
+        每块从 min_size 处重新开始哈希 距起点 64 字节后与整段哈希相同 只需单独计算起点附近的 63 个位置
+        :param view: 数据缓冲
+        :param final: 是否为流的末尾(不足 max_size 的剩余数据也切出)
+        :return: 各块长度
+        """
+        n = len(view)
+        hashes = gear_hashes(view)
+        hits_s = np.flatnonzero((hashes & self.mask_s) == 0)
+        hits_l = np.flatnonzero((hashes & self.mask_l) == 0)
+
+        def first_hit(hits: np.ndarray, lo: int, hi: int) -> int | None:
+            index = np.searchsorted(hits, lo)
+            if index < len(hits) and hits[index] < hi:
+                return int(hits[index])
+            return None
+
+        sizes = []
+        offset = 0
+        while n - offset >= self.max_size or (final and offset < n):
+            remaining = n - offset
+            if remaining <= self.min_size:
+                sizes.append(remaining)
+                break
+            start = offset + self.min_size
+            end = offset + min(remaining, self.max_size)
+            normal = offset + min(remaining, self.avg_size)
+            warm = min(start + _WINDOW - 1, end)
+            cut = None
+            # 起点附近 窗口未满 单独计算
+            for i, h in enumerate(gear_hashes(view[start:warm]), start):
+                if not h & (self.mask_s if i < normal else self.mask_l):
+                    cut = i
+                    break
+            if cut is None:
+                cut = first_hit(hits_s, warm, normal)
+            if cut is None:
+                cut = first_hit(hits_l, max(warm, normal), end)
+            size = (cut + 1 if cut is not None else end) - offset
+            sizes.append(size)
+            offset += size
+        return sizes
+
+    def split(self, data: bytes) -> list[bytes]:
+        """
+        对完整数据分块
+        :param data: 完整数据
+        :return: 数据块列表
+        """
+        view = memoryview(data)
+        chunks = []
+        offset = 0
+        for size in self._cut_sizes(view, final=True):
+            chunks.append(bytes(view[offset : offset + size]))
+            offset += size
+        return chunks
+
+    def _cut_ready(self, buf: bytearray, final: bool = False) -> list[int]:
+        # 缓冲满 max_size 才切分 保证切分点与读取块大小无关
+        view = memoryview(buf)
+        try:
+            return self._cut_sizes(view, final)
+        finally:
+            view.release()
+
+    async def chunk_stream(self, stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """
+        对异步字节流分块 缓冲区最多保留 max_size + 一次读取大小
+        滚动哈希放到线程中计算(numpy 整段运算释放 GIL) 避免占用事件循环
+        :param stream: 异步字节流
+        :yield: 数据块
+        """
+        buf = bytearray()
+        async for block in stream:
+            buf += block
+            if len(buf) < self.max_size:
+                continue
+            for size in await asyncio.to_thread(self._cut_ready, buf):
+                yield bytes(buf[:size])
+                del buf[:size]
+        for size in await asyncio.to_thread(self._cut_ready, buf, True):
+            yield bytes(buf[:size])
+            del buf[:size]
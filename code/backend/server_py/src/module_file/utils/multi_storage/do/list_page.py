@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+
+# 单页最多返回键数(同 S3 ListObjectsV2 MaxKeys 默认值)
+LIST_MAX_KEYS = 1000
+
+
+class ListPage(BaseModel):
+    """分页列举结果(对齐 S3 ListObjectsV2 语义)"""
+
+    keys: list[str] = Field(default_factory=list, description="按字典序排列的键")
+    is_truncated: bool = Field(False, description="是否还有下一页")
+    next_start_after: str | None = Field(
+        None, description="下一页的 start_after(即本页最后一个键) 无下一页为 None"
+    )
+
+    @classmethod
+    def create(cls, keys: list[str], max_keys: int) -> "ListPage":
+        """由多取一个的键列表构造分页结果"""
+        is_truncated = len(keys) > max_keys
+        keys = keys[:max_keys]
+        return cls(
+            keys=keys,
+            is_truncated=is_truncated,
+            next_start_after=keys[-1] if is_truncated and keys else None,
+        )
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field, field_validator
+from typing import Literal
 import os
 
 _STORAGE_REGISTRY: dict[str, type["StorageConfig"]] = {}
@@ -12,6 +13,17 @@ class StorageConfig(BaseModel):
         default_factory=list, description="允许的文件扩展名列表，空表示不限制"
     )
 
+    @field_validator("max_size", mode="before")
+    @classmethod
+    def parse_max_size(cls, v):
+        """支持配置文件中 1024 * 1024 * 10 形式的乘法表达式"""
+        if isinstance(v, str):
+            size = 1
+            for part in v.split("*"):
+                size *= int(part.strip())
+            return size
+        return v
+
     def __init_subclass__(cls, config_type: str | None = None, **kwargs):
         super().__init_subclass__(**kwargs)
         if config_type is not None:
@@ -23,6 +35,9 @@ class LocalStorage(StorageConfig, config_type="local"):
     secret_key: str = Field(
         "12345678", description="本地加密密钥，默认值为，默认12345678"
     )
+    # 哈希前缀分目录 避免单目录文件过多
+    shard_depth: int = Field(0, ge=0, le=4, description="分目录层数 0为不分目录")
+    shard_width: int = Field(2, ge=1, le=4, description="每层目录名长度(十六进制字符)")
 
     def __init__(self, **data):
         super().__init__(**data)
@@ -31,14 +46,45 @@ class LocalStorage(StorageConfig, config_type="local"):
 
 
 class S3Storage(StorageConfig, config_type="s3"):
-    bucket: str = Field(..., description="S3存储桶名称")
+    bucket: str = Field(
+        ...,
+        validation_alias=AliasChoices("bucket", "bucket_name"),
+        description="S3存储桶名称",
+    )
     endpoint_url: str | None = Field(
         None, description="S3服务端点URL，如使用AWS S3可不填"
     )
     region: str | None = Field(None, description="S3区域，默认为us-east-1")
-    access_key_id: str | None = Field(None, description="S3访问密钥ID")
-    secret_access_key: str | None = Field(None, description="S3秘密访问密钥")
+    access_key_id: str | None = Field(
+        None,
+        validation_alias=AliasChoices("access_key_id", "access_key"),
+        description="S3访问密钥ID",
+    )
+    secret_access_key: str | None = Field(
+        None,
+        validation_alias=AliasChoices("secret_access_key", "secret_key"),
+        description="S3秘密访问密钥",
+    )
     session_token: str | None = Field(None, description="S3会话令牌")
+    # 连接池与重试
+    max_pool_connections: int = Field(50, description="连接池最大连接数")
+    connect_timeout: float = Field(10, description="连接超时(秒)")
+    read_timeout: float = Field(60, description="读取超时(秒)")
+    tcp_keepalive: bool = Field(True, description="是否开启TCP keep-alive")
+    max_attempts: int = Field(5, description="最大尝试次数(含首次)")
+    retry_mode: Literal["legacy", "standard", "adaptive"] = Field(
+        "standard", description="重试模式"
+    )
+    # 流式写入自动分片上传
+    multipart_part_size: int = Field(
+        8 * 1024 * 1024, ge=5 * 1024 * 1024, description="分片大小(字节) 不小于5MB"
+    )
+    multipart_concurrency: int = Field(4, ge=1, description="单个对象并发上传分片数")
+
+    @field_validator("multipart_part_size", mode="before")
+    @classmethod
+    def parse_part_size(cls, v):
+        return cls.parse_max_size(v)
 
 
 class StorageConfigFactory:
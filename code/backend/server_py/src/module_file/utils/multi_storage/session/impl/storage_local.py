@@ -2,12 +2,80 @@ import hashlib
 import hmac
 import time
 import urllib.parse
+from itertools import islice
 from pathlib import Path
-from typing import AsyncIterator
+from typing import AsyncIterator, Iterator
 import aiofiles
 import io
-from module_file.utils.multi_storage.session.interface.strorage_interface import StorageInterface
+import os
+import shutil
+import asyncio
+from uuid import uuid4
+from module_file.utils.multi_storage.session.interface.strorage_interface import (
+    StorageInterface,
+    PartChecksumError,
+)
 from module_file.utils.multi_storage.do.storage_config import LocalStorage
+from module_file.utils.multi_storage.do.list_page import ListPage, LIST_MAX_KEYS
+
+# 流式读取块大小
+STREAM_CHUNK_SIZE = 64 * 1024
+# 分片上传临时目录(相对 base_dir)
+MULTIPART_DIR = ".multipart"
+# 批量删除每批并行数量
+DELETE_BATCH_SIZE = 64
+# 分片合并读写缓冲
+CONCAT_BUFFER_SIZE = 1024 * 1024
+
+
+def _concat_parts(part_paths: list[Path], dst_path: Path) -> tuple[str, list[str]]:
+    """顺序拼接分片文件 同时计算整体与各分片MD5(线程中执行)"""
+    whole_md5 = hashlib.md5()
+    part_md5s = []
+    with open(dst_path, "wb") as dst:
+        for part_path in part_paths:
+            part_md5 = hashlib.md5()
+            with open(part_path, "rb") as src:
+                while buf := src.read(CONCAT_BUFFER_SIZE):
+                    whole_md5.update(buf)
+                    part_md5.update(buf)
+                    dst.write(buf)
+            part_md5s.append(part_md5.hexdigest())
+    return whole_md5.hexdigest(), part_md5s
+
+
+def _walk_keys(dir_path: str, rel_dir: str, prefix: str, start_after: str) -> Iterator[str]:
+    """
+    按键字典序流式遍历目录(线程中执行)
+    目录按 "名称/" 参与排序 深度优先遍历即为键的全局字典序
+    整体小于 start_after 或与 prefix 不相交的子目录不进入 每次只扫描需要的目录
+    """
+    entries = []
+    try:
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    key = f"{rel_dir}{entry.name}/"
+                    if not (key.startswith(prefix) or prefix.startswith(key)):
+                        continue
+                    # 目录下所有键都以 key 开头 且都大于 key
+                    if key < start_after and not start_after.startswith(key):
+                        continue
+                    if key == f"{MULTIPART_DIR}/":
+                        continue
+                    entries.append((key, True, entry.path))
+                elif entry.is_file():
+                    key = f"{rel_dir}{entry.name}"
+                    if key.startswith(prefix) and key > start_after:
+                        entries.append((key, False, entry.path))
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    entries.sort()
+    for key, is_dir, path in entries:
+        if is_dir:
+            yield from _walk_keys(path, key, prefix, start_after)
+        else:
+            yield key
 
 
 class LocalStorageInterface(StorageInterface):
@@ -15,6 +83,16 @@ class LocalStorageInterface(StorageInterface):
         self.config = config
         self.base_dir = Path(config.base_dir).resolve()
 
+    def object_key(self, directory: str, name: str) -> str:
+        """
+        按名称哈希前缀分目录 如 shard_depth=2 时 uploads/a.txt -> uploads/3f/a9/a.txt
+        单目录文件数约为 总数 / 16^(层数 x 目录名长度)
+        """
+        width = self.config.shard_width
+        digest = hashlib.md5(name.encode("utf-8")).hexdigest()
+        shards = [digest[i * width : (i + 1) * width] for i in range(self.config.shard_depth)]
+        return "/".join(part for part in (directory.strip("/"), *shards, name) if part)
+
     async def save(self, key: str, data: bytes | io.IOBase | AsyncIterator[bytes]) -> str:
         file_path = self.base_dir / key
         file_path.parent.mkdir(parents=True, exist_ok=True)
@@ -40,6 +118,23 @@ class LocalStorageInterface(StorageInterface):
         async with aiofiles.open(file_path, "rb") as f:
             return await f.read()
 
+    async def stream(
+        self, key: str, start: int = 0, end: int | None = None
+    ) -> AsyncIterator[bytes]:
+        file_path = self.base_dir / key
+        remaining = None if end is None else end - start + 1
+        async with aiofiles.open(file_path, "rb") as f:
+            if start:
+                await f.seek(start)
+            while remaining is None or remaining > 0:
+                size = STREAM_CHUNK_SIZE if remaining is None else min(STREAM_CHUNK_SIZE, remaining)
+                chunk = await f.read(size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
     async def delete(self, key: str) -> bool:
         file_path = self.base_dir / key
         try:
@@ -48,6 +143,102 @@ class LocalStorageInterface(StorageInterface):
         except FileNotFoundError:
             return False
 
+    async def delete_many(self, keys: list[str]) -> dict[str, str | None]:
+        """线程池并行 unlink 每批 DELETE_BATCH_SIZE 个"""
+
+        def unlink(key: str) -> str | None:
+            try:
+                (self.base_dir / key).unlink(missing_ok=True)
+                return None
+            except OSError as e:
+                return str(e)
+
+        result = {}
+        for i in range(0, len(keys), DELETE_BATCH_SIZE):
+            batch = keys[i : i + DELETE_BATCH_SIZE]
+            errors = await asyncio.gather(
+                *(asyncio.to_thread(unlink, key) for key in batch)
+            )
+            result.update(zip(batch, errors))
+        return result
+
+    async def move(self, src_key: str, dst_key: str) -> str:
+        """同一文件系统内 os.replace 原子重命名"""
+        src_path = self.base_dir / src_key
+        dst_path = self.base_dir / dst_key
+        dst_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(src_path, dst_path)
+        return str(dst_path)
+
+    def _multipart_dir(self, upload_id: str) -> Path:
+        # upload_id 只允许十六进制 防止路径穿越
+        if not upload_id or not all(c in "0123456789abcdef" for c in upload_id):
+            raise ValueError(f"非法的 upload_id: {upload_id}")
+        return self.base_dir / MULTIPART_DIR / upload_id
+
+    async def create_multipart(self, key: str) -> str:
+        upload_id = uuid4().hex
+        self._multipart_dir(upload_id).mkdir(parents=True, exist_ok=True)
+        return upload_id
+
+    async def upload_part(
+        self,
+        key: str,
+        upload_id: str,
+        part_number: int,
+        data: bytes | AsyncIterator[bytes],
+        checksum: str | None = None,
+    ) -> str:
+        """
+        分片写入临时文件 校验通过后原子替换 同一分片重复上传以最后一次成功为准
+        校验失败的重传不会覆盖已上传的分片
+        """
+        part_dir = self._multipart_dir(upload_id)
+        if not part_dir.is_dir():
+            raise FileNotFoundError(f"分片上传不存在: {upload_id}")
+        tmp_path = part_dir / f"{part_number:05d}.{uuid4().hex}.tmp"
+        md5_hash = hashlib.md5()
+        try:
+            async with aiofiles.open(tmp_path, "wb") as f:
+                if isinstance(data, bytes):
+                    md5_hash.update(data)
+                    await f.write(data)
+                else:
+                    async for chunk in data:
+                        md5_hash.update(chunk)
+                        await f.write(chunk)
+            if checksum and checksum.lower() != md5_hash.hexdigest():
+                raise PartChecksumError(f"分片 {part_number} 校验失败")
+            os.replace(tmp_path, part_dir / f"{part_number:05d}.part")
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return md5_hash.hexdigest()
+
+    async def complete_multipart(
+        self, key: str, upload_id: str, parts: list[tuple[int, str]]
+    ) -> str:
+        """按分片号顺序拼接到临时文件 校验分片MD5后原子替换到目标键"""
+        part_dir = self._multipart_dir(upload_id)
+        part_paths = [part_dir / f"{number:05d}.part" for number, _ in parts]
+        for part_path in part_paths:
+            if not part_path.is_file():
+                raise FileNotFoundError(f"分片不存在: {part_path.name}")
+        dst_path = self.base_dir / key
+        dst_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = part_dir / "complete.tmp"
+        etag, part_md5s = await asyncio.to_thread(_concat_parts, part_paths, tmp_path)
+        for (number, expected), actual in zip(parts, part_md5s):
+            if expected != actual:
+                tmp_path.unlink(missing_ok=True)
+                raise ValueError(f"分片 {number} 校验失败")
+        os.replace(tmp_path, dst_path)
+        await asyncio.to_thread(shutil.rmtree, part_dir, True)
+        return etag
+
+    async def abort_multipart(self, key: str, upload_id: str) -> None:
+        await asyncio.to_thread(shutil.rmtree, self._multipart_dir(upload_id), True)
+
     async def exists(self, key: str) -> bool:
         file_path = self.base_dir / key
         return file_path.exists()
@@ -56,14 +247,28 @@ class LocalStorageInterface(StorageInterface):
         file_path = self.base_dir / key
         return file_path.stat().st_size
 
+    def _iter_keys(self, prefix: str, start_after: str) -> Iterator[str]:
+        # 从前缀所在目录开始遍历 不扫描无关目录
+        parent = prefix.rpartition("/")[0]
+        rel_dir = f"{parent}/" if parent else ""
+        return _walk_keys(str(self.base_dir / parent), rel_dir, prefix, start_after)
+
     async def list(self, prefix: str = "") -> list[str]:
-        path_prefix = self.base_dir / prefix
-        result = []
-        for p in path_prefix.rglob("*"):
-            if p.is_file():
-                rel_path = p.relative_to(self.base_dir).as_posix()
-                result.append(rel_path)
-        return sorted(result)
+        return await asyncio.to_thread(lambda: list(self._iter_keys(prefix, "")))
+
+    async def list_page(
+        self,
+        prefix: str = "",
+        start_after: str | None = None,
+        max_keys: int = LIST_MAX_KEYS,
+    ) -> ListPage:
+        """scandir 流式遍历 只读取本页所需目录 多取一个键判断是否还有下一页"""
+        if max_keys < 1:
+            raise ValueError(f"max_keys 需大于0: {max_keys}")
+        keys = await asyncio.to_thread(
+            lambda: list(islice(self._iter_keys(prefix, start_after or ""), max_keys + 1))
+        )
+        return ListPage.create(keys, max_keys)
 
     async def generate_presigned_url(self, key: str, method: str = 'put', expiration: int = 3600) -> str | None:
         """生成预签名URL，格式为: file://{key}?expires={expire_time}&method={method}&token={token}"""
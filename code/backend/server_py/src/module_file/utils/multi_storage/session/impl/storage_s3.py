@@ -1,66 +1,202 @@
 import aioboto3
+import asyncio
+from botocore.config import Config
+from contextlib import AsyncExitStack, asynccontextmanager
 from typing import AsyncIterator
 import io
-from src.module_file.utils.multi_storage.session.interface.strorage_interface import StorageInterface
-from src.module_file.utils.multi_storage.do.storgae_config import S3Storage
+import base64
+import hashlib
+from module_file.utils.multi_storage.session.interface.strorage_interface import (
+    StorageInterface,
+    PartChecksumError,
+)
+from module_file.utils.multi_storage.do.storage_config import S3Storage
+from module_file.utils.multi_storage.do.list_page import ListPage, LIST_MAX_KEYS
+
+# 流式读取块大小
+STREAM_CHUNK_SIZE = 64 * 1024
+# delete_objects 单次最多键数
+DELETE_OBJECTS_MAX_KEYS = 1000
 
 
 class S3StorageInterface(StorageInterface):
-    """S3存储实现"""
-    
+    """
+    S3存储实现
+    每个进程复用一个长连接客户端(连接池/TLS会话/凭证解析只做一次)
+    由 lifespan 调用 connect/close 管理生命周期 未连接时首次使用懒加载
+    """
+
     def __init__(self, config: S3Storage):
         self.config = config
         self.bucket = config.bucket
-        
-        # 初始化aioboto3客户端
+
+        # 初始化aioboto3会话
         self.session = aioboto3.Session()
-        
-    async def _get_client(self):
-        """获取S3客户端"""
+        self._client = None
+        self._exit_stack: AsyncExitStack | None = None
+        self._lock = asyncio.Lock()
+
+    def _client_kwargs(self) -> dict:
         client_kwargs = {
             'service_name': 's3',
             'endpoint_url': self.config.endpoint_url,
-            'config': aioboto3.Config(signature_version='s3v4')
+            'config': Config(
+                signature_version='s3v4',
+                max_pool_connections=self.config.max_pool_connections,
+                connect_timeout=self.config.connect_timeout,
+                read_timeout=self.config.read_timeout,
+                tcp_keepalive=self.config.tcp_keepalive,
+                retries={
+                    'max_attempts': self.config.max_attempts,
+                    'mode': self.config.retry_mode,
+                },
+            ),
         }
-        
+
         # 添加认证信息（如果提供的话）
         if self.config.access_key_id and self.config.secret_access_key:
             client_kwargs['aws_access_key_id'] = self.config.access_key_id
             client_kwargs['aws_secret_access_key'] = self.config.secret_access_key
             if self.config.session_token:
                 client_kwargs['aws_session_token'] = self.config.session_token
-        
+
         # 添加区域信息（如果提供的话）
         if self.config.region:
             client_kwargs['region_name'] = self.config.region
-            
-        return await self.session.client(**client_kwargs)
-    
+        return client_kwargs
+
+    async def connect(self):
+        """创建共享客户端(lifespan 启动时调用)"""
+        async with self._lock:
+            if self._client is not None:
+                return
+            exit_stack = AsyncExitStack()
+            self._client = await exit_stack.enter_async_context(
+                self.session.client(**self._client_kwargs())
+            )
+            self._exit_stack = exit_stack
+
+    async def close(self):
+        """关闭共享客户端及连接池(lifespan 关闭时调用)"""
+        async with self._lock:
+            if self._exit_stack is not None:
+                await self._exit_stack.aclose()
+            self._client = None
+            self._exit_stack = None
+
+    @asynccontextmanager
+    async def _get_client(self):
+        """获取共享S3客户端(异步上下文管理器 退出时不关闭客户端)"""
+        if self._client is None:
+            await self.connect()
+        yield self._client
+
+    async def _iter_parts(
+        self, data: bytes | io.IOBase | AsyncIterator[bytes], part_size: int
+    ) -> AsyncIterator[bytes]:
+        """把任意输入切成 part_size 大小的分片(最后一片可更小) 只缓冲一个分片"""
+        if isinstance(data, bytes):
+            for i in range(0, len(data), part_size):
+                yield data[i : i + part_size]
+            return
+        if hasattr(data, 'read'):  # io.IOBase 同步读取放到线程中
+            async def source():
+                while chunk := await asyncio.to_thread(data.read, part_size):
+                    yield chunk.encode() if isinstance(chunk, str) else chunk
+            stream = source()
+        elif hasattr(data, '__aiter__'):  # AsyncIterator[bytes]
+            stream = data
+        else:
+            raise TypeError(f"Unsupported data type: {type(data)}")
+        buffer = bytearray()
+        async for chunk in stream:
+            buffer.extend(chunk)
+            while len(buffer) >= part_size:
+                yield bytes(buffer[:part_size])
+                del buffer[:part_size]
+        if buffer:
+            yield bytes(buffer)
+
+    def object_key(self, directory: str, name: str) -> str:
+        """对象存储无单目录数量问题 不分目录"""
+        return "/".join(part for part in (directory.strip("/"), name) if part)
+
     async def save(self, key: str, data: bytes | io.IOBase | AsyncIterator[bytes]) -> str:
-        """保存数据到S3存储"""
+        """
+        保存数据到S3存储
+        不超过一个分片的数据直接 put_object 否则自动分片上传
+        并发上传的分片数受 multipart_concurrency 限制 内存占用约为 分片大小 x 并发数
+        """
+        part_size = self.config.multipart_part_size
+        parts = self._iter_parts(data, part_size)
+        slots = asyncio.Semaphore(self.config.multipart_concurrency)
         async with self._get_client() as client:
-            try:
-                if isinstance(data, bytes):
-                    await client.put_object(Bucket=self.bucket, Key=key, Body=data)
-                elif hasattr(data, 'read'):  # io.IOBase
-                    # 读取IO对象内容
-                    content = data.read()
-                    if isinstance(content, str):
-                        content = content.encode()
-                    await client.put_object(Bucket=self.bucket, Key=key, Body=content)
-                elif hasattr(data, '__aiter__'):  # AsyncIterator[bytes]
-                    # 将异步迭代器内容收集后上传
-                    content = bytearray()
-                    async for chunk in data:
-                        content.extend(chunk)
-                    await client.put_object(Bucket=self.bucket, Key=key, Body=bytes(content))
-                else:
-                    raise TypeError(f"Unsupported data type: {type(data)}")
-                
+            await slots.acquire()
+            first = await anext(parts, b"")
+            if len(first) < part_size:
+                # 小对象 单次上传
+                await client.put_object(Bucket=self.bucket, Key=key, Body=first)
                 return f"s3://{self.bucket}/{key}"
-            except Exception as e:
-                raise e
-    
+
+            upload_id = (
+                await client.create_multipart_upload(Bucket=self.bucket, Key=key)
+            )["UploadId"]
+            etags: dict[int, str] = {}
+            errors: list[BaseException] = []
+
+            async def upload(part_number: int, body: bytes):
+                try:
+                    response = await client.upload_part(
+                        Bucket=self.bucket,
+                        Key=key,
+                        UploadId=upload_id,
+                        PartNumber=part_number,
+                        Body=body,
+                    )
+                    etags[part_number] = response["ETag"]
+                except BaseException as e:
+                    errors.append(e)
+                finally:
+                    slots.release()
+
+            tasks = [asyncio.create_task(upload(1, first))]
+            del first
+            try:
+                part_number = 1
+                while not errors:
+                    # 先占用并发槽位再读取下一片 缓冲中的分片也计入并发数
+                    await slots.acquire()
+                    body = await anext(parts, None)
+                    if body is None:
+                        slots.release()
+                        break
+                    part_number += 1
+                    tasks.append(asyncio.create_task(upload(part_number, body)))
+                    del body
+                await asyncio.gather(*tasks)
+                if errors:
+                    raise errors[0]
+                await client.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    MultipartUpload={
+                        "Parts": [
+                            {"PartNumber": number, "ETag": etags[number]}
+                            for number in sorted(etags)
+                        ]
+                    },
+                )
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                await client.abort_multipart_upload(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id
+                )
+                raise
+            return f"s3://{self.bucket}/{key}"
+
     async def load(self, key: str) -> bytes:
         """从S3存储加载数据"""
         async with self._get_client() as client:
@@ -73,6 +209,25 @@ class S3StorageInterface(StorageInterface):
             except Exception as e:
                 raise e
     
+    async def stream(
+        self, key: str, start: int = 0, end: int | None = None
+    ) -> AsyncIterator[bytes]:
+        """按范围 GET 流式读取S3对象"""
+        params = {"Bucket": self.bucket, "Key": key}
+        if start or end is not None:
+            params["Range"] = f"bytes={start}-{'' if end is None else end}"
+        async with self._get_client() as client:
+            try:
+                response = await client.get_object(**params)
+            except client.exceptions.NoSuchKey:
+                raise FileNotFoundError(f"Object not found: {key}")
+            body = response["Body"]
+            try:
+                async for chunk in body.iter_chunks(STREAM_CHUNK_SIZE):
+                    yield chunk
+            finally:
+                body.close()
+
     async def delete(self, key: str) -> bool:
         """删除S3存储中的对象"""
         async with self._get_client() as client:
@@ -82,6 +237,107 @@ class S3StorageInterface(StorageInterface):
             except Exception:
                 return False
     
+    async def delete_many(self, keys: list[str]) -> dict[str, str | None]:
+        """delete_objects 批量删除 每次最多1000个键"""
+        result = {}
+        async with self._get_client() as client:
+            for i in range(0, len(keys), DELETE_OBJECTS_MAX_KEYS):
+                batch = keys[i : i + DELETE_OBJECTS_MAX_KEYS]
+                result.update(dict.fromkeys(batch))
+                try:
+                    response = await client.delete_objects(
+                        Bucket=self.bucket,
+                        Delete={
+                            "Objects": [{"Key": key} for key in batch],
+                            "Quiet": True,
+                        },
+                    )
+                except Exception as e:
+                    result.update(dict.fromkeys(batch, str(e)))
+                    continue
+                for error in response.get("Errors", []):
+                    result[error["Key"]] = error.get("Message") or error.get("Code")
+        return result
+
+    async def move(self, src_key: str, dst_key: str) -> str:
+        """服务端复制到目标键后删除临时键(大对象自动分片复制)"""
+        async with self._get_client() as client:
+            await client.copy(
+                {"Bucket": self.bucket, "Key": src_key}, self.bucket, dst_key
+            )
+            await client.delete_object(Bucket=self.bucket, Key=src_key)
+            return f"s3://{self.bucket}/{dst_key}"
+
+    async def create_multipart(self, key: str) -> str:
+        """创建S3分片上传"""
+        async with self._get_client() as client:
+            response = await client.create_multipart_upload(Bucket=self.bucket, Key=key)
+            return response["UploadId"]
+
+    async def upload_part(
+        self,
+        key: str,
+        upload_id: str,
+        part_number: int,
+        data: bytes | AsyncIterator[bytes],
+        checksum: str | None = None,
+    ) -> str:
+        """
+        上传S3分片 携带 Content-MD5 由服务端校验分片完整性
+        提供 checksum 时 Content-MD5 取客户端的值 不一致的分片不会覆盖已上传的同号分片
+        分片整片缓冲在内存 大小由上传会话限制(MAX_PART_SIZE)
+        """
+        if not isinstance(data, bytes):
+            buffer = bytearray()
+            async for chunk in data:
+                buffer.extend(chunk)
+            data = bytes(buffer)
+        digest = hashlib.md5(data).digest()
+        if checksum:
+            try:
+                expected = bytes.fromhex(checksum)
+            except ValueError:
+                raise PartChecksumError(f"分片 {part_number} 校验值格式错误")
+            if expected != digest:
+                raise PartChecksumError(f"分片 {part_number} 校验失败")
+            digest = expected
+        content_md5 = base64.b64encode(digest).decode()
+        async with self._get_client() as client:
+            response = await client.upload_part(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=data,
+                ContentMD5=content_md5,
+            )
+            return response["ETag"].strip('"')
+
+    async def complete_multipart(
+        self, key: str, upload_id: str, parts: list[tuple[int, str]]
+    ) -> str:
+        """合并S3分片 返回对象ETag(形如 md5-分片数)"""
+        async with self._get_client() as client:
+            response = await client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={
+                    "Parts": [
+                        {"PartNumber": number, "ETag": f'"{etag}"'}
+                        for number, etag in parts
+                    ]
+                },
+            )
+            return response["ETag"].strip('"')
+
+    async def abort_multipart(self, key: str, upload_id: str) -> None:
+        """取消S3分片上传"""
+        async with self._get_client() as client:
+            await client.abort_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id
+            )
+
     async def exists(self, key: str) -> bool:
         """检查S3对象是否存在"""
         async with self._get_client() as client:
@@ -121,6 +377,27 @@ class S3StorageInterface(StorageInterface):
             except Exception as e:
                 raise e
     
+    async def list_page(
+        self,
+        prefix: str = "",
+        start_after: str | None = None,
+        max_keys: int = LIST_MAX_KEYS,
+    ) -> ListPage:
+        """单次 list_objects_v2 请求 MaxKeys 上限 1000"""
+        if not 1 <= max_keys <= LIST_MAX_KEYS:
+            raise ValueError(f"max_keys 需在 1 ~ {LIST_MAX_KEYS} 之间: {max_keys}")
+        params = {"Bucket": self.bucket, "Prefix": prefix, "MaxKeys": max_keys}
+        if start_after:
+            params["StartAfter"] = start_after
+        async with self._get_client() as client:
+            response = await client.list_objects_v2(**params)
+        keys = [obj["Key"] for obj in response.get("Contents", [])]
+        return ListPage(
+            keys=keys,
+            is_truncated=response.get("IsTruncated", False),
+            next_start_after=keys[-1] if response.get("IsTruncated") and keys else None,
+        )
+
     async def generate_presigned_url(self, key: str, method: str = 'put', expiration: int = 3600) -> str | None:
         """生成预签名URL"""
         async with self._get_client() as client:
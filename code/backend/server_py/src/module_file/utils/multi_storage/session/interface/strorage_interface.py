@@ -1,11 +1,20 @@
 from abc import ABC, abstractmethod
 from typing import Protocol, AsyncIterator
 import io
+from module_file.utils.multi_storage.do.list_page import ListPage, LIST_MAX_KEYS
+
+
+class PartChecksumError(ValueError):
+    """分片内容与客户端提供的MD5不一致(分片未提交 已上传的同号分片保持不变)"""
 
 
 class StorageInterface(Protocol):
     """存储接口定义"""
     
+    def object_key(self, directory: str, name: str) -> str:
+        """按存储布局生成对象键(本地存储可按哈希前缀分目录)"""
+        ...
+
     async def save(self, key: str, data: bytes | io.IOBase | AsyncIterator[bytes]) -> str:
         """保存数据到存储中"""
         ...
@@ -13,11 +22,53 @@ class StorageInterface(Protocol):
     async def load(self, key: str) -> bytes:
         """从存储中加载数据"""
         ...
+
+    def stream(
+        self, key: str, start: int = 0, end: int | None = None
+    ) -> AsyncIterator[bytes]:
+        """流式读取数据 [start, end] 闭区间(同 HTTP Range) end 为 None 表示读到末尾"""
+        ...
         
     async def delete(self, key: str) -> bool:
         """删除指定键的数据"""
         ...
+
+    async def delete_many(self, keys: list[str]) -> dict[str, str | None]:
+        """批量删除 返回 {键: 错误信息} 成功(含不存在)为 None"""
+        ...
+
+    async def move(self, src_key: str, dst_key: str) -> str:
+        """将数据从临时键原子提交到目标键"""
+        ...
         
+    async def create_multipart(self, key: str) -> str:
+        """创建分片上传 返回 upload_id"""
+        ...
+
+    async def upload_part(
+        self,
+        key: str,
+        upload_id: str,
+        part_number: int,
+        data: bytes | AsyncIterator[bytes],
+        checksum: str | None = None,
+    ) -> str:
+        """
+        上传单个分片(可并行 重复上传覆盖) 返回分片 ETag
+        提供 checksum(MD5十六进制)时先校验再提交 不一致抛出 PartChecksumError
+        """
+        ...
+
+    async def complete_multipart(
+        self, key: str, upload_id: str, parts: list[tuple[int, str]]
+    ) -> str:
+        """按 (分片号, ETag) 顺序合并分片 返回对象 ETag"""
+        ...
+
+    async def abort_multipart(self, key: str, upload_id: str) -> None:
+        """取消分片上传并清理已上传分片"""
+        ...
+
     async def exists(self, key: str) -> bool:
         """检查键是否存在"""
         ...
@@ -29,6 +80,15 @@ class StorageInterface(Protocol):
     async def list(self, prefix: str = "") -> list[str]:
         """列出指定前缀的所有键"""
         ...
+
+    async def list_page(
+        self,
+        prefix: str = "",
+        start_after: str | None = None,
+        max_keys: int = LIST_MAX_KEYS,
+    ) -> ListPage:
+        """分页列出指定前缀的键(按字典序 从 start_after 之后开始 最多 max_keys 个)"""
+        ...
     
     async def generate_presigned_url(self, key: str, method: str = 'put', expiration: int = 3600) -> str | None:
         """生成预签名URL"""
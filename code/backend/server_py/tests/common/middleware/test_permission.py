@@ -0,0 +1,88 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from common.middleware.permission import PermissionMiddleware, RouteLevel
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class User:
+    def __init__(self, id):
+        self.id = id
+
+
+async def resolve_principal(token: str):
+    if token != "good":
+        raise ValueError("Invalid token")
+    return User("u1")
+
+
+async def check_permission(user, obj, act):
+    return (user.id, obj, act) == ("u1", "/sub/items/{item_id}", "GET")
+
+
+def create_app():
+    app = FastAPI()
+    sub_app = FastAPI()
+
+    @app.get("/public/ping")
+    async def ping():
+        return "pong"
+
+    @app.get("/me")
+    async def me(request: Request):
+        return request.state.user.id
+
+    @sub_app.get("/items/{item_id}")
+    async def get_item(item_id: str, request: Request):
+        return {"item_id": item_id, "user": request.state.user.id}
+
+    @sub_app.delete("/items/{item_id}")
+    async def delete_item(item_id: str):
+        return item_id
+
+    app.mount("/sub", sub_app)
+    app.add_middleware(
+        PermissionMiddleware,
+        resolve_principal=resolve_principal,
+        check_permission=check_permission,
+        public_paths=["/public"],
+        login_paths=["/me"],
+    )
+    return app
+
+
+def test_permission_middleware():
+    """测试路由级权限中间件"""
+    with TestClient(create_app()) as client:
+        # 免登录
+        assert client.get("/public/ping").json() == "pong"
+        # 未登录
+        assert client.get("/me").status_code == 401
+        assert client.get("/me", headers={"Authorization": "Bearer bad"}).status_code == 401
+        # 仅需登录
+        headers = {"Authorization": "Bearer good"}
+        assert client.get("/me", headers=headers).json() == "u1"
+        # mount子应用 路径参数路由 casbin通过
+        response = client.get("/sub/items/1", headers=headers)
+        assert response.json() == {"item_id": "1", "user": "u1"}
+        # casbin拒绝
+        assert client.delete("/sub/items/1", headers=headers).status_code == 403
+        # 未注册路由交给应用处理
+        assert client.get("/unknown", headers=headers).status_code == 404
+
+
+def test_route_table_match():
+    """测试路由表预计算"""
+    app = create_app()
+    with TestClient(app):
+        middleware = app.middleware_stack
+        while not isinstance(middleware, PermissionMiddleware):
+            middleware = middleware.app
+        table = middleware.table
+        assert table.match("GET", "/public/ping").level == RouteLevel.public
+        assert table.match("HEAD", "/me").level == RouteLevel.login
+        rule = table.match("DELETE", "/sub/items/abc")
+        assert rule.code == "/sub/items/{item_id}"
+        assert rule.level == RouteLevel.permission
+        assert table.match("POST", "/sub/items/abc") is None
@@ -0,0 +1,29 @@
+import pytest
+from common.utils.fastapiEX.http_range import (
+    parse_range,
+    etag_matches,
+    RangeNotSatisfiable,
+)
+
+
+def test_parse_range():
+    """测试 Range 请求头解析"""
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-1000", 100) == (50, 99)
+    # 多段范围/非法格式 按整体返回
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("items=0-1", 100) is None
+    assert parse_range("bytes=5-1", 100) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=100-", 100)
+
+
+def test_etag_matches():
+    """测试 If-None-Match 匹配"""
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
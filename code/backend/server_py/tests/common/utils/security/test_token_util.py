@@ -0,0 +1,99 @@
+import os
+import time
+import jwt
+import pytest
+from common.utils.security.key_ring import KeyRing
+from common.utils.security.token_util import TokenConfig, TokenUtil, TokenType
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def age(path, seconds: float):
+    """把密钥文件的创建时间(mtime)提前"""
+    past = time.time() - seconds - 1
+    os.utime(path, (past, past))
+
+
+@pytest.mark.parametrize("algorithm", ["ES256", "EdDSA"])
+def test_asymmetric_token(tmp_path, algorithm):
+    """测试非对称签名 kid 与密钥轮换"""
+    config = TokenConfig(secret="unused", algorithm=algorithm, key_retain=2)
+    key_ring = KeyRing(tmp_path, algorithm=algorithm, retain=2)
+    token_util = TokenUtil(config, key_ring)
+
+    token_old = token_util.create_token("u1", TokenType.access)
+    kid_old = jwt.get_unverified_header(token_old)["kid"]
+    assert token_util.verify_token(token_old)["sub"] == "u1"
+
+    # 轮换后旧令牌仍可验证, 新令牌使用新kid
+    key_ring.rotate()
+    token_new = token_util.create_token("u2", TokenType.access)
+    assert jwt.get_unverified_header(token_new)["kid"] != kid_old
+    assert token_util.verify_token(token_old)["sub"] == "u1"
+    assert token_util.verify_token(token_new)["sub"] == "u2"
+    assert len(key_ring.jwks()["keys"]) == 2
+
+    # 超出保留数量 但仍可能在用的新密钥不清理
+    key_ring.rotate()
+    assert len(key_ring.jwks()["keys"]) == 3
+
+    # 超出保留数量且超过 轮换周期 + 令牌有效期 的旧密钥被清理
+    age(tmp_path / f"{kid_old}.pem", key_ring.min_key_age)
+    key_ring.load()
+    key_ring.rotate()
+    assert {k["kid"] for k in key_ring.jwks()["keys"]}.isdisjoint({kid_old})
+    with pytest.raises(Exception):
+        token_util.verify_token(token_old)
+
+    # 其他进程(同目录)可直接加载并验签
+    other = TokenUtil(config, KeyRing(tmp_path, algorithm=algorithm, retain=2))
+    assert other.verify_token(token_new)["sub"] == "u2"
+
+
+def test_jwks_local_verify(tmp_path):
+    """测试边缘服务使用JWKS本地验签"""
+    config = TokenConfig(secret="unused", algorithm="ES256")
+    key_ring = KeyRing(tmp_path, algorithm="ES256")
+    token = TokenUtil(config, key_ring).create_token("u1")
+
+    jwk_set = jwt.PyJWKSet.from_dict(key_ring.jwks())
+    kid = jwt.get_unverified_header(token)["kid"]
+    payload = jwt.decode(token, jwk_set[kid].key, algorithms=["ES256"])
+    assert payload["sub"] == "u1"
+
+
+def test_jwks_reloads_keys_rotated_by_other_process(tmp_path):
+    """测试其他进程轮换后 未签名的进程限频重新加载 JWKS 包含新 kid"""
+    publisher = KeyRing(tmp_path, algorithm="ES256")
+    kids = {k["kid"] for k in publisher.jwks()["keys"]}
+    rotator = KeyRing(tmp_path, algorithm="ES256")
+    kid_new = rotator.rotate()
+    # 限频间隔内使用缓存
+    assert {k["kid"] for k in publisher.jwks()["keys"]} == kids
+    publisher._reload_at -= publisher._reload_interval
+    assert {k["kid"] for k in publisher.jwks()["keys"]} == kids | {kid_new}
+    # 密钥未变化时重新加载保留缓存
+    jwks = publisher.jwks()
+    publisher._reload_at -= publisher._reload_interval
+    assert publisher.jwks() is jwks
+
+
+def test_rotation_serialized_across_processes(tmp_path):
+    """测试多个进程(同目录)同时到期只生成一把新密钥 均使用新密钥签名"""
+    workers = [
+        KeyRing(tmp_path, algorithm="ES256", retain=1, token_ttl_seconds=3600)
+        for _ in range(3)
+    ]
+    assert len(list(tmp_path.glob("*.pem"))) == 1
+    kid_old = workers[0].signing_key()[0]
+
+    age(tmp_path / f"{kid_old}.pem", workers[0].rotate_seconds)
+    for worker in workers:
+        worker.load()
+    kids = {worker.signing_key()[0] for worker in workers}
+    assert len(kids) == 1 and kid_old not in kids
+    # 旧密钥超出保留数量 但未超过 轮换周期 + 令牌有效期 仍保留用于验签
+    assert len(list(tmp_path.glob("*.pem"))) == 2
+    assert workers[1].verifying_key(kid_old) is not None
+    assert not (tmp_path / ".rotate.lock").exists()
@@ -7,6 +7,7 @@ from common.utils.log.CustomTimedRotatingFileHandler import (
     CustomTimedRotatingFileHandler,
 )
 import datetime
+import pytest_asyncio
 """
 conftest.py pytest 默认测试配置文件
 所有同目录测试文件运行前都会执行conftest.py文件 不需要import导入
@@ -98,3 +99,31 @@ def setup_logging():
 # 立即配置日志系统
 setup_logging()
 logger = logging.getLogger(__name__)
+
+
+@pytest_asyncio.fixture
+async def sqlite_dao(tmp_path):
+    """
+    DAO 事务(DaoRel)改用临时 sqlite 库 不依赖配置的数据库
+    建立已导入的全部表模型 测试结束恢复原会话工厂
+    :yield: sqlite 会话工厂(测试中直接查询/构造数据)
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlmodel import SQLModel
+    from sqlmodel.ext.asyncio.session import AsyncSession
+    from common.config.db import DaoRel
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    transactional = DaoRel.__self__
+    original = transactional.session_factory
+    transactional.session_factory = sessionmaker(
+        engine, expire_on_commit=False, class_=AsyncSession
+    )
+    try:
+        yield transactional.session_factory
+    finally:
+        transactional.session_factory = original
+        await engine.dispose()
@@ -0,0 +1,28 @@
+import cv2
+import numpy as np
+from module_ai.utils.onnx.ocr_rapid.rapidocr.crop import get_crop_img_list, get_rotate_crop_image
+
+
+def test_axis_aligned_crop_matches_perspective_warp():
+    """测试轴对齐文本框切片结果与透视变换一致"""
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 255, (200, 300, 3), dtype=np.uint8)
+    box = np.float32([[10, 20], [210, 20], [210, 60], [10, 60]])
+    transform = cv2.getPerspectiveTransform(box, np.float32([[0, 0], [200, 0], [200, 40], [0, 40]]))
+    expected = cv2.warpPerspective(
+        img, transform, (200, 40), borderMode=cv2.BORDER_REPLICATE, flags=cv2.INTER_LINEAR
+    )
+    assert np.array_equal(get_rotate_crop_image(img, box), expected)
+
+
+def test_crop_does_not_modify_boxes():
+    """测试重试参数扩展不修改原文本框 旋转框走透视变换"""
+    img = np.full((200, 300, 3), 128, dtype=np.uint8)
+    box = np.float32([[10, 20], [210, 20], [210, 60], [10, 60]])
+    rotated = np.float32([[10, 40], [200, 10], [206, 50], [16, 80]])
+    original = [box.copy(), rotated.copy()]
+    crops = get_crop_img_list(img, [box, rotated], [0.1, 0.05, 0.02, 0.02])
+    assert all(np.array_equal(a, b) for a, b in zip(original, [box, rotated]))
+    # 框高 40: x 扩展到 [6.8, 215.6] y 扩展到 [18, 62] 留白 int(0.8) = 0
+    assert crops[0].shape == (44, 209, 3)
+    assert crops[1].shape[2] == 3
@@ -0,0 +1,30 @@
+from pathlib import Path
+
+import numpy as np
+from module_ai.utils.onnx.ocr_rapid.rapidocr.detect_process import DBPostProcess
+
+# tools/benchmark/bench_db_postprocess.py --lines 150 --size 640 --save-fixture 生成(旧实现结果)
+FIXTURE = Path(__file__).parent / "fixtures" / "db_postprocess.npz"
+
+
+def run(post: DBPostProcess):
+    data = np.load(FIXTURE)
+    pred = data["pred"].astype(np.float32) / 255
+    boxes, scores = post.boxes_from_bitmap(pred, pred > post.thresh, *data["dest"])
+    return data, boxes, scores
+
+
+def test_polygon_unclip_matches_legacy_exactly():
+    """测试整批打分 + 多边形外扩(fast_unclip=False)与旧实现结果完全一致"""
+    data, boxes, scores = run(DBPostProcess(0.3, 0.5, unclip_ratio=1.6, fast_unclip=False))
+    np.testing.assert_array_equal(boxes, data["boxes"])
+    np.testing.assert_allclose(scores, data["scores"], rtol=1e-9)
+
+
+def test_rect_unclip_matches_legacy_within_rounding():
+    """测试矩形闭式外扩 与 pyclipper 整数坐标外扩相差不超过 2 像素(概率图尺度)"""
+    data, boxes, scores = run(DBPostProcess(0.3, 0.5, unclip_ratio=1.6))
+    assert boxes.shape == data["boxes"].shape
+    np.testing.assert_allclose(scores, data["scores"], rtol=1e-9)
+    scale = data["dest"][0] / data["pred"].shape[1]
+    assert np.abs(boxes.astype(int) - data["boxes"].astype(int)).max() <= 2 * scale
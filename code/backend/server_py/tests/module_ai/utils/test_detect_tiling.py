@@ -0,0 +1,33 @@
+import numpy as np
+from module_ai.utils.onnx.ocr_rapid.rapidocr.detect_process import merge_tile_boxes, tile_grid
+
+
+def rect(x0, y0, x1, y1):
+    return np.float32([[x0, y0], [x1, y0], [x1, y1], [x0, y1]])
+
+
+def test_tile_grid_covers_image_with_overlap():
+    """测试分块覆盖整图 相邻分块按配置重叠 最后一块贴齐边缘"""
+    tiles = tile_grid(3000, 5000, 2048, 256)
+    xs = sorted({x0 for x0, _, _, _ in tiles})
+    assert xs == [0, 1792, 2952]
+    assert max(x1 for _, _, x1, _ in tiles) == 5000
+    assert max(y1 for _, _, _, y1 in tiles) == 3000
+    assert tile_grid(100, 200, 2048, 256) == [(0, 0, 200, 100)]
+
+
+def test_merge_tile_boxes_joins_seams_and_drops_duplicates():
+    """测试接缝截断的文本行合并 重叠区重复检测只保留一个"""
+    boxes = [
+        rect(100, 500, 2047, 530),  # 左块 截断在右边缘
+        rect(1792, 501, 3000, 531),  # 右块 截断在左边缘
+        rect(1850, 800, 1950, 830),  # 重叠区内的词 左块
+        rect(1851, 800, 1950, 831),  # 重叠区内的词 右块
+        rect(100, 900, 400, 930),  # 其他行
+    ]
+    cut_flags = [True, True, False, False, False]
+    merged = merge_tile_boxes(boxes, cut_flags)
+    assert len(merged) == 3
+    line = max(merged, key=lambda box: np.ptp(box[:, 0]))
+    assert np.isclose(line[:, 0].min(), 100, atol=1)
+    assert np.isclose(line[:, 0].max(), 3000, atol=1)
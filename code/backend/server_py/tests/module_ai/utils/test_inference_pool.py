@@ -0,0 +1,24 @@
+import asyncio
+import threading
+import pytest
+from module_ai.utils.onnx.inference_pool import InferencePool, InferencePoolBusy
+
+
+@pytest.mark.asyncio
+async def test_inference_pool_rejects_when_saturated():
+    """测试执行中 + 排队 达到上限后拒绝 名额在任务完成后释放"""
+    pool = InferencePool(max_workers=1, max_queue=1, name="test")
+    release = threading.Event()
+    running = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    with pytest.raises(InferencePoolBusy):
+        await pool.run(release.wait)
+    release.set()
+    results = await asyncio.gather(*running)
+    assert [result for result, _ in results] == [True, True]
+    # 排队的任务等待时间不为0
+    assert results[1][1] > 0
+    stats = pool.stats()
+    assert (stats["pending"], stats["completed"], stats["rejected"]) == (0, 2, 1)
+    assert (await pool.run(sum, [1, 2]))[0] == 3
+    await pool.shutdown()
@@ -0,0 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from module_ai.utils.onnx.micro_batcher import MicroBatcher
+
+
+def test_micro_batcher_merges_requests_by_key():
+    """测试多个线程提交的样本按分组键合并推理 结果按提交顺序返回"""
+    batches = []
+
+    def run_batch(key, samples):
+        batches.append((key, len(samples)))
+        return [f"{key}:{sample}" for sample in samples]
+
+    batcher = MicroBatcher(run_batch, max_batch=4, max_wait_ms=50)
+    requests = [[("a", i), ("b", i)] for i in range(4)]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(batcher.submit, requests))
+    assert results == [[f"a:{i}", f"b:{i}"] for i in range(4)]
+    # 8 个样本 2 个分组 每组最多 4 个 合并后少于逐请求推理的 8 次
+    assert sum(size for _, size in batches) == 8
+    assert len(batches) < 8
+    assert all(size <= 4 for _, size in batches)
+
+
+def test_micro_batcher_propagates_errors():
+    """测试批推理异常传递给提交线程 调度线程继续工作"""
+
+    def run_batch(key, samples):
+        if key == "bad":
+            raise ValueError("boom")
+        return samples
+
+    batcher = MicroBatcher(run_batch, max_batch=2, max_wait_ms=1)
+    with pytest.raises(ValueError):
+        batcher.submit([("bad", 1)])
+    assert batcher.submit([("ok", 1), ("ok", 2)]) == [1, 2]
@@ -0,0 +1,83 @@
+import pytest
+from common.config.index import conf
+
+if not conf.get("ocr"):
+    pytest.skip("未配置ocr(识别模块需要 ocr 配置)", allow_module_level=True)
+
+from module_ai.do.ocr import RetryPolicy
+from module_ai.utils.onnx.ocr_rapid.rapidocr import rapid_ocr_api
+from module_ai.utils.onnx.ocr_rapid.rapidocr.rapid_ocr_api import RapidOCR, RetryStats
+
+
+@pytest.fixture
+def ocr(monkeypatch):
+    """不加载模型的 RapidOCR: 文本框即行号 按 (行号, 参数组序号) 返回脚本化的识别结果"""
+    monkeypatch.setattr(rapid_ocr_api, "retry_stats", RetryStats())
+    instance = RapidOCR.__new__(RapidOCR)
+    instance.text_recognizer_params = [[0.0, 0.0, 0.0, float(i)] for i in range(3)]
+    instance.scores = {}
+    instance.calls = []
+    monkeypatch.setattr(
+        rapid_ocr_api,
+        "get_crop_img_list",
+        lambda img, boxes, params: [(box, int(params[3])) for box in boxes],
+    )
+    instance.text_cls = lambda crops: (crops, None)
+
+    def recognize(crops):
+        instance.calls.append([line for line, _ in crops])
+        return [(f"{line}-{variant}", instance.scores[line][variant]) for line, variant in crops]
+
+    instance.text_recognizer = recognize
+    return instance
+
+
+def test_retry_lowest_first_with_budget_and_early_exit(ocr):
+    """测试置信度最低的行优先重试 超出预算的行跳过 全部达到目标后提前结束 统计命中率"""
+    recog_result = [("a", 0.99), ("b", 0.5), ("c", 0.9), ("d", 0.6), ("e", 0.95)]
+    ocr.scores = {1: [0.995, 0, 0], 2: [0.92, 0.991, 0], 3: [0.55, 0.999, 0]}
+    policy = RetryPolicy(threshold=0.97, target=0.99, max_lines=3, variants=3)
+    ocr.retry_text_recognizer(None, list(range(5)), recog_result, policy)
+
+    # 第一组参数重试最低的 3 行(e 超出预算) 第二组只重试未达到目标的行 之后提前结束
+    assert ocr.calls == [[1, 3, 2], [3, 2]]
+    assert recog_result == [("a", 0.99), ("1-0", 0.995), ("2-1", 0.991), ("3-1", 0.999), ("e", 0.95)]
+    stats = rapid_ocr_api.retry_stats.snapshot()
+    assert stats == {
+        "requests": 1,
+        "retry_requests": 1,
+        "low_lines": 4,
+        "retried_lines": 3,
+        "skipped_lines": 1,
+        "improved_lines": 3,
+        "reached_lines": 3,
+        "variant_runs": 2,
+        "early_exits": 1,
+        "hit_rate": 1.0,
+    }
+
+
+def test_retry_variants_cap_and_no_improvement(ocr):
+    """测试参数组数量上限 未提高的行保留原结果 不计入命中"""
+    ocr.scores = {0: [0.8, 0.9, 0.2], 1: [0.1, 0.2, 0.3]}
+    recog_result = [("a", 0.5), ("b", 0.4)]
+    ocr.retry_text_recognizer(None, [0, 1], recog_result, RetryPolicy(variants=2))
+    assert ocr.calls == [[1, 0], [1, 0]]
+    assert recog_result == [("0-1", 0.9), ("b", 0.4)]
+
+    # 不重试: 没有低置信度行 / 预算为0 / 参数组为0
+    ocr.retry_text_recognizer(None, [0], [("a", 0.98)], RetryPolicy())
+    ocr.retry_text_recognizer(None, [0], [("a", 0.5)], RetryPolicy(max_lines=0))
+    ocr.retry_text_recognizer(None, [0], [("a", 0.5)], RetryPolicy(variants=0))
+    assert len(ocr.calls) == 2
+
+    stats = rapid_ocr_api.retry_stats.snapshot()
+    assert stats["requests"] == 4
+    assert stats["retry_requests"] == 1
+    assert stats["low_lines"] == 4
+    assert stats["skipped_lines"] == 1
+    assert stats["retried_lines"] == 2
+    assert stats["variant_runs"] == 2
+    assert stats["early_exits"] == 0
+    assert stats["improved_lines"] == 1 and stats["reached_lines"] == 0
+    assert stats["hit_rate"] == 0.5
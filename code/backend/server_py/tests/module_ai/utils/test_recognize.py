@@ -0,0 +1,73 @@
+import threading
+import numpy as np
+import pytest
+from common.utils.media.FileFormat import resize_norm_img
+from common.config.index import conf
+
+if not conf.get("ocr"):
+    pytest.skip("未配置ocr(识别模块需要 ocr 配置)", allow_module_level=True)
+
+from module_ai.utils.onnx.ocr_rapid.rapidocr.recognize import TextRecognizer
+
+
+def make_recognizer(bucket_batch: dict[int, int] | None = None) -> TextRecognizer:
+    """不加载模型的识别器(只测试预处理与分桶)"""
+    recognizer = TextRecognizer.__new__(TextRecognizer)
+    recognizer.rec_image_shape = [3, 48, 320]
+    recognizer.rec_batch_num = 1
+    recognizer.bucket_widths = [128, 256, 512]
+    recognizer.width_step = 64
+    recognizer.max_batch_width = 8192
+    recognizer.bucket_batch = bucket_batch or {}
+    recognizer._buffers = threading.local()
+    recognizer.batcher = None
+    return recognizer
+
+
+def make_line(h: int, w: int, seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("shape", [(32, 100), (48, 300), (20, 457), (64, 40), (31, 2000)])
+def test_norm_into_matches_resize_norm_img(shape):
+    """测试写入张量的归一化结果与 resize_norm_img(以文本行自身宽度为目标宽度)逐位一致 桶宽剩余部分补0"""
+    recognizer = make_recognizer()
+    img = make_line(*shape, seed=shape[1])
+    width = recognizer.norm_width(img)
+    bucket = recognizer.bucket_width(width)
+    assert bucket >= width
+    out = np.full((3, 48, bucket), np.nan, dtype=np.float32)
+    recognizer._norm_into(img, out)
+    expected = resize_norm_img(img, width, 48, 3)
+    assert np.array_equal(out[:, :, :width], expected)
+    assert not out[:, :, width:].any()
+
+
+def test_bucket_width_rounds_up():
+    """测试宽度向上取整到桶宽 超过最大桶按步长取整"""
+    recognizer = make_recognizer()
+    assert [recognizer.bucket_width(w) for w in (1, 128, 129, 512, 513, 600)] == [
+        128, 128, 256, 512, 576, 640,
+    ]
+
+
+def test_recognize_buckets_keep_input_order():
+    """测试按宽度分桶、桶内分批后结果仍按输入顺序返回 输入张量按桶复用"""
+    recognizer = make_recognizer({128: 2})
+    widths = [60, 300, 100, 20, 600, 90, 250, 40]
+    img_list = [np.full((32, w, 3), i * 10, dtype=np.uint8) for i, w in enumerate(widths)]
+    batches = []
+
+    def infer(norm_img_batch: np.ndarray) -> list:
+        batches.append(norm_img_batch.shape)
+        # 以第一个像素还原图像序号
+        return [(str(round((row[0, 0, 0] * 0.5 + 0.5) * 25.5)), 1.0) for row in norm_img_batch]
+
+    recognizer._infer = infer
+    result = recognizer(img_list)
+    assert [text for text, _ in result] == [str(i) for i in range(len(widths))]
+    # 128 桶 5 条(批大小 2 -> 3 批) 256/512/640 桶各 1 批
+    assert sorted(batches) == sorted(
+        [(2, 3, 48, 128), (2, 3, 48, 128), (1, 3, 48, 128), (1, 3, 48, 512), (1, 3, 48, 256), (1, 3, 48, 640)]
+    )
+    assert recognizer._input_buffer(128, 2).base is recognizer._input_buffer(128, 1).base
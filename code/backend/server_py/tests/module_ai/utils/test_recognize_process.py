@@ -0,0 +1,28 @@
+import numpy as np
+from module_ai.utils.onnx.ocr_rapid.rapidocr.recognize_process import CTCLabelDecode
+
+
+def test_ctc_decode_removes_blanks_and_repeats():
+    """测试整批解码: 去除空白符和连续重复 平均置信度只统计保留的时间步"""
+    decoder = CTCLabelDecode(["a", "b", "c"])
+    # 0 空白符 1 a 2 b 3 c 4 空格
+    preds_idx = np.array([[1, 1, 0, 1, 2, 2, 4], [0, 0, 0, 0, 0, 0, 0], [3, 0, 3, 3, 0, 0, 2]])
+    preds_prob = np.array(
+        [[0.9, 0.5, 0.1, 0.7, 0.8, 0.2, 0.6], [0.1] * 7, [0.4, 0.1, 0.8, 0.3, 0.1, 0.1, 0.6]],
+        dtype=np.float32,
+    )
+    result = decoder.decode(preds_idx, preds_prob, is_remove_duplicate=True)
+    assert [text for text, _ in result] == ["aab ", "", "ccb"]
+    assert np.allclose([score for _, score in result], [0.75, 0, 0.6])
+    # 不去重时保留连续重复
+    assert decoder.decode(preds_idx[:1])[0] == ("aaabb ", 1.0)
+
+
+def test_ctc_decode_call_matches_argmax():
+    """测试 __call__ 取每个时间步概率最大的字符"""
+    decoder = CTCLabelDecode(["a", "b"])
+    preds = np.zeros((1, 4, 4), dtype=np.float32)
+    preds[0, np.arange(4), [1, 0, 2, 2]] = [0.8, 0.9, 0.6, 0.4]
+    text, score = decoder(preds)[0]
+    assert text == "ab"
+    assert np.isclose(score, 0.7)
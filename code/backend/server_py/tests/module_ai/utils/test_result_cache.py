@@ -0,0 +1,50 @@
+import json
+
+import numpy as np
+from module_ai.utils.result_cache import ResultCache
+
+
+def test_make_key_depends_on_pixels_and_params():
+    """测试缓存键 像素或参数不同则不同 参数顺序无关"""
+    image = np.zeros((4, 6, 3), np.uint8)
+    key = ResultCache.make_key(image, lang="ch", detect=True)
+    assert key == ResultCache.make_key(image.copy(), detect=True, lang="ch")
+    assert key != ResultCache.make_key(image, lang="ja", detect=True)
+    changed = image.copy()
+    changed[0, 0, 0] = 1
+    assert key != ResultCache.make_key(changed, lang="ch", detect=True)
+    assert key != ResultCache.make_key(image.reshape(6, 4, 3), lang="ch", detect=True)
+
+
+def test_get_returns_copy_and_evicts_least_recently_used(tmp_path):
+    """测试命中返回新对象 超过大小上限淘汰最久未访问的条目 重启后从磁盘恢复"""
+    value = {"results": [{"text": "x" * 100}], "ts": {"total": 1.0}}
+    size = len(json.dumps({**value, "__images__": []}, ensure_ascii=False).encode())
+    cache = ResultCache(tmp_path, max_bytes=size * 2, memory_items=1)
+    cache.put("a" * 64, value)
+    cache.put("b" * 64, value)
+    hit = cache.get("a" * 64)
+    assert hit == value
+    hit["ts"]["total"] = 2.0
+    assert cache.get("a" * 64)["ts"]["total"] == 1.0
+
+    cache.put("c" * 64, value)  # 淘汰 b(最久未访问)
+    assert cache.get("b" * 64) is None
+    assert cache.stats()["evictions"] == 1
+
+    reopened = ResultCache(tmp_path, max_bytes=size * 2, memory_items=0)
+    assert reopened.stats()["items"] == 2
+    assert reopened.get("c" * 64) == value
+
+
+def test_image_field_stored_as_png(tmp_path):
+    """测试顶层图像字段存为 PNG 读取后像素一致 缓存目录中没有 pickle 数据"""
+    image = np.random.default_rng(0).integers(0, 255, (8, 10, 3), dtype=np.uint8)
+    value = {"results": [{"score": np.float32(0.5)}], "background": image}
+    cache = ResultCache(tmp_path, max_bytes=1024 * 1024, memory_items=0)
+    key = "d" * 64
+    cache.put(key, value)
+    assert sorted(p.name for p in (tmp_path / "dd").iterdir()) == [f"{key}.background.png", f"{key}.json"]
+    hit = cache.get(key)
+    assert hit["results"] == [{"score": 0.5}]
+    assert np.array_equal(hit["background"], image)
@@ -0,0 +1,38 @@
+import cv2
+import numpy as np
+import pytest
+from module_ai.do.ocr import InpaintMode
+from module_ai.utils.onnx.ocr_rapid.text_inpaint.simple_cv import mask_from_boxs, simple_inpaint
+
+
+@pytest.fixture
+def page():
+    img = np.full((240, 320, 3), (200, 180, 160), dtype=np.uint8)
+    img[:, 160:] = (90, 120, 150)
+    boxes = [
+        np.float32([[20, 20], [140, 20], [140, 44], [20, 44]]),
+        np.float32([[30, 50], [300, 50], [300, 74], [30, 74]]),
+        np.float32([[40, 150], [280, 150], [280, 220], [40, 220]]),
+    ]
+    for box in boxes:
+        cv2.putText(img, "text", (int(box[0][0]), int(box[2][1]) - 4), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 2)
+    return img, boxes
+
+
+def test_ns_by_region_matches_full_image(page):
+    """测试按区域修复与整图修复一致 且不修改原图"""
+    img, boxes = page
+    original = img.copy()
+    expected = cv2.inpaint(img, mask_from_boxs(img, boxes), 3, cv2.INPAINT_NS)
+    assert np.array_equal(simple_inpaint(img, boxes), expected)
+    assert np.array_equal(img, original)
+
+
+@pytest.mark.parametrize("mode", [InpaintMode.TELEA, InpaintMode.FILL])
+def test_fast_modes_only_touch_boxes(page, mode):
+    """测试快速模式只修改文字框内像素 文字被去除"""
+    img, boxes = page
+    mask = mask_from_boxs(img, boxes) > 0
+    res = simple_inpaint(img, boxes, mode)
+    assert np.array_equal(res[~mask], img[~mask])
+    assert (res[mask] < 40).all(axis=1).sum() < (img[mask] < 40).all(axis=1).sum() * 0.1
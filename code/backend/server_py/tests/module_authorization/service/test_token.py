@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import jwt
+import pytest
+from sqlmodel import select
+from common.utils.security.token_util import TokenType
+from module_authorization.dao.token import TokenDao
+from module_authorization.do.token import Token, TokenCreate, TokenCreateRequest
+from module_authorization.service.auth import AuthService
+from module_authorization.service.token import TokenService
+from module_authorization.service.token_sweeper import TokenSweeper
+
+
+async def create_refresh(service: TokenService, user_id: str = "u1"):
+    return await service.create_token(
+        TokenCreateRequest(user_id=user_id, token_type=TokenType.refresh)
+    )
+
+
+async def list_tokens(sqlite_dao) -> dict[str, Token]:
+    async with sqlite_dao() as session:
+        return {t.id: t for t in (await session.exec(select(Token))).all()}
+
+
+@pytest.mark.asyncio
+async def test_token_refresh_rotates_and_reuse_revokes_family(sqlite_dao):
+    """测试刷新令牌使用一次即轮换 旧令牌重放时撤销整个令牌族 其他令牌族不受影响"""
+    service = TokenService(TokenDao())
+    first = await create_refresh(service)
+    other = await create_refresh(service)
+
+    rotated = await service.token_refresh(first.token)
+    assert rotated.refresh.token_id != first.token_id
+    assert rotated.access.token_id is None
+    tokens = await list_tokens(sqlite_dao)
+    assert tokens[first.token_id].replaced_by == rotated.refresh.token_id
+    assert tokens[rotated.refresh.token_id].family_id == first.token_id
+
+    # 新令牌可以继续轮换
+    second = await service.token_refresh(rotated.refresh.token)
+    # 已轮换的令牌再次出现: 视为泄露重放 整个令牌族撤销
+    with pytest.raises(ValueError, match="already been used"):
+        await service.token_refresh(first.token)
+    tokens = await list_tokens(sqlite_dao)
+    family = [t for t in tokens.values() if t.family_id == first.token_id]
+    assert len(family) == 3 and all(t.is_revoked for t in family)
+    with pytest.raises(ValueError, match="revoked"):
+        await service.token_refresh(second.refresh.token)
+    assert not tokens[other.token_id].is_revoked
+    assert (await service.token_refresh(other.token)).refresh.token_id
+
+
+@pytest.mark.asyncio
+async def test_token_rotate_concurrent_use_only_one_succeeds(sqlite_dao):
+    """测试同一刷新令牌并发轮换(均已通过校验) 条件更新只允许一个成功 其余撤销令牌族"""
+    service = TokenService(TokenDao())
+    refresh = await create_refresh(service)
+    payload = await service.verify_token(refresh.token, TokenType.refresh)
+    rotated = await service.rotate_refresh_token(dict(payload))
+    with pytest.raises(jwt.InvalidTokenError):
+        await service.rotate_refresh_token(dict(payload))
+    tokens = await list_tokens(sqlite_dao)
+    assert tokens[refresh.token_id].replaced_by == rotated.refresh.token_id
+    assert tokens[rotated.refresh.token_id].is_revoked
+
+
+@pytest.mark.asyncio
+async def test_token_dao_mark_replaced_is_conditional(sqlite_dao):
+    """测试轮换标记为条件更新: 已标记或已撤销的令牌不能再次标记"""
+    dao = TokenDao()
+    expires_at = datetime.now(timezone.utc) + timedelta(days=1)
+    for jti in ("a", "b"):
+        await dao.save_token(
+            TokenCreate(id=jti, user_id="u1", family_id="f", expires_in=86400, expires_at=expires_at)
+        )
+    assert await dao.mark_token_replaced("a", "a2")
+    assert not await dao.mark_token_replaced("a", "a3")
+    assert (await dao.get_token_by_jti("a")).replaced_by == "a2"
+    assert await dao.revoke_tokens_by_family_id("f") == 2
+    assert not await dao.mark_token_replaced("b", "b2")
+    assert await dao.revoke_tokens_by_family_id("f") == 0
+
+
+@pytest.mark.asyncio
+async def test_token_sweeper_deletes_expired_in_batches(sqlite_dao):
+    """测试过期令牌分批清理 未过期令牌保留"""
+    dao = TokenDao()
+    now = datetime.now(timezone.utc)
+    for i in range(5):
+        await dao.save_token(
+            TokenCreate(
+                id=f"old{i}", user_id="u1", family_id="f", expires_in=1,
+                expires_at=now - timedelta(minutes=i + 1),
+            )
+        )
+    await dao.save_token(
+        TokenCreate(id="new", user_id="u1", family_id="f", expires_in=1, expires_at=now + timedelta(days=1))
+    )
+    assert await dao.delete_expired_batch(now, 2) == 2
+    assert await TokenSweeper(dao, batch_size=2).sweep_once() == 3
+    assert list(await list_tokens(sqlite_dao)) == ["new"]
+
+
+@pytest.mark.asyncio
+async def test_auth_token_refresh_checks_user(sqlite_dao):
+    """测试认证服务刷新令牌: 校验一次后轮换 禁用用户拒绝刷新"""
+    users = {"u1": SimpleNamespace(id="u1", is_active=True), "u2": SimpleNamespace(id="u2", is_active=False)}
+
+    async def get_user(user_id):
+        return users[user_id]
+
+    token_service = TokenService(TokenDao())
+    auth_service = AuthService(SimpleNamespace(get=get_user), token_service)
+    active = await create_refresh(token_service, "u1")
+    disabled = await create_refresh(token_service, "u2")
+    rotated = await auth_service.token_refresh(active.token)
+    assert token_service.token_util.verify_token(rotated.access.token)["sub"] == "u1"
+    with pytest.raises(ValueError, match="禁用"):
+        await auth_service.token_refresh(disabled.token)
+    # 被拒绝的刷新不消耗令牌
+    assert (await list_tokens(sqlite_dao))[disabled.token_id].replaced_by is None
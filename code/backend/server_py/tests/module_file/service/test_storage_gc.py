@@ -0,0 +1,106 @@
+import pytest
+from module_file.dao.filesystem import FileDao
+from module_file.dao.physical_object import PhysicalObjectDao
+from module_file.do.filesystem import FileEntryCreate
+from module_file.do.physical_object import PhysicalObject
+from module_file.service.storage_gc import StorageGcService
+from module_file.utils.multi_storage.do.storage_config import LocalStorage
+from module_file.utils.multi_storage.session.impl.storage_local import (
+    LocalStorageInterface,
+)
+
+
+@pytest.fixture
+def storage(tmp_path) -> LocalStorageInterface:
+    return LocalStorageInterface(LocalStorage(base_dir=str(tmp_path / "storage")))
+
+
+async def add_file(file_dao: FileDao, key: str) -> str:
+    return await file_dao.add(
+        FileEntryCreate(name=key, logical_path=f"/{key}", physical_storage=key)
+    )
+
+
+async def get_object(sqlite_dao, key: str) -> PhysicalObject | None:
+    async with sqlite_dao() as session:
+        return await session.get(PhysicalObject, key)
+
+
+@pytest.mark.asyncio
+async def test_file_delete_releases_shared_object(sqlite_dao):
+    """测试删除文件记录释放引用 共享对象在最后一个引用释放后才标记孤立 重新引用取消标记"""
+    file_dao = FileDao()
+    first = await add_file(file_dao, "a.bin")
+    second = await add_file(file_dao, "a.bin")
+    assert (await get_object(sqlite_dao, "a.bin")).ref_count == 2
+
+    assert await file_dao.delete(first) is None
+    obj = await get_object(sqlite_dao, "a.bin")
+    assert obj.ref_count == 1 and obj.orphaned_at is None
+    await file_dao.delete_many([second])
+    obj = await get_object(sqlite_dao, "a.bin")
+    assert obj.ref_count == 0 and obj.orphaned_at is not None
+    with pytest.raises(ValueError):
+        await file_dao.delete(first)
+
+    await add_file(file_dao, "a.bin")
+    obj = await get_object(sqlite_dao, "a.bin")
+    assert obj.ref_count == 1 and obj.orphaned_at is None
+
+
+@pytest.mark.asyncio
+async def test_storage_gc_grace_period_and_rereference(sqlite_dao, storage):
+    """测试宽限期内不回收 宽限期内重新被引用的对象保留 超过宽限期的无引用对象分批回收"""
+    file_dao = FileDao()
+    keys = [f"f{i}.bin" for i in range(5)]
+    ids = {}
+    for key in keys:
+        await storage.save(key, b"x")
+        ids[key] = await add_file(file_dao, key)
+    await file_dao.delete_many(list(ids.values()))
+
+    gc = StorageGcService(storage_interface=storage, grace_seconds=3600)
+    assert await gc.collect(batch_size=2) == 0
+    assert all([await storage.exists(key) for key in keys])
+
+    # 宽限期内去重上传命中 重新被引用
+    await add_file(file_dao, "f0.bin")
+    gc.grace_seconds = 0
+    assert await gc.collect(batch_size=2) == 4
+    assert await storage.exists("f0.bin")
+    assert (await get_object(sqlite_dao, "f0.bin")).ref_count == 1
+    for key in keys[1:]:
+        assert not await storage.exists(key)
+        assert await get_object(sqlite_dao, key) is None
+
+
+@pytest.mark.asyncio
+async def test_storage_gc_corrects_drifted_ref_count(sqlite_dao, storage):
+    """测试计数偏差: 计数归零但仍有文件记录引用的对象按实际引用数校正 不删除"""
+    await storage.save("a.bin", b"x")
+    await add_file(FileDao(), "a.bin")
+    # 模拟计数偏差(引用计数上线前的数据)
+    await PhysicalObjectDao().release(["a.bin"])
+    assert await StorageGcService(storage_interface=storage, grace_seconds=0).collect() == 0
+    assert await storage.exists("a.bin")
+    obj = await get_object(sqlite_dao, "a.bin")
+    assert obj.ref_count == 1 and obj.orphaned_at is None
+
+
+@pytest.mark.asyncio
+async def test_storage_gc_restores_failed_deletes(sqlite_dao, storage):
+    """测试物理删除失败时恢复待回收记录 下一轮重试"""
+    await PhysicalObjectDao().restore(["a.bin"])
+
+    async def fail_delete_many(keys):
+        return dict.fromkeys(keys, "storage unavailable")
+
+    gc = StorageGcService(storage_interface=storage, grace_seconds=0)
+    delete_many = storage.delete_many
+    storage.delete_many = fail_delete_many
+    assert await gc.collect() == 0
+    obj = await get_object(sqlite_dao, "a.bin")
+    assert obj.ref_count == 0 and obj.orphaned_at is not None
+    storage.delete_many = delete_many
+    assert await gc.collect() == 1
+    assert await get_object(sqlite_dao, "a.bin") is None
@@ -0,0 +1,132 @@
+from collections import Counter
+from types import SimpleNamespace
+import random
+import pytest
+from module_file.utils.multi_storage.chunk.chunk_store import ChunkStore
+from module_file.utils.multi_storage.chunk.fastcdc import FastCDC
+from module_file.utils.multi_storage.do.storage_config import LocalStorage
+from module_file.utils.multi_storage.session.impl.storage_local import (
+    LocalStorageInterface,
+)
+
+
+class MemoryChunkIndex:
+    """内存块索引(与 ChunkDao 语义一致)"""
+
+    def __init__(self):
+        self.ref_count: dict[str, int] = {}
+        self.stored: set[str] = set()
+        self.objects: dict[str, list[tuple[str, int]]] = {}
+
+    async def reserve(self, counter: Counter, sizes: dict[str, int]) -> set[str]:
+        stored = {h for h in counter if h in self.stored}
+        for h, count in counter.items():
+            self.ref_count[h] = self.ref_count.get(h, 0) + count
+        return stored
+
+    async def mark_stored(self, hashes: list[str]):
+        self.stored.update(hashes)
+
+    async def add_object(self, object_key: str, chunks: list[tuple[str, int]]):
+        self.objects[object_key] = chunks
+
+    async def list_refs(self, object_key: str) -> list:
+        refs, offset = [], 0
+        for chunk_hash, size in self.objects.get(object_key, []):
+            refs.append(SimpleNamespace(chunk_hash=chunk_hash, offset=offset, size=size))
+            offset += size
+        return refs
+
+    async def release_chunks(self, counter: Counter) -> list[str]:
+        for h, count in counter.items():
+            self.ref_count[h] -= count
+        return [h for h in counter if self.ref_count[h] <= 0]
+
+    async def remove_object(self, object_key: str) -> list[str]:
+        chunks = self.objects.pop(object_key, [])
+        return await self.release_chunks(Counter(h for h, _ in chunks)) if chunks else []
+
+    async def delete_unreferenced(self, chunk_hash: str, delete_blob) -> bool:
+        if self.ref_count.get(chunk_hash, 1) > 0:
+            return False
+        del self.ref_count[chunk_hash]
+        self.stored.discard(chunk_hash)
+        await delete_blob(chunk_hash)
+        return True
+
+
+def make_store(tmp_path) -> tuple[ChunkStore, MemoryChunkIndex, LocalStorageInterface]:
+    storage = LocalStorageInterface(LocalStorage(base_dir=str(tmp_path)))
+    index = MemoryChunkIndex()
+    chunker = FastCDC(min_size=1024, avg_size=4096, max_size=16384)
+    return ChunkStore(storage, index, chunker), index, storage
+
+
+async def iter_bytes(data: bytes, fail_at: int | None = None):
+    for i in range(0, len(data), 8192):
+        if fail_at is not None and i >= fail_at:
+            raise ConnectionError("client disconnected")
+        yield data[i : i + 8192]
+
+
+@pytest.mark.asyncio
+async def test_chunk_store_failed_put_releases_references(tmp_path):
+    """测试写入中途失败时释放已加的块引用 只被失败写入引用的块被删除 共享块保留"""
+    store, index, storage = make_store(tmp_path)
+    shared = random.Random(0).randbytes(200 * 1024)
+    await store.put("cdc://a", iter_bytes(shared))
+    before = dict(index.ref_count)
+
+    store.LOOKUP_BATCH = 4
+    data = shared + random.Random(1).randbytes(400 * 1024)
+    with pytest.raises(ConnectionError):
+        await store.put("cdc://b", iter_bytes(data, fail_at=500 * 1024))
+    assert index.ref_count == before
+    assert "cdc://b" not in index.objects
+    for chunk_hash in before:
+        assert await storage.exists(store.chunk_key(chunk_hash))
+    assert b"".join([c async for c in store.stream("cdc://a")]) == shared
+
+
+@pytest.mark.asyncio
+async def test_chunk_store_release_keeps_reacquired_chunks(tmp_path):
+    """测试释放后、删除前被其他写入重新引用的块不会被删除"""
+    store, index, storage = make_store(tmp_path)
+    data = random.Random(2).randbytes(100 * 1024)
+    await store.put("cdc://a", iter_bytes(data))
+    zero = await index.remove_object("cdc://a")
+    assert zero
+    # 其他写入在删除前重新引用了相同的块
+    await store.put("cdc://b", iter_bytes(data))
+    assert await store._collect(zero) == 0
+    assert b"".join([c async for c in store.stream("cdc://b")]) == data
+    assert await store.release("cdc://b") == len(set(zero))
+    for chunk_hash in zero:
+        assert not await storage.exists(store.chunk_key(chunk_hash))
+
+
+@pytest.mark.asyncio
+async def test_chunk_store_put_interleaved_with_release_keeps_blobs(tmp_path):
+    """测试写入新块期间 另一对象写入并释放相同的块 不会删除本次写入引用的物理块"""
+    store, index, storage = make_store(tmp_path)
+    data = random.Random(3).randbytes(100 * 1024)
+    save = storage.save
+    interleaved = False
+
+    async def save_then_interleave(key, value):
+        nonlocal interleaved
+        await save(key, value)
+        if not interleaved:
+            interleaved = True
+            # b 的第一个物理块写入后、登记完成前: a 写入相同内容后释放并回收
+            await store.put("cdc://a", iter_bytes(data))
+            await store.release("cdc://a")
+
+    storage.save = save_then_interleave
+    await store.put("cdc://b", iter_bytes(data))
+    assert interleaved
+    assert b"".join([c async for c in store.stream("cdc://b")]) == data
+    for chunk_hash, _ in index.objects["cdc://b"]:
+        assert index.ref_count[chunk_hash] > 0
+        assert chunk_hash in index.stored
+        assert await storage.exists(store.chunk_key(chunk_hash))
@@ -0,0 +1,70 @@
+import random
+import pytest
+from module_file.utils.multi_storage.chunk.fastcdc import FastCDC, HASH_BLOCK, gear_hashes
+from module_file.utils.multi_storage.chunk import fastcdc
+
+
+def reference_cut(chunker: FastCDC, data: bytes) -> int:
+    """逐字节滚动哈希的参考实现"""
+    n = len(data)
+    if n <= chunker.min_size:
+        return n
+    end = min(n, chunker.max_size)
+    normal = min(end, chunker.avg_size)
+    h = 0
+    for i in range(chunker.min_size, end):
+        h = ((h << 1) + int(fastcdc._GEAR[data[i]])) & ((1 << 64) - 1)
+        if not h & int(chunker.mask_s if i < normal else chunker.mask_l):
+            return i + 1
+    return end
+
+
+def test_gear_hashes_match_rolling_hash():
+    """测试整段(分段倍增)哈希与逐字节滚动哈希一致 包括分段边界"""
+    data = random.Random(0).randbytes(HASH_BLOCK + 300)
+    h = 0
+    expected = []
+    for b in data:
+        h = ((h << 1) + int(fastcdc._GEAR[b])) & ((1 << 64) - 1)
+        expected.append(h)
+    assert gear_hashes(data).tolist() == expected
+
+
+def test_fastcdc_cut_matches_reference():
+    """测试向量化切分点与逐字节参考实现一致"""
+    chunker = FastCDC(min_size=256, avg_size=1024, max_size=4096)
+    data = random.Random(3).randbytes(64 * 1024)
+    offset = 0
+    for chunk in chunker.split(data):
+        assert len(chunk) == reference_cut(chunker, data[offset:])
+        offset += len(chunk)
+
+
+def test_fastcdc_split():
+    """测试分块大小范围与局部修改后的块复用"""
+    chunker = FastCDC(min_size=1024, avg_size=4096, max_size=16384)
+    data = random.Random(1).randbytes(512 * 1024)
+    chunks = chunker.split(data)
+    assert b"".join(chunks) == data
+    assert all(len(c) <= 16384 for c in chunks)
+    assert all(len(c) >= 1024 for c in chunks[:-1])
+
+    # 中间插入数据 只有附近的块变化
+    edited = data[:100_000] + b"inserted" + data[100_000:]
+    edited_chunks = chunker.split(edited)
+    shared = set(chunks) & set(edited_chunks)
+    assert len(shared) >= len(chunks) - 3
+
+
+@pytest.mark.asyncio
+async def test_fastcdc_chunk_stream():
+    """测试流式分块与整体分块结果一致(与读取块大小无关)"""
+    chunker = FastCDC(min_size=1024, avg_size=4096, max_size=16384)
+    data = random.Random(2).randbytes(200 * 1024)
+
+    async def stream():
+        for i in range(0, len(data), 3000):
+            yield data[i : i + 3000]
+
+    chunks = [c async for c in chunker.chunk_stream(stream())]
+    assert chunks == chunker.split(data)
@@ -0,0 +1,107 @@
+import hashlib
+import pytest
+from module_file.utils.multi_storage.do.storage_config import LocalStorage
+from module_file.utils.multi_storage.session.impl.storage_local import (
+    LocalStorageInterface,
+)
+from module_file.utils.multi_storage.session.interface.strorage_interface import (
+    PartChecksumError,
+)
+
+
+@pytest.mark.asyncio
+async def test_local_storage_stream_save_and_move(tmp_path):
+    """测试流式保存到临时键后原子提交"""
+    storage = LocalStorageInterface(LocalStorage(base_dir=str(tmp_path)))
+
+    async def iter_chunks():
+        for i in range(3):
+            yield bytes([i]) * 1024
+
+    await storage.save("uploads/.tmp/a", iter_chunks())
+    await storage.move("uploads/.tmp/a", "uploads/a.bin")
+    assert not await storage.exists("uploads/.tmp/a")
+    assert await storage.size("uploads/a.bin") == 3 * 1024
+    assert (await storage.load("uploads/a.bin"))[1024:1025] == b"\x01"
+
+
+@pytest.mark.asyncio
+async def test_local_storage_stream_range(tmp_path):
+    """测试按范围流式读取"""
+    storage = LocalStorageInterface(LocalStorage(base_dir=str(tmp_path)))
+    data = bytes(range(256)) * 1024
+    await storage.save("a.bin", data)
+    assert b"".join([c async for c in storage.stream("a.bin")]) == data
+    assert b"".join([c async for c in storage.stream("a.bin", 10, 19)]) == data[10:20]
+    assert b"".join([c async for c in storage.stream("a.bin", 200000)]) == data[200000:]
+
+
+@pytest.mark.asyncio
+async def test_local_storage_multipart(tmp_path):
+    """测试分片上传(乱序上传 重传覆盖 合并校验)"""
+    storage = LocalStorageInterface(LocalStorage(base_dir=str(tmp_path)))
+    upload_id = await storage.create_multipart("uploads/big.bin")
+    etag2 = await storage.upload_part("uploads/big.bin", upload_id, 2, b"b" * 10)
+    await storage.upload_part("uploads/big.bin", upload_id, 1, b"x" * 10)
+    etag1 = await storage.upload_part("uploads/big.bin", upload_id, 1, b"a" * 10)
+    # 校验失败的重传不覆盖已上传的分片
+    with pytest.raises(PartChecksumError):
+        await storage.upload_part("uploads/big.bin", upload_id, 1, b"c" * 10, checksum=etag1)
+    etag = await storage.complete_multipart(
+        "uploads/big.bin", upload_id, [(1, etag1), (2, etag2)]
+    )
+    assert await storage.load("uploads/big.bin") == b"a" * 10 + b"b" * 10
+    assert etag == hashlib.md5(b"a" * 10 + b"b" * 10).hexdigest()
+    assert not (tmp_path / ".multipart" / upload_id).exists()
+
+
+@pytest.mark.asyncio
+async def test_local_storage_delete_many(tmp_path):
+    """测试批量删除(不存在的键视为成功)"""
+    storage = LocalStorageInterface(LocalStorage(base_dir=str(tmp_path)))
+    keys = [f"bulk/{i}.txt" for i in range(100)]
+    for key in keys:
+        await storage.save(key, b"x")
+    result = await storage.delete_many(keys + ["bulk/missing.txt"])
+    assert len(result) == 101 and not any(result.values())
+    assert await storage.list("bulk") == []
+
+
+@pytest.mark.asyncio
+async def test_local_storage_list_page(tmp_path):
+    """测试分页列举与 S3 ListObjectsV2 字典序一致(目录名与文件名交错)"""
+    storage = LocalStorageInterface(LocalStorage(base_dir=str(tmp_path)))
+    keys = ["a-b", "a/b/c", "a/c", "a0", "ab/x", "b/a-", "b/a/z", "b/a0", "c"]
+    for key in keys:
+        await storage.save(key, b"x")
+    await storage.create_multipart("tmp")
+
+    for prefix in ["", "a", "a/", "b/a", "z"]:
+        expected = sorted(k for k in keys if k.startswith(prefix))
+        assert await storage.list(prefix) == expected
+        for max_keys in (1, 2, 3):
+            listed, start_after = [], None
+            while True:
+                page = await storage.list_page(prefix, start_after, max_keys)
+                listed.extend(page.keys)
+                if not page.is_truncated:
+                    break
+                start_after = page.next_start_after
+            assert listed == expected
+    page = await storage.list_page(start_after="a0", max_keys=2)
+    assert page.keys == ["ab/x", "b/a-"] and page.next_start_after == "b/a-"
+    page = await storage.list_page(start_after="a/b", max_keys=2)
+    assert page.keys == ["a/b/c", "a/c"]
+
+
+def test_local_storage_object_key_sharding(tmp_path):
+    """测试哈希前缀分目录键生成"""
+    flat = LocalStorageInterface(LocalStorage(base_dir=str(tmp_path)))
+    assert flat.object_key("uploads", "a.txt") == "uploads/a.txt"
+    sharded = LocalStorageInterface(
+        LocalStorage(base_dir=str(tmp_path), shard_depth=2, shard_width=2)
+    )
+    digest = hashlib.md5(b"a.txt").hexdigest()
+    assert sharded.object_key("uploads/", "a.txt") == (
+        f"uploads/{digest[:2]}/{digest[2:4]}/a.txt"
+    )
@@ -0,0 +1,113 @@
+import pytest
+import pytest_asyncio
+from module_file.utils.multi_storage.do.storage_config import S3Storage
+from module_file.utils.multi_storage.session.impl.storage_s3 import S3StorageInterface
+
+moto_server = pytest.importorskip("moto.server")
+
+
+@pytest.fixture(scope="module")
+def s3_endpoint():
+    """本地 moto S3 服务(替代真实对象存储)"""
+    server = moto_server.ThreadedMotoServer(ip_address="127.0.0.1", port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    yield f"http://{host}:{port}"
+    server.stop()
+
+
+@pytest_asyncio.fixture
+async def s3_storage(s3_endpoint):
+    storage = S3StorageInterface(
+        S3Storage.model_validate(
+            {
+                "endpoint_url": s3_endpoint,
+                "bucket_name": "bucket0",
+                "access_key": "test",
+                "secret_key": "test",
+                "region": "us-east-1",
+                "max_pool_connections": 8,
+            }
+        )
+    )
+    await storage.connect()
+    async with storage._get_client() as client:
+        await client.create_bucket(Bucket="bucket0")
+    yield storage
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_s3_storage_shared_client(s3_storage):
+    """测试共享客户端下的基本对象操作"""
+    async with s3_storage._get_client() as client:
+        shared = client
+    await s3_storage.save("a/b.txt", b"hello world")
+    assert await s3_storage.load("a/b.txt") == b"hello world"
+    assert b"".join([c async for c in s3_storage.stream("a/b.txt", 6, 10)]) == b"world"
+    assert await s3_storage.exists("a/b.txt")
+    await s3_storage.move("a/b.txt", "a/c.txt")
+    assert await s3_storage.list("a/") == ["a/c.txt"]
+    assert await s3_storage.delete("a/c.txt")
+    assert not await s3_storage.exists("a/c.txt")
+    # 全程复用同一个客户端
+    async with s3_storage._get_client() as client:
+        assert client is shared
+
+
+@pytest.mark.asyncio
+async def test_s3_storage_multipart(s3_storage):
+    """测试S3分片上传"""
+    part1 = b"a" * (5 * 1024 * 1024)
+    upload_id = await s3_storage.create_multipart("big.bin")
+    etag2 = await s3_storage.upload_part("big.bin", upload_id, 2, b"tail")
+    etag1 = await s3_storage.upload_part("big.bin", upload_id, 1, part1)
+    await s3_storage.complete_multipart("big.bin", upload_id, [(1, etag1), (2, etag2)])
+    assert await s3_storage.size("big.bin") == len(part1) + 4
+
+
+@pytest.mark.asyncio
+async def test_s3_storage_stream_save(s3_storage):
+    """测试流式写入自动分片上传"""
+    s3_storage.config.multipart_part_size = 5 * 1024 * 1024
+    s3_storage.config.multipart_concurrency = 2
+    data = bytes(range(256)) * (48 * 1024)  # 12MB
+
+    async def stream():
+        for i in range(0, len(data), 64 * 1024):
+            yield data[i : i + 64 * 1024]
+
+    await s3_storage.save("stream.bin", stream())
+    assert await s3_storage.load("stream.bin") == data
+    async with s3_storage._get_client() as client:
+        head = await client.head_object(Bucket="bucket0", Key="stream.bin")
+    assert head["ETag"].strip('"').endswith("-3")
+    # 小对象直接上传
+    await s3_storage.save("small.bin", b"small")
+    assert await s3_storage.load("small.bin") == b"small"
+
+
+@pytest.mark.asyncio
+async def test_s3_storage_delete_many(s3_storage, monkeypatch):
+    """测试 delete_objects 分批删除"""
+    from module_file.utils.multi_storage.session.impl import storage_s3
+
+    monkeypatch.setattr(storage_s3, "DELETE_OBJECTS_MAX_KEYS", 3)
+    keys = [f"bulk/{i}" for i in range(7)]
+    for key in keys:
+        await s3_storage.save(key, b"x")
+    result = await s3_storage.delete_many(keys)
+    assert len(result) == 7 and not any(result.values())
+    assert await s3_storage.list("bulk/") == []
+
+
+@pytest.mark.asyncio
+async def test_s3_storage_list_page(s3_storage):
+    """测试 list_objects_v2 单页列举"""
+    for key in ["p/1", "p/2", "p/3"]:
+        await s3_storage.save(key, b"x")
+    page = await s3_storage.list_page("p/", max_keys=2)
+    assert page.keys == ["p/1", "p/2"] and page.is_truncated
+    page = await s3_storage.list_page("p/", page.next_start_after, 2)
+    assert page.keys == ["p/3"] and not page.is_truncated
+    await s3_storage.delete_many(["p/1", "p/2", "p/3"])
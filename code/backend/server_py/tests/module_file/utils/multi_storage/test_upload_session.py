@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta, timezone
+import hashlib
+import pytest
+from fastapi import HTTPException
+from sqlmodel import update
+from module_file.do.upload_session import (
+    UploadSession,
+    UploadSessionCreate,
+    UploadSessionStatus,
+)
+from module_file.service import upload_session as upload_session_module
+from module_file.service.filesystem import FileService
+from module_file.service.upload_session import UploadSessionService
+from module_file.utils.multi_storage.do.storage_config import LocalStorage
+from module_file.utils.multi_storage.session.impl.storage_local import (
+    LocalStorageInterface,
+)
+
+PART_SIZE = 8
+
+
+@pytest.fixture
+def service(tmp_path, sqlite_dao, monkeypatch) -> UploadSessionService:
+    # 测试使用小分片
+    monkeypatch.setattr(upload_session_module, "MIN_PART_SIZE", 4)
+    storage = LocalStorageInterface(LocalStorage(base_dir=str(tmp_path / "storage")))
+    return UploadSessionService(
+        file_service=FileService(storage_interface=storage), storage_interface=storage
+    )
+
+
+async def iter_bytes(data: bytes):
+    for i in range(0, len(data), 3):
+        yield data[i : i + 3]
+
+
+async def upload(service: UploadSessionService, session_id: str, number: int, data: bytes):
+    return await service.upload_part(
+        session_id, number, iter_bytes(data), hashlib.md5(data).hexdigest()
+    )
+
+
+@pytest.mark.asyncio
+async def test_upload_session_create_validates_sizes(service):
+    """测试创建会话时校验分片大小与声明的文件大小"""
+    with pytest.raises(HTTPException) as e:
+        await service.create(UploadSessionCreate(file_name="a.bin", part_size=2))
+    assert e.value.status_code == 400
+    with pytest.raises(HTTPException) as e:
+        await service.create(
+            UploadSessionCreate(
+                file_name="a.bin",
+                part_size=PART_SIZE,
+                total_size=PART_SIZE * (upload_session_module.MAX_PART_COUNT + 1),
+            )
+        )
+    assert e.value.status_code == 400
+    info = await service.create(UploadSessionCreate(file_name="a.bin", part_size=PART_SIZE))
+    assert info.status == UploadSessionStatus.UPLOADING and info.parts == []
+
+
+@pytest.mark.asyncio
+async def test_upload_session_resume_and_complete(service):
+    """测试乱序上传/续传 校验失败的重传不覆盖已上传分片 合并后登记文件 重复完成返回409"""
+    data = bytes(range(20))
+    info = await service.create(
+        UploadSessionCreate(file_name="a.bin", part_size=PART_SIZE, total_size=len(data))
+    )
+    await upload(service, info.id, 3, data[16:])
+    await upload(service, info.id, 1, data[:8])
+    with pytest.raises(HTTPException) as e:
+        await service.upload_part(info.id, 2, iter_bytes(data[8:16]), "0" * 32)
+    assert e.value.status_code == 400
+    assert [p.part_number for p in (await service.get_info(info.id)).parts] == [1, 3]
+    # 分片超过分片大小立即拒绝
+    with pytest.raises(HTTPException) as e:
+        await upload(service, info.id, 2, data[:9])
+    assert e.value.status_code == 413
+    with pytest.raises(HTTPException) as e:
+        await service.complete(info.id)
+    assert e.value.status_code == 400
+
+    await upload(service, info.id, 2, data[8:16])
+    # 已接受的分片 损坏的重传被拒绝 原分片保持不变
+    with pytest.raises(HTTPException) as e:
+        await service.upload_part(
+            info.id, 2, iter_bytes(b"x" * 8), hashlib.md5(data[8:16]).hexdigest()
+        )
+    assert e.value.status_code == 400
+
+    file_entry = await service.complete(info.id)
+    assert file_entry.file_size_bytes == len(data)
+    content = b"".join(
+        [c async for c in service.file_service.stream_file_content(file_entry.physical_storage)]
+    )
+    assert content == data
+    completed = await service.get_info(info.id)
+    assert completed.status == UploadSessionStatus.COMPLETED
+    assert completed.file_id == file_entry.id and completed.parts == []
+    with pytest.raises(HTTPException) as e:
+        await service.complete(info.id)
+    assert e.value.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_upload_session_abort_and_sweep(service, sqlite_dao):
+    """测试取消会话清理分片 过期清理只处理上传中的会话(合并中的会话跳过)"""
+    aborted = await service.create(UploadSessionCreate(file_name="a.bin", part_size=PART_SIZE))
+    await upload(service, aborted.id, 1, b"a" * 8)
+    await service.abort(aborted.id)
+    assert (await service.get_info(aborted.id)).status == UploadSessionStatus.ABORTED
+    assert (await service.get_info(aborted.id)).parts == []
+    with pytest.raises(HTTPException) as e:
+        await service.abort(aborted.id)
+    assert e.value.status_code == 409
+
+    expired = await service.create(UploadSessionCreate(file_name="b.bin", part_size=PART_SIZE))
+    completing = await service.create(UploadSessionCreate(file_name="c.bin", part_size=PART_SIZE))
+    active = await service.create(UploadSessionCreate(file_name="d.bin", part_size=PART_SIZE))
+    past = datetime.now(timezone.utc) - timedelta(hours=1)
+    async with sqlite_dao() as session:
+        async with session.begin():
+            await session.exec(
+                update(UploadSession)
+                .where(UploadSession.id.in_([expired.id, completing.id]))
+                .values(expires_at=past)
+            )
+            await session.exec(
+                update(UploadSession)
+                .where(UploadSession.id == completing.id)
+                .values(status=UploadSessionStatus.COMPLETING)
+            )
+    with pytest.raises(HTTPException) as e:
+        await upload(service, expired.id, 1, b"b" * 8)
+    assert e.value.status_code == 410
+
+    assert await service.sweep_expired(batch_size=1) == 1
+    assert (await service.get_info(expired.id)).status == UploadSessionStatus.ABORTED
+    assert (await service.get_info(completing.id)).status == UploadSessionStatus.COMPLETING
+    assert (await service.get_info(active.id)).status == UploadSessionStatus.UPLOADING
@@ -0,0 +1,41 @@
+import hashlib
+import os
+import pytest
+from module_file.utils import content_hash
+from module_file.utils.content_hash import TreeHasher, hash_file, new_hasher, resolve_algorithm
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("algorithm", ["md5", "sha256", "sha256-tree"])
+async def test_hash_file_matches_incremental(tmp_path, algorithm):
+    """测试大块读文件哈希与任意分块增量哈希一致"""
+    data = os.urandom(3 * 1024 * 1024 + 7)
+    path = tmp_path / "input.bin"
+    path.write_bytes(data)
+    hasher = new_hasher(algorithm)
+    for i in range(0, len(data), 100_003):
+        hasher.update(data[i : i + 100_003])
+    assert await hash_file(path, algorithm, buffer_size=1024 * 1024) == hasher.hexdigest()
+    if algorithm == "md5":
+        assert hasher.hexdigest() == hashlib.md5(data).hexdigest()
+
+
+def test_tree_hasher_length_sensitive():
+    """测试树哈希区分叶子边界与长度"""
+    a, b = TreeHasher(leaf_size=4), TreeHasher(leaf_size=4)
+    a.update(b"abcd")
+    b.update(b"abcd")
+    b.update(b"")
+    assert a.hexdigest() == b.hexdigest()
+    c = TreeHasher(leaf_size=4)
+    c.update(b"abcdabcd")
+    assert c.hexdigest() != a.hexdigest()
+
+
+def test_resolve_algorithm_fallback(monkeypatch):
+    """测试可选依赖缺失时回退到标准库树哈希"""
+    monkeypatch.setattr(content_hash, "blake3", None)
+    assert resolve_algorithm("blake3") == "sha256-tree"
+    assert resolve_algorithm("md5") == "md5"
+    with pytest.raises(ValueError):
+        resolve_algorithm("crc32")
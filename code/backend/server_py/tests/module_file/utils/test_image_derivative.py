@@ -0,0 +1,41 @@
+import io
+import pytest
+from PIL import Image
+from module_file.do.derivative import DerivativeFit, DerivativeFormat, DerivativeSpec
+from module_file.utils.image_derivative import render_derivative
+
+
+def _image_bytes(size: tuple[int, int], mode: str = "RGB", fmt: str = "PNG") -> bytes:
+    buffer = io.BytesIO()
+    Image.new(mode, size, (200, 100, 50, 128)[: len(mode)]).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize(
+    "spec, expected_size",
+    [
+        (DerivativeSpec(width=128), (128, 64)),
+        (DerivativeSpec(width=128, height=128, fit=DerivativeFit.COVER), (128, 128)),
+        (DerivativeSpec(width=2048), (400, 200)),  # 不放大
+    ],
+)
+def test_render_derivative_size(spec, expected_size):
+    """测试等比缩放/裁剪填满"""
+    data = render_derivative(_image_bytes((400, 200)), spec, max_pixels=10**6)
+    with Image.open(io.BytesIO(data)) as image:
+        assert image.format == "WEBP"
+        assert image.size == expected_size
+
+
+def test_render_derivative_jpeg_flattens_alpha():
+    """测试带透明通道的图片输出 JPEG"""
+    spec = DerivativeSpec(width=64, format=DerivativeFormat.JPEG)
+    data = render_derivative(_image_bytes((256, 256), "RGBA"), spec, max_pixels=10**6)
+    with Image.open(io.BytesIO(data)) as image:
+        assert image.format == "JPEG" and image.mode == "RGB"
+
+
+def test_render_derivative_pixel_limit():
+    """测试原图像素上限"""
+    with pytest.raises(ValueError):
+        render_derivative(_image_bytes((400, 200)), DerivativeSpec(width=64), max_pixels=1000)
@@ -0,0 +1,79 @@
+"""
+内容哈希吞吐基准: 旧实现(aiofiles 8KB 读取 MD5) vs 大块线程读取 vs 各哈希算法/树哈希
+运行: python tools/benchmark/bench_content_hash.py --size-mb 1024
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+import aiofiles  # noqa: E402
+from module_file.utils.content_hash import (  # noqa: E402
+    blake3,
+    xxhash,
+    hash_file,
+    new_hasher,
+)
+
+
+async def legacy_md5(path: str) -> str:
+    """旧实现 每 8KB 一次线程切换"""
+    md5_hash = hashlib.md5()
+    async with aiofiles.open(path, "rb") as f:
+        while chunk := await f.read(8192):
+            md5_hash.update(chunk)
+    return md5_hash.hexdigest()
+
+
+async def stream_hash(path: str, algorithm: str, chunk_size: int = 1024 * 1024) -> str:
+    """模拟上传流式哈希 1MB 块在线程中 update"""
+    hasher = new_hasher(algorithm)
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            await asyncio.to_thread(hasher.update, chunk)
+    return await asyncio.to_thread(hasher.hexdigest)
+
+
+async def measure(name: str, coro_factory, size: int):
+    start = time.perf_counter()
+    digest = await coro_factory()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {size / elapsed / 1024 / 1024:>9.1f} MB/s  {digest[:16]}")
+
+
+async def main(size_mb: int):
+    algorithms = ["md5", "sha256", "sha256-tree"]
+    if blake3 is not None:
+        algorithms.append("blake3")
+    if xxhash is not None:
+        algorithms.append("xxh3_128")
+    size = size_mb * 1024 * 1024
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "input.bin")
+        with open(path, "wb") as f:
+            block = os.urandom(16 * 1024 * 1024)
+            for _ in range(0, size, len(block)):
+                f.write(block)
+        size = os.path.getsize(path)
+        print(f"输入 {size / 1024 / 1024:.0f} MB  CPU {os.cpu_count()} 核")
+        # 预热页缓存 只比较哈希与读取方式
+        await hash_file(path, "md5")
+        await measure("legacy md5 (aiofiles 8KB)", lambda: legacy_md5(path), size)
+        for algorithm in algorithms:
+            await measure(f"file {algorithm}", lambda: hash_file(path, algorithm), size)
+        for algorithm in algorithms:
+            await measure(f"stream {algorithm}", lambda: stream_hash(path, algorithm), size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="内容哈希吞吐基准")
+    parser.add_argument("--size-mb", type=int, default=1024, help="输入大小(MB)")
+    args = parser.parse_args()
+    asyncio.run(main(args.size_mb))
@@ -0,0 +1,79 @@
+"""
+CTC 解码基准: 旧实现(逐时间步 Python 循环) vs 整批向量化解码
+运行: python tools/benchmark/bench_ctc_decode.py --lines 300 --steps 80
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+import numpy as np  # noqa: E402
+from module_ai.utils.onnx.ocr_rapid.rapidocr.recognize_process import (  # noqa: E402
+    CTCLabelDecode,
+)
+
+
+def legacy_decode(decoder: CTCLabelDecode, text_index, text_prob, is_remove_duplicate=True):
+    """旧实现 逐 batch、逐时间步判断"""
+    result_list = []
+    ignored_tokens = decoder.get_ignored_tokens()
+    for batch_idx in range(len(text_index)):
+        char_list = []
+        conf_list = []
+        for idx in range(len(text_index[batch_idx])):
+            if text_index[batch_idx][idx] in ignored_tokens:
+                continue
+            if is_remove_duplicate:
+                if idx > 0 and text_index[batch_idx][idx - 1] == text_index[batch_idx][idx]:
+                    continue
+            char_list.append(decoder.character[int(text_index[batch_idx][idx])])
+            conf_list.append(text_prob[batch_idx][idx])
+        score = np.mean(conf_list) if conf_list else 0
+        result_list.append(("".join(char_list), score))
+    return result_list
+
+
+def fake_preds(lines: int, steps: int, classes: int, blank_ratio: float) -> np.ndarray:
+    """模拟识别输出 大部分时间步为空白符 字符连续重复若干步"""
+    rng = np.random.default_rng(0)
+    index = rng.integers(1, classes, (lines, steps))
+    index[rng.random((lines, steps)) < blank_ratio] = 0
+    index = np.repeat(index[:, : steps // 2], 2, axis=1)
+    preds = rng.random((lines, index.shape[1], classes), dtype=np.float32) * 0.1
+    np.put_along_axis(preds, index[..., np.newaxis], 0.9, axis=2)
+    return preds
+
+
+def main(lines: int, steps: int, classes: int, repeat: int):
+    decoder = CTCLabelDecode([chr(0x4E00 + i) for i in range(classes - 2)])
+    preds = fake_preds(lines, steps, classes, blank_ratio=0.6)
+    preds_idx = preds.argmax(axis=2)
+    preds_prob = preds.max(axis=2)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        legacy = legacy_decode(decoder, preds_idx, preds_prob)
+    legacy_time = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        vectorized = decoder.decode(preds_idx, preds_prob, is_remove_duplicate=True)
+    vectorized_time = (time.perf_counter() - start) / repeat
+
+    assert [text for text, _ in legacy] == [text for text, _ in vectorized]
+    assert np.allclose([s for _, s in legacy], [s for _, s in vectorized], rtol=1e-5)
+    print(f"lines={lines} steps={steps} classes={classes}")
+    print(f"{'legacy loop':<16} {legacy_time * 1000:>8.2f} ms")
+    print(f"{'vectorized':<16} {vectorized_time * 1000:>8.2f} ms  x{legacy_time / vectorized_time:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=300)
+    parser.add_argument("--steps", type=int, default=80)
+    parser.add_argument("--classes", type=int, default=6625)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.lines, args.steps, args.classes, args.repeat)
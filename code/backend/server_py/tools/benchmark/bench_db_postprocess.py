@@ -0,0 +1,105 @@
+"""
+DB 检测后处理基准: 旧实现(逐框掩码打分 + shapely/pyclipper 外扩) vs 积分图打分 + 矩形闭式外扩
+运行: python tools/benchmark/bench_db_postprocess.py --lines 400 --size 1280
+--save-fixture 保存模拟概率图与旧实现结果(tests 中的一致性校验数据)
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+from module_ai.utils.onnx.ocr_rapid.rapidocr.detect_process import (  # noqa: E402
+    DBPostProcess,
+)
+
+
+def legacy_boxes_from_bitmap(post: DBPostProcess, pred, bitmap, dest_width, dest_height):
+    """旧实现 逐框 fillPoly 打分 多边形外扩后再取最小外接矩形"""
+    height, width = bitmap.shape
+    contours, _ = cv2.findContours(
+        (bitmap * 255).astype(np.uint8), cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE
+    )
+    boxes = []
+    scores = []
+    for contour in contours[: post.max_candidates]:
+        points, sside = post.get_mini_boxes(contour)
+        if sside < post.min_size:
+            continue
+        points = np.array(points)
+        score = post.box_score_fast(pred, points.reshape(-1, 2))
+        if post.box_thresh > score:
+            continue
+        box, sside = post.get_mini_boxes(post.unclip(points).reshape(-1, 1, 2))
+        if sside < post.min_size + 2:
+            continue
+        box = np.array(box)
+        box[:, 0] = np.clip(np.round(box[:, 0] / width * dest_width), 0, dest_width)
+        box[:, 1] = np.clip(np.round(box[:, 1] / height * dest_height), 0, dest_height)
+        boxes.append(box.astype(np.int16))
+        scores.append(score)
+    return np.array(boxes, dtype=np.int16), scores
+
+
+def fake_pred(lines: int, size: int, seed: int = 0) -> np.ndarray:
+    """模拟检测概率图 按行排布的文本行(实心矩形 少量倾斜) 模糊后量化为 uint8"""
+    rng = np.random.default_rng(seed)
+    canvas = np.zeros((size, size), np.uint8)
+    rows = max(size // 32 - 1, 1)
+    for index in range(lines):
+        row, col = index % rows, index // rows
+        w, h = rng.integers(24, 120), rng.integers(8, 20)
+        cx = (col * 160 + 80 + rng.integers(-10, 10)) % size
+        cy = row * 32 + 32
+        angle = 0.0 if rng.random() < 0.7 else float(rng.uniform(-4, 4))
+        box = cv2.boxPoints(((float(cx), float(cy)), (float(w), float(h)), angle))
+        cv2.fillPoly(canvas, [np.int32(np.round(box))], int(rng.integers(160, 256)))
+    return cv2.GaussianBlur(canvas, (5, 5), 0)
+
+
+def main(lines: int, size: int, repeat: int, save_fixture: str | None):
+    post = DBPostProcess(thresh=0.3, box_thresh=0.5, unclip_ratio=1.6)
+    pred_u8 = fake_pred(lines, size)
+    pred = pred_u8.astype(np.float32) / 255
+    bitmap = pred > post.thresh
+    dest = (size * 2, size * 2)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        legacy_boxes, legacy_scores = legacy_boxes_from_bitmap(post, pred, bitmap, *dest)
+    legacy_time = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        boxes, scores = post.boxes_from_bitmap(pred, bitmap, *dest)
+    fast_time = (time.perf_counter() - start) / repeat
+
+    assert len(boxes) == len(legacy_boxes), (len(boxes), len(legacy_boxes))
+    np.testing.assert_allclose(scores, legacy_scores, rtol=1e-6)
+    diff = np.abs(boxes.astype(int) - legacy_boxes.astype(int)).max() if len(boxes) else 0
+    print(f"boxes: {len(boxes)}  max corner diff: {diff}px (dest scale {dest[0] / size:.1f}x)")
+    print(f"legacy: {legacy_time * 1000:.1f} ms")
+    print(f"fast:   {fast_time * 1000:.1f} ms  ({legacy_time / fast_time:.1f}x)")
+
+    if save_fixture:
+        np.savez_compressed(
+            save_fixture,
+            pred=pred_u8,
+            dest=np.array(dest),
+            boxes=legacy_boxes,
+            scores=np.array(legacy_scores),
+        )
+        print(f"fixture saved: {save_fixture}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=400)
+    parser.add_argument("--size", type=int, default=1280)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save-fixture", help="保存 npz 一致性校验数据")
+    args = parser.parse_args()
+    main(args.lines, args.size, args.repeat, args.save_fixture)
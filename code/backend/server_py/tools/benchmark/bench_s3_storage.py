@@ -0,0 +1,85 @@
+"""
+S3 存储吞吐基准: 共享客户端 vs 每次操作新建客户端
+使用本地 moto 服务 不依赖真实对象存储
+运行: python tools/benchmark/bench_s3_storage.py --ops 500 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from moto.server import ThreadedMotoServer  # noqa: E402
+from module_file.utils.multi_storage.do.storage_config import S3Storage  # noqa: E402
+from module_file.utils.multi_storage.session.impl.storage_s3 import (  # noqa: E402
+    S3StorageInterface,
+)
+
+
+async def run_ops(op, ops: int, concurrency: int) -> float:
+    """并发执行 ops 次操作 返回每秒操作数"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            await op(i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(ops)))
+    return ops / (time.perf_counter() - start)
+
+
+async def main(ops: int, concurrency: int, size: int):
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    storage = S3StorageInterface(
+        S3Storage(
+            endpoint_url=f"http://{host}:{port}",
+            bucket="bench",
+            access_key_id="test",
+            secret_access_key="test",
+            region="us-east-1",
+            max_pool_connections=concurrency,
+        )
+    )
+    await storage.connect()
+    async with storage._get_client() as client:
+        await client.create_bucket(Bucket="bench")
+    payload = b"x" * size
+
+    async def shared_op(i: int):
+        await storage.save(f"shared/{i}", payload)
+        await storage.load(f"shared/{i}")
+
+    async def per_op_client(i: int):
+        # 旧实现: 每次操作新建客户端
+        for call in ("put", "get"):
+            async with storage.session.client(**storage._client_kwargs()) as client:
+                if call == "put":
+                    await client.put_object(Bucket="bench", Key=f"new/{i}", Body=payload)
+                else:
+                    response = await client.get_object(Bucket="bench", Key=f"new/{i}")
+                    await response["Body"].read()
+
+    try:
+        per_op = await run_ops(per_op_client, ops, concurrency)
+        shared = await run_ops(shared_op, ops, concurrency)
+    finally:
+        await storage.close()
+        server.stop()
+    print(f"对象大小 {size} 字节 并发 {concurrency} 每轮 put+get 共 {ops} 轮")
+    print(f"每次新建客户端: {per_op:8.1f} 轮/秒")
+    print(f"共享客户端:     {shared:8.1f} 轮/秒 ({shared / per_op:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--size", type=int, default=4096)
+    args = parser.parse_args()
+    asyncio.run(main(args.ops, args.concurrency, args.size))
@@ -0,0 +1,72 @@
+"""
+文字识别宽度桶批大小标定: 对每个宽度桶测试不同批大小的推理吞吐 输出 recognize 模型 config.buckets 配置
+取吞吐达到最优 95% 的最小批大小(单批延迟不超过 --max-latency-ms)
+运行: python tools/benchmark/calibrate_rec_buckets.py temp_source/model/ocr/<识别模型>.onnx
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+import numpy as np  # noqa: E402
+from onnxruntime import InferenceSession, SessionOptions  # noqa: E402
+from module_ai.utils.onnx.ocr_rapid.rapidocr.recognize import (  # noqa: E402
+    DEFAULT_BUCKET_WIDTHS,
+)
+
+BATCH_SIZES = [1, 2, 4, 8, 16, 32, 64]
+
+
+def measure(session: InferenceSession, input_name: str, shape: tuple, repeat: int) -> float:
+    """单批平均延迟(秒)"""
+    data = np.random.uniform(-1, 1, shape).astype(np.float32)
+    session.run(None, {input_name: data})  # 预热
+    start = time.perf_counter()
+    for _ in range(repeat):
+        session.run(None, {input_name: data})
+    return (time.perf_counter() - start) / repeat
+
+
+def main(model_path: str, widths: list[int], max_latency_ms: float, repeat: int, threads: int):
+    sess_opt = SessionOptions()
+    sess_opt.intra_op_num_threads = threads
+    session = InferenceSession(model_path, sess_options=sess_opt, providers=["CPUExecutionProvider"])
+    input_name = session.get_inputs()[0].name
+    img_c, img_h, _ = json.loads(session.get_modelmeta().custom_metadata_map["shape"])
+
+    batch = {}
+    for width in widths:
+        results = []
+        for batch_size in BATCH_SIZES:
+            latency = measure(session, input_name, (batch_size, img_c, img_h, width), repeat)
+            if latency * 1000 > max_latency_ms and results:
+                break
+            results.append((batch_size, batch_size / latency))
+            print(
+                f"width={width:<5} batch={batch_size:<3} {latency * 1000:>8.1f} ms"
+                f" {batch_size / latency:>8.1f} lines/s"
+            )
+        best = max(throughput for _, throughput in results)
+        batch[width] = next(size for size, throughput in results if throughput >= best * 0.95)
+
+    print("\n# recognize 模型 config")
+    print("buckets:")
+    print(f"  widths: {widths}")
+    print("  batch:")
+    for width, size in batch.items():
+        print(f"    {width}: {size}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("model", help="识别模型 onnx 路径")
+    parser.add_argument("--widths", type=int, nargs="+", default=DEFAULT_BUCKET_WIDTHS)
+    parser.add_argument("--max-latency-ms", type=float, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=4, help="与 OrtInferSession 一致")
+    args = parser.parse_args()
+    main(args.model, args.widths, args.max_latency_ms, args.repeat, args.threads)
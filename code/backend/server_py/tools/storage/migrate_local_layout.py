@@ -0,0 +1,80 @@
+"""
+本地存储布局迁移: 平铺目录 uploads/<name> -> 哈希前缀分目录 uploads/3f/a9/<name>
+按配置的 file_system.shard_depth/shard_width 生成新键 移动文件并更新 FileEntry.physical_storage
+可重复执行: 文件已移动但记录未更新(中断)时只补更新记录
+建议停服或低峰执行 运行中新上传的文件已直接使用分目录布局
+运行(项目根目录): python tools/storage/migrate_local_layout.py --dry-run
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from common.config.db import db_manager  # noqa: E402
+from module_file.config.filesystem import storage  # noqa: E402
+from module_file.dao.filesystem import FileDao  # noqa: E402
+from module_file.utils.multi_storage.session.impl.storage_local import (  # noqa: E402
+    LocalStorageInterface,
+)
+
+logger = logging.getLogger("migrate_local_layout")
+
+
+async def migrate_key(file_dao: FileDao, key: str, new_key: str, dry_run: bool) -> str:
+    """迁移单个物理文件 返回结果状态"""
+    old_exists = await storage.exists(key)
+    if not old_exists and not await storage.exists(new_key):
+        logger.error(f"物理文件不存在 跳过: {key}")
+        return "missing"
+    if dry_run:
+        logger.info(f"[dry-run] {key} -> {new_key}")
+        return "moved"
+    if old_exists:
+        await storage.move(key, new_key)
+    rows = await file_dao.rename_physical_storage(key, new_key)
+    logger.info(f"{key} -> {new_key} ({rows} 条记录)")
+    return "moved"
+
+
+async def main(prefix: str, batch_size: int, dry_run: bool):
+    if not isinstance(storage, LocalStorageInterface):
+        raise SystemExit("当前存储不是本地存储 无需迁移")
+    if not storage.config.shard_depth:
+        raise SystemExit("file_system.shard_depth 为0 未启用分目录")
+    prefix = prefix.strip("/")
+    # 确保新增的表(如 physical_object)已创建
+    await db_manager.table_create_all()
+    file_dao = FileDao()
+    stats = {"moved": 0, "missing": 0, "skipped": 0}
+    start_after = ""
+    try:
+        while True:
+            keys = await file_dao.list_physical_storage(f"{prefix}/", start_after, batch_size)
+            if not keys:
+                break
+            start_after = keys[-1]
+            for key in keys:
+                name = key[len(prefix) + 1 :]
+                # 只迁移平铺在前缀目录下的文件 已分目录的跳过
+                if "/" in name:
+                    stats["skipped"] += 1
+                    continue
+                new_key = storage.object_key(prefix, name)
+                stats[await migrate_key(file_dao, key, new_key, dry_run)] += 1
+    finally:
+        await db_manager.shutdown()
+    logger.info(f"迁移完成: {stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="本地存储分目录布局迁移")
+    parser.add_argument("--prefix", default="uploads", help="要迁移的目录(存储键前缀)")
+    parser.add_argument("--batch-size", type=int, default=500, help="每批读取的物理文件数")
+    parser.add_argument("--dry-run", action="store_true", help="只打印迁移计划")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    asyncio.run(main(args.prefix, args.batch_size, args.dry_run))